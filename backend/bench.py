@@ -0,0 +1,1279 @@
+"""
+KinSnake Backend Benchmarks
+Run with: python bench.py <benchmark> [options]
+
+Frames come from a recorded video (--video) or a synthetic moving pattern, so
+every benchmark runs on a machine without a webcam.
+"""
+
+import argparse
+import base64
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+def load_frames(video_path=None, count=120, width=1280, height=720):
+    """Load BGR frames from a recording, or generate a synthetic sequence"""
+    frames = []
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise SystemExit(f"No frames could be read from {video_path}")
+        return frames
+
+    # Synthetic: noisy background with a moving bright blob
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        frame = base.copy()
+        cx = int(width * (0.2 + 0.6 * (i % 60) / 60))
+        cy = height // 2
+        cv2.circle(frame, (cx, cy), height // 8, (180, 200, 220), -1)
+        frames.append(frame)
+    return frames
+
+
+def percentile(values, pct):
+    """Percentile of a list (0 when empty)"""
+    if not values:
+        return 0.0
+    return float(np.percentile(np.asarray(values), pct))
+
+
+def print_table(rows, columns):
+    """Print a list of dicts as an aligned table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def synthetic_hand(angle_deg, width=1280, height=720, length_px=160.0, cx=0.5, cy=0.5,
+                   pointing=True, jitter=0.0, rng=None):
+    """Landmarks of a hand pointing its index finger at angle_deg (pixel space, y down)
+
+    pointing=False curls the index finger too (a fist). jitter adds per-landmark
+    noise as a fraction of the finger length.
+    """
+    from landmarks import HandLandmarks
+
+    theta = np.radians(angle_deg)
+    # Unit step in normalized coords that is `length_px` long in pixels
+    ux = np.cos(theta) * length_px / width
+    uy = np.sin(theta) * length_px / height
+    points = np.zeros((21, 3))
+    points[:, 0], points[:, 1] = cx, cy
+
+    def at(frac):
+        return (cx + ux * frac, cy + uy * frac, 0.0)
+
+    # Index finger: 5 base, 6 mid, 7 second joint, 8 tip
+    index_fracs = (0.45, 0.65, 0.82, 1.0) if pointing else (0.45, 0.4, 0.35, 0.3)
+    for idx, frac in zip((5, 6, 7, 8), index_fracs):
+        points[idx] = at(frac)
+    # Other fingers curled near the palm
+    for idx in (1, 2, 3, 4, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20):
+        points[idx] = at(0.3)
+    if jitter and rng is not None:
+        points[1:, 0] += rng.normal(0, jitter * length_px / width, 20)
+        points[1:, 1] += rng.normal(0, jitter * length_px / height, 20)
+    return HandLandmarks(points)
+
+
+def synthetic_session(seconds=60.0, fps=30.0, hold_s=0.8, sweep_s=0.25, noise_deg=3.0, seed=0,
+                      rest_every=0, jitter=0.0):
+    """Recorded-session stand-in: a finger moving between random directions
+
+    Returns [(t, hand_landmarks, handedness, label)], labelled with the held
+    direction (None while the finger is sweeping between directions). With
+    rest_every=N, every Nth hold is a fist labelled NONE.
+    """
+    from gestures import DIRECTIONS
+
+    centers = {"RIGHT": 0.0, "DOWN": 90.0, "LEFT": 180.0, "UP": -90.0}
+    rng = np.random.default_rng(seed)
+    samples = []
+    t = 0.0
+    current = "RIGHT"
+    holds = 0
+    while t < seconds:
+        # Hand placement and size vary per hold
+        cx, cy = rng.uniform(0.3, 0.7), rng.uniform(0.3, 0.7)
+        length_px = rng.uniform(110, 200)
+
+        def hand(angle, pointing=True):
+            return synthetic_hand(angle, length_px=length_px, cx=cx, cy=cy,
+                                  pointing=pointing, jitter=jitter, rng=rng)
+
+        # Hold
+        holds += 1
+        resting = rest_every and holds % rest_every == 0
+        hold_end = t + hold_s * rng.uniform(0.6, 1.4)
+        while t < hold_end:
+            angle = centers[current] + rng.normal(0, noise_deg)
+            if resting:
+                samples.append((t, hand(angle, pointing=False), "right", "NONE"))
+            else:
+                samples.append((t, hand(angle), "right", current))
+            t += 1.0 / fps
+        # Sweep to a perpendicular direction
+        target = rng.choice([d for d in DIRECTIONS if abs(((centers[d] - centers[current]) + 180) % 360 - 180) == 90])
+        delta = ((centers[target] - centers[current]) + 180) % 360 - 180
+        sweep_end = t + sweep_s * rng.uniform(0.7, 1.3)
+        sweep_start = t
+        while t < sweep_end:
+            progress = (t - sweep_start) / (sweep_end - sweep_start)
+            eased = 0.5 - 0.5 * np.cos(np.pi * progress)
+            angle = centers[current] + delta * eased + rng.normal(0, noise_deg)
+            samples.append((t, hand(angle), "right", None))
+            t += 1.0 / fps
+        current = target
+    return samples
+
+
+def load_session(args):
+    """Landmark session from --landmarks, or a synthetic one"""
+    from landmarks import read_recording
+    if getattr(args, "landmarks", None):
+        return read_recording(args.landmarks)
+    return synthetic_session()
+
+
+class ReplayCapture:
+    """cv2.VideoCapture stand-in that replays frames (honours read(image) reuse)"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def read(self, image=None):
+        src = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        if image is not None and image.shape == src.shape:
+            np.copyto(image, src)
+            return True, image
+        return True, src.copy()
+
+    def release(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# inference: in-process Hands vs the multi-process InferencePool
+# ---------------------------------------------------------------------------
+
+def bench_inference(args):
+    """Aggregate frames-per-second for in-process Hands and for 1..N pool workers"""
+    import mediapipe as mp
+    from inference_pool import InferencePool, InferencePoolBusy
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    rows = []
+
+    # Baseline: one in-process graph, synchronous
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=1,
+                                     min_detection_confidence=0.6, min_tracking_confidence=0.5)
+    for frame in frames[:5]:
+        hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    start = time.perf_counter()
+    for frame in frames:
+        hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    elapsed = time.perf_counter() - start
+    hands.close()
+    baseline_fps = len(frames) / elapsed
+    rows.append({"mode": "in-process", "workers": 1, "fps": f"{baseline_fps:.1f}", "scaling": "1.00x"})
+
+    for workers in args.workers:
+        pool = InferencePool(workers, frame_width=args.width, frame_height=args.height)
+        try:
+            # Warm every graph
+            for future in [pool.submit(f) for f in frames[:pool.num_slots]]:
+                future.result()
+
+            # Emulate `workers` independent streams: keep every slot busy
+            start = time.perf_counter()
+            in_flight = []
+            for frame in frames * max(1, workers):
+                while True:
+                    try:
+                        in_flight.append(pool.submit(frame, block=False))
+                        break
+                    except InferencePoolBusy:
+                        in_flight.pop(0).result()
+            for future in in_flight:
+                future.result()
+            elapsed = time.perf_counter() - start
+            fps = len(frames) * max(1, workers) / elapsed
+            rows.append({"mode": "pool", "workers": workers, "fps": f"{fps:.1f}",
+                         "scaling": f"{fps / baseline_fps:.2f}x"})
+        finally:
+            pool.close()
+
+    print_table(rows, ["mode", "workers", "fps", "scaling"])
+
+
+# ---------------------------------------------------------------------------
+# decode: legacy full decode vs reduced-resolution ingest of uploaded frames
+# ---------------------------------------------------------------------------
+
+def _decode_legacy(frame_data):
+    """The original process_frame decode path"""
+    frame_bytes = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
+    nparr = np.frombuffer(frame_bytes, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def _decode_reduced(frame_data):
+    """frame_codec ingest path (plus the RGB conversion inference needs)"""
+    from frame_codec import decode_frame
+    frame, _, _ = decode_frame(frame_data)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def bench_decode(args):
+    """Per-frame decode time and peak allocation for uploaded data URLs"""
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    uploads = []
+    for frame in frames:
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        uploads.append("data:image/jpeg;base64," + base64.b64encode(buffer).decode('ascii'))
+
+    rows = []
+    for name, decode in (("legacy", _decode_legacy), ("reduced", _decode_reduced)):
+        decode(uploads[0])  # warm up
+
+        times = []
+        for upload in uploads:
+            start = time.perf_counter()
+            out = decode(upload)
+            times.append((time.perf_counter() - start) * 1000)
+
+        # Peak allocation for a single frame (numpy/OpenCV buffers are traced)
+        tracemalloc.start()
+        decode(uploads[-1])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows.append({
+            "path": name,
+            "output": f"{out.shape[1]}x{out.shape[0]}",
+            "mean_ms": f"{np.mean(times):.2f}",
+            "p95_ms": f"{percentile(times, 95):.2f}",
+            "peak_kb": f"{peak / 1024:.0f}",
+        })
+
+    print_table(rows, ["path", "output", "mean_ms", "p95_ms", "peak_kb"])
+
+
+# ---------------------------------------------------------------------------
+# preprocess: per-frame allocation of capture -> mirror -> RGB
+# ---------------------------------------------------------------------------
+
+def bench_preprocess(args):
+    """Transient allocation per streamed frame: legacy vs preallocated buffers"""
+    from frame_preprocess import FramePreprocessor
+
+    frames = load_frames(args.video, min(args.frames, 30), args.width, args.height)
+
+    def legacy(cap):
+        ret, frame = cap.read()
+        frame = cv2.flip(frame, 1)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def preallocated(flip_pixels):
+        pre = FramePreprocessor(mirror=True, flip_pixels=flip_pixels)
+
+        def step(cap):
+            ret, frame = pre.read(cap)
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=pre.rgb_buffer(frame))
+        return step
+
+    modes = (
+        ("legacy", legacy),
+        ("prealloc+flip", preallocated(True)),
+        ("prealloc+mirror-landmarks", preallocated(False)),
+    )
+
+    rows = []
+    for name, step in modes:
+        cap = ReplayCapture(frames)
+        for _ in range(3):
+            step(cap)  # first frames size the buffers
+
+        tracemalloc.start()
+        start_current, _ = tracemalloc.get_traced_memory()
+        transient = []
+        times = []
+        for _ in range(args.frames):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            step(cap)
+            times.append((time.perf_counter() - start) * 1000)
+            _, peak = tracemalloc.get_traced_memory()
+            transient.append(peak - before)
+        end_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        mb_per_frame = np.mean(transient) / (1024 * 1024)
+        rows.append({
+            "mode": name,
+            "alloc_mb_per_frame": f"{mb_per_frame:.2f}",
+            "alloc_mb_per_s@30fps": f"{mb_per_frame * 30:.1f}",
+            "net_growth_kb": f"{(end_current - start_current) / 1024:.1f}",
+            "mean_ms": f"{np.mean(times):.2f}",
+        })
+
+    print_table(rows, ["mode", "alloc_mb_per_frame", "alloc_mb_per_s@30fps", "net_growth_kb", "mean_ms"])
+
+
+# ---------------------------------------------------------------------------
+# live: synchronous Hands.process vs Tasks HandLandmarker LIVE_STREAM
+# ---------------------------------------------------------------------------
+
+def bench_live(args):
+    """Throughput and capture-to-result latency with frames arriving at camera rate"""
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    rgb_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+    interval = 1.0 / args.fps
+    rows = []
+
+    # Synchronous path: like the stream loop, the next capture waits for process()
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=1,
+                                     min_detection_confidence=0.6, min_tracking_confidence=0.5)
+    hands.process(rgb_frames[0])
+    latencies = []
+    start = time.perf_counter()
+    for i, rgb in enumerate(rgb_frames):
+        # Frame i is "captured" at start + i * interval, or now if we are behind
+        captured = max(start + i * interval, time.perf_counter())
+        while time.perf_counter() < captured:
+            time.sleep(0.0005)
+        hands.process(rgb)
+        latencies.append((time.perf_counter() - captured) * 1000)
+    elapsed = time.perf_counter() - start
+    hands.close()
+    rows.append({
+        "backend": "solutions (sync)",
+        "results_per_s": f"{len(latencies) / elapsed:.1f}",
+        "p50_ms": f"{percentile(latencies, 50):.1f}",
+        "p95_ms": f"{percentile(latencies, 95):.1f}",
+        "dropped": 0,
+    })
+
+    # Live-stream path: submit at camera rate, results come back on MediaPipe's thread
+    from tasks_backend import LiveStreamHandTracker
+    captured_at = {}
+    latencies = []
+
+    def on_result(results, timestamp_ms):
+        latencies.append((time.perf_counter() - captured_at[timestamp_ms]) * 1000)
+
+    tracker = LiveStreamHandTracker(on_result, model_path=args.model)
+    tracker.submit(rgb_frames[0])
+    time.sleep(0.5)
+    latencies.clear()
+    start = time.perf_counter()
+    for i, rgb in enumerate(rgb_frames):
+        captured = start + i * interval
+        while time.perf_counter() < captured:
+            time.sleep(0.0005)
+        timestamp_ms = tracker.next_timestamp_ms()
+        captured_at[timestamp_ms] = time.perf_counter()
+        tracker.submit(rgb, timestamp_ms)
+    elapsed = time.perf_counter() - start
+    time.sleep(1.0)  # let in-flight results drain
+    tracker.close()
+    rows.append({
+        "backend": "tasks (live stream)",
+        "results_per_s": f"{len(latencies) / elapsed:.1f}",
+        "p50_ms": f"{percentile(latencies, 50):.1f}",
+        "p95_ms": f"{percentile(latencies, 95):.1f}",
+        "dropped": len(rgb_frames) - len(latencies),
+    })
+
+    print_table(rows, ["backend", "results_per_s", "p50_ms", "p95_ms", "dropped"])
+
+
+# ---------------------------------------------------------------------------
+# record: turn a video into a landmark recording for the replay benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_record(args):
+    """Run Hands over --video and write a landmark recording (optionally labelled)"""
+    import mediapipe as mp
+    from landmarks import write_recording
+
+    if not args.video:
+        raise SystemExit("record needs --video")
+    cap = cv2.VideoCapture(args.video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=1,
+                                     min_detection_confidence=0.6, min_tracking_confidence=0.5)
+    samples = []
+    index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        hand, handedness = None, None
+        if results.multi_hand_landmarks:
+            hand = results.multi_hand_landmarks[0]
+            handedness = results.multi_handedness[0].classification[0].label.lower()
+        samples.append((index / fps, hand, handedness, args.label))
+        index += 1
+    cap.release()
+    hands.close()
+    write_recording(args.out, samples)
+    print(f"Wrote {len(samples)} samples to {args.out}")
+
+
+# ---------------------------------------------------------------------------
+# predict: vote-only direction vs motion-extrapolated prediction
+# ---------------------------------------------------------------------------
+
+def command_events(samples, detector, width, height):
+    """Replay a session through a detector; returns [(t, direction)] whenever the sent direction changes"""
+    events = []
+    last = None
+    for t, hand, _, _ in samples:
+        if hand is None:
+            continue
+        gesture = detector.detect_pointing_direction(hand, width, height, timestamp=t)
+        if gesture and gesture != last:
+            events.append((t, gesture))
+            last = gesture
+    return events
+
+
+def bench_predict(args):
+    """Latency gain and false-command rate of predictive mode on a recorded session"""
+    from direction_predictor import DirectionPredictor
+    from gestures import PointingGestureDetector
+
+    samples = load_session(args)
+    classic = command_events(samples, PointingGestureDetector(), args.width, args.height)
+
+    rows = []
+    for horizon in args.horizons:
+        predictor = DirectionPredictor(horizon_ms=horizon)
+        predictive = command_events(samples, PointingGestureDetector(predictor), args.width, args.height)
+
+        # Match each classic command with the earliest predictive command for
+        # the same direction since the previous classic command
+        gains = []
+        previous_t = -1.0
+        for t, direction in classic:
+            for pt, pdir in predictive:
+                if previous_t < pt <= t + 0.2 and pdir == direction:
+                    gains.append((t - pt) * 1000)
+                    break
+            previous_t = t
+
+        stats = predictor.stats()
+        rows.append({
+            "horizon_ms": horizon,
+            "commands": f"{len(predictive)} (vote: {len(classic)})",
+            "mean_gain_ms": f"{np.mean(gains):.1f}" if gains else "0.0",
+            "p50_gain_ms": f"{percentile(gains, 50):.1f}",
+            "predictions": stats["predictions"],
+            "false_rate": f"{stats['false_rate'] * 100:.1f}%",
+        })
+
+    print_table(rows, ["horizon_ms", "commands", "mean_gain_ms", "p50_gain_ms", "predictions", "false_rate"])
+
+
+# ---------------------------------------------------------------------------
+# classify: hand-tuned angle bands vs the trained softmax classifier
+# ---------------------------------------------------------------------------
+
+def decision_latencies(samples, events):
+    """Time from the start of each move to the first command for its new direction"""
+    latencies = []
+    move_start = None
+    previous_label = None
+    for t, _, _, label in samples:
+        if label is None:
+            if move_start is None:
+                move_start = t
+            continue
+        if label != previous_label and label != "NONE" and previous_label is not None:
+            start = move_start if move_start is not None else t
+            for et, direction in events:
+                if et >= start and direction == label:
+                    latencies.append((et - start) * 1000)
+                    break
+        previous_label = label
+        move_start = None
+    return latencies
+
+
+def bench_classify(args):
+    """Frame accuracy, decision latency and per-frame cost: rules vs learned classifier"""
+    from gesture_model import (CLASSES, LearnedGestureClassifier, SoftmaxClassifier,
+                               dataset_from_samples)
+    from gestures import PointingGestureDetector, angle_to_direction, pointing_vector
+    from landmarks import read_recording
+
+    if args.train:
+        train = []
+        for path in args.train:
+            train.extend(read_recording(path))
+    else:
+        train = synthetic_session(seconds=120, seed=0, rest_every=5, jitter=0.04)
+    test = read_recording(args.landmarks) if args.landmarks else \
+        synthetic_session(seed=1, rest_every=5, jitter=0.04)
+
+    X, y = dataset_from_samples(train, args.width, args.height)
+    learned = LearnedGestureClassifier(SoftmaxClassifier().fit(X, y))
+
+    def rule_label(hand):
+        vector = pointing_vector(hand, args.width, args.height)
+        if vector is None or (abs(vector[0]) <= 15 and abs(vector[1]) <= 15):
+            return "NONE"
+        return angle_to_direction(np.arctan2(vector[1], vector[0]) * 180 / np.pi)
+
+    def learned_label(hand):
+        direction, _ = learned.classify(hand, args.width, args.height)
+        return direction or "NONE"
+
+    labelled = [(hand, label) for _, hand, _, label in test if hand is not None and label in CLASSES]
+    rows = []
+    for name, label_fn, make_detector in (
+        ("rules + vote", rule_label, lambda: PointingGestureDetector()),
+        ("learned + vote", learned_label, lambda: PointingGestureDetector(classifier=learned, accept_confidence=1.1)),
+        (f"learned, accept>={args.accept}", learned_label,
+         lambda: PointingGestureDetector(classifier=learned, accept_confidence=args.accept)),
+    ):
+        correct = sum(label_fn(hand) == label for hand, label in labelled)
+
+        start = time.perf_counter()
+        for hand, _ in labelled:
+            label_fn(hand)
+        cost_us = (time.perf_counter() - start) / len(labelled) * 1e6
+
+        events = command_events(test, make_detector(), args.width, args.height)
+        latencies = decision_latencies(test, events)
+        rows.append({
+            "classifier": name,
+            "frame_accuracy": f"{correct / len(labelled) * 100:.1f}%",
+            "us_per_frame": f"{cost_us:.1f}",
+            "commands": len(events),
+            "decision_p50_ms": f"{percentile(latencies, 50):.1f}",
+            "decision_p95_ms": f"{percentile(latencies, 95):.1f}",
+        })
+
+    print_table(rows, ["classifier", "frame_accuracy", "us_per_frame", "commands",
+                       "decision_p50_ms", "decision_p95_ms"])
+
+
+# ---------------------------------------------------------------------------
+# engine: server-side snake games per core (bitmap engine vs list port)
+# ---------------------------------------------------------------------------
+
+class ListSnake:
+    """Direct port of the SnakeGameBoard.tsx loop (list body, linear scans, full-state send)"""
+
+    def __init__(self, grid_size=20, seed=None):
+        from snake_engine import MOVES
+        self.moves = MOVES
+        self.grid = grid_size
+        self.rng = np.random.default_rng(seed)
+        self.body = [(grid_size // 2, grid_size // 2)]
+        self.direction = "RIGHT"
+        self.apple = self._place_apple()
+        self.score = 0
+        self.over = None
+
+    def _place_apple(self):
+        while True:
+            apple = (int(self.rng.integers(self.grid)), int(self.rng.integers(self.grid)))
+            if apple not in self.body:
+                return apple
+
+    def steer(self, direction):
+        self.direction = direction
+
+    def step(self):
+        dx, dy = self.moves[self.direction]
+        hx, hy = self.body[0]
+        head = ((hx + dx) % self.grid, (hy + dy) % self.grid)
+        if any(segment == head for segment in self.body):
+            self.over = "collision"
+        else:
+            self.body = [head] + self.body
+            if head == self.apple:
+                self.score += 1
+                if len(self.body) >= self.grid * self.grid:
+                    self.over = "won"
+                else:
+                    self.apple = self._place_apple()
+            else:
+                self.body.pop()
+        return {"type": "snake_state", "body": self.body, "apple": self.apple,
+                "score": self.score, "over": self.over}
+
+    def occupied(self, x, y):
+        return (x, y) in self.body
+
+    def head_apple(self):
+        return self.body[0], self.apple
+
+
+def _engine_head_apple(game):
+    g = game.grid
+    return (game.body[0] % g, game.body[0] // g), (game.apple % g, game.apple // g)
+
+
+def snake_bot(game, head, apple, occupied):
+    """Greedy player: head for the apple, avoid cells that end the game"""
+    from snake_engine import MOVES, OPPOSITE
+    g = game.grid
+    options = []
+    for direction, (dx, dy) in MOVES.items():
+        if direction == OPPOSITE[game.direction]:
+            continue
+        x, y = (head[0] + dx) % g, (head[1] + dy) % g
+        if occupied(x, y):
+            continue
+        distance = min(abs(x - apple[0]), g - abs(x - apple[0])) + min(abs(y - apple[1]), g - abs(y - apple[1]))
+        options.append((distance, direction))
+    return min(options)[1] if options else game.direction
+
+
+def bench_engine(args):
+    """Per-tick cost of many concurrent games, including delta serialization"""
+    import json
+    from snake_engine import SnakeGame
+
+    def run(make, head_apple, occupied_fn, games):
+        pool = [make(i) for i in range(games)]
+        step_s = 0.0
+        bytes_sent = 0
+        lengths = []
+        for _ in range(args.ticks):
+            for i, game in enumerate(pool):
+                if game.over is not None:
+                    lengths.append(len(game.body))
+                    pool[i] = game = make(i + games)
+                head, apple = head_apple(game)
+                game.steer(snake_bot(game, head, apple, occupied_fn(game)))
+            start = time.perf_counter()
+            for game in pool:
+                bytes_sent += len(json.dumps(game.step()))
+            step_s += time.perf_counter() - start
+        lengths.extend(len(game.body) for game in pool)
+        tick_ms = step_s / args.ticks * 1000
+        return tick_ms, bytes_sent / (args.ticks * games), float(np.mean(lengths))
+
+    engines = (
+        ("list port", lambda i: ListSnake(args.grid, seed=i), ListSnake.head_apple,
+         lambda game: game.occupied),
+        ("bitmap engine", lambda i: SnakeGame(args.grid, seed=i), _engine_head_apple,
+         lambda game: (lambda x, y: game.cells[y * game.grid + x])),
+    )
+    rows = []
+    for games in args.games:
+        for name, make, head_apple, occupied_fn in engines:
+            tick_ms, bytes_per_game, mean_length = run(make, head_apple, occupied_fn, games)
+            per_game_us = tick_ms * 1000 / games
+            rows.append({
+                "engine": name,
+                "games": games,
+                "tick_cost_ms": f"{tick_ms:.2f}",
+                "us_per_game": f"{per_game_us:.1f}",
+                "bytes_per_delta": f"{bytes_per_game:.0f}",
+                "mean_length": f"{mean_length:.0f}",
+                # Games one core can advance inside a tick of --tick-ms
+                "games_per_core": f"{args.tick_ms * 1000 / per_game_us:.0f}",
+            })
+    print_table(rows, ["engine", "games", "tick_cost_ms", "us_per_game", "bytes_per_delta",
+                       "mean_length", "games_per_core"])
+
+
+# ---------------------------------------------------------------------------
+# preview: camera_frame JSON/base64 vs MJPEG parts for the same JPEG
+# ---------------------------------------------------------------------------
+
+def bench_preview(args):
+    """Bytes on the wire and per-frame wrap/unwrap cost of both preview paths"""
+    import json
+    from preview_stream import BOUNDARY
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    jpegs = [cv2.imencode('.jpg', f, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes() for f in frames]
+
+    def ws_server(jpeg):
+        return json.dumps({"type": "camera_frame",
+                           "frame": "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("utf-8"),
+                           "timestamp": time.time()})
+
+    def ws_client(message):
+        # What the page does before an <img> can decode: JSON.parse + base64 decode
+        data = json.loads(message)["frame"]
+        return base64.b64decode(data[data.index(",") + 1:])
+
+    def mjpeg_server(jpeg):
+        return (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n").encode("ascii") + jpeg + b"\r\n"
+
+    def mjpeg_client(part):
+        # The browser's multipart parser only has to find the header end
+        return part[part.index(b"\r\n\r\n") + 4:-2]
+
+    rows = []
+    for name, server_fn, client_fn in (("websocket json/base64", ws_server, ws_client),
+                                       ("mjpeg multipart", mjpeg_server, mjpeg_client)):
+        start = time.perf_counter()
+        wire = [server_fn(j) for j in jpegs]
+        server_us = (time.perf_counter() - start) / len(jpegs) * 1e6
+        start = time.perf_counter()
+        for message in wire:
+            client_fn(message)
+        client_us = (time.perf_counter() - start) / len(jpegs) * 1e6
+        size = sum(len(m) for m in wire) / len(wire)
+        rows.append({
+            "path": name,
+            "bytes_per_frame": f"{size:.0f}",
+            "kB_per_s_at_15fps": f"{size * 15 / 1024:.0f}",
+            "server_wrap_us": f"{server_us:.0f}",
+            "client_unwrap_us": f"{client_us:.0f}",
+        })
+    print(f"JPEG payload: {sum(len(j) for j in jpegs) / len(jpegs):.0f} bytes per frame "
+          f"(decoded natively by the browser on both paths)")
+    print_table(rows, ["path", "bytes_per_frame", "kB_per_s_at_15fps", "server_wrap_us", "client_unwrap_us"])
+
+
+# ---------------------------------------------------------------------------
+# capture: achieved fps and capture-to-read latency per capture source
+# ---------------------------------------------------------------------------
+
+def bench_capture(args):
+    """Read every source for --seconds; cameras are tried with each --fourcc"""
+    import os
+    import tempfile
+    from capture import open_capture
+
+    tmp = tempfile.mkdtemp(prefix="kinsnake_capture_")
+    sources = args.sources
+    if not sources:
+        # Recording and image sequence built from the benchmark frames
+        frames = load_frames(args.video, 60, args.width, args.height)
+        video_path = os.path.join(tmp, "clip.avi")
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), args.fps,
+                                 (args.width, args.height))
+        for i, frame in enumerate(frames):
+            writer.write(frame)
+            cv2.imwrite(os.path.join(tmp, f"frame_{i:04d}.jpg"), frame)
+        writer.release()
+        sources = ["synthetic", f"file:{video_path}", f"images:{os.path.join(tmp, '*.jpg')}"]
+
+    rows = []
+    for source in sources:
+        is_camera = not source.startswith(("synthetic", "file:", "images:"))
+        for fourcc in (args.fourcc if is_camera else [None]):
+            if fourcc is not None:
+                os.environ["KINSNAKE_CAMERA_FOURCC"] = "" if fourcc == "default" else fourcc
+            cap = open_capture(source, args.width, args.height, args.fps)
+            if not cap.isOpened():
+                rows.append({"source": source, "fourcc_req": fourcc or "", "granted": "failed to open"})
+                continue
+
+            ret, image = cap.read()  # First frame (device start-up) is not counted
+            read_ms, latency_ms = [], []
+            frames_read = 0
+            start = time.perf_counter()
+            while ret and time.perf_counter() - start < args.seconds:
+                t0 = time.perf_counter()
+                ret, image = cap.read(image)
+                read_ms.append((time.perf_counter() - t0) * 1000)
+                if cap.last_capture_time is not None:
+                    latency_ms.append((time.monotonic() - cap.last_capture_time) * 1000)
+                frames_read += ret
+            elapsed = time.perf_counter() - start
+            granted = cap.granted
+            cap.release()
+
+            rows.append({
+                "source": source if len(source) < 40 else source.split(":")[0] + ":...",
+                "fourcc_req": fourcc or "",
+                "granted": f"{granted.get('fourcc') or '-'} {granted['width']}x{granted['height']}@{granted['fps']:g}",
+                "fps": f"{frames_read / elapsed:.1f}",
+                "read_p50_ms": f"{percentile(read_ms, 50):.1f}",
+                "latency_p50_ms": f"{percentile(latency_ms, 50):.1f}" if latency_ms else "n/a",
+                "latency_p95_ms": f"{percentile(latency_ms, 95):.1f}" if latency_ms else "n/a",
+            })
+    print_table(rows, ["source", "fourcc_req", "granted", "fps", "read_p50_ms",
+                       "latency_p50_ms", "latency_p95_ms"])
+
+
+# ---------------------------------------------------------------------------
+# gate: motion gate skip rate, CPU saved and gesture delay
+# ---------------------------------------------------------------------------
+
+def synthetic_static_frames(count, width=1280, height=720, fps=30.0, still_s=1.5, move_s=0.5, seed=0):
+    """Mostly-still scene with sensor noise: the blob rests, then moves, then rests again"""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(20, 60, size=(height, width, 3), dtype=np.uint8)
+    noise = [rng.integers(0, 4, size=(height, width, 3), dtype=np.uint8) for _ in range(6)]
+    frames = []
+    x = 0.3
+    for i in range(count):
+        t = i / fps % (still_s + move_s)
+        if t >= still_s:
+            x = 0.3 + 0.4 * ((i // int((still_s + move_s) * fps)) % 2) + (0.4 / (move_s * fps)) * \
+                (1 if (i // int((still_s + move_s) * fps)) % 2 == 0 else -1) * (t - still_s) * fps
+        frame = cv2.add(base, noise[i % len(noise)])
+        cv2.circle(frame, (int(width * x), height // 2), height // 8, (180, 200, 220), -1)
+        frames.append(frame)
+    return frames
+
+
+def bench_gate(args):
+    """Always-infer vs gated inference on the same frames (Hands + pointing detector)"""
+    import mediapipe as mp
+    from gestures import PointingGestureDetector
+    from motion_gate import MotionGate
+
+    if args.video:
+        frames = load_frames(args.video, args.frames, args.width, args.height)
+    else:
+        frames = synthetic_static_frames(args.frames, args.width, args.height, args.fps)
+    frame_s = 1.0 / args.fps
+
+    def run(gate):
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=1,
+                                         min_detection_confidence=0.6, min_tracking_confidence=0.5)
+        detector = PointingGestureDetector()
+        rgb = None
+        results = None
+        commands = []  # (frame index, direction) whenever the decided direction changes
+        last = None
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for i, frame in enumerate(frames):
+            t = i * frame_s
+            if gate is None or gate.should_infer(frame, t) or results is None:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+                results = hands.process(rgb)
+                if gate is not None:
+                    gate.inferred(t)
+            gesture = None
+            if results.multi_hand_landmarks:
+                gesture = detector.detect_pointing_direction(results.multi_hand_landmarks[0],
+                                                             frame.shape[1], frame.shape[0], t)
+            if gesture and gesture != last:
+                commands.append((i, gesture))
+                last = gesture
+        cpu_ms = (time.process_time() - cpu_start) / len(frames) * 1000
+        wall_ms = (time.perf_counter() - wall_start) / len(frames) * 1000
+        hands.close()
+        return cpu_ms, wall_ms, commands
+
+    base_cpu, base_wall, base_commands = run(None)
+    rows = [{"mode": "always infer", "skipped": "0%", "cpu_ms_per_frame": f"{base_cpu:.2f}",
+             "wall_ms_per_frame": f"{base_wall:.2f}", "commands": len(base_commands),
+             "delay_p50_ms": "-", "delay_max_ms": "-", "missed": "-"}]
+
+    for refresh_ms in args.refresh:
+        gate = MotionGate(threshold=args.threshold, min_refresh_s=refresh_ms / 1000)
+        cpu, wall, commands = run(gate)
+
+        # Match each baseline command to the first gated command of the same direction at or after it
+        delays, missed, j = [], 0, 0
+        for index, direction in base_commands:
+            while j < len(commands) and commands[j][0] < index:
+                j += 1
+            match = next((c for c in commands[j:j + 3] if c[1] == direction), None)
+            if match is None:
+                missed += 1
+            else:
+                delays.append((match[0] - index) * frame_s * 1000)
+        stats = gate.stats()
+        rows.append({
+            "mode": f"gated, refresh {refresh_ms:.0f} ms",
+            "skipped": f"{stats['skip_rate'] * 100:.0f}%",
+            "cpu_ms_per_frame": f"{cpu:.2f}",
+            "wall_ms_per_frame": f"{wall:.2f}",
+            "commands": len(commands),
+            "delay_p50_ms": f"{percentile(delays, 50):.0f}",
+            "delay_max_ms": f"{max(delays):.0f}" if delays else "0",
+            "missed": missed,
+        })
+    print(f"Gate check: {gate.stats()['gate_us']:.0f} us per frame")
+    print_table(rows, ["mode", "skipped", "cpu_ms_per_frame", "wall_ms_per_frame", "commands",
+                       "delay_p50_ms", "delay_max_ms", "missed"])
+
+
+def bench_players(args):
+    """One player per Hands graph vs two players sharing one max_num_hands=2 graph"""
+    import mediapipe as mp
+    from gestures import PointingGestureDetector
+    from landmarks import Handedness, HandResults
+    from players import Player, assign_hands
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+
+    def inference_ms(max_num_hands):
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_num_hands,
+                                         model_complexity=1, min_detection_confidence=0.6,
+                                         min_tracking_confidence=0.5)
+        rgb = None
+        found = 0
+        times = []
+        for frame in frames:
+            start = time.perf_counter()
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            results = hands.process(rgb)
+            times.append((time.perf_counter() - start) * 1000)
+            found += len(results.multi_hand_landmarks or [])
+        hands.close()
+        return percentile(times, 50), percentile(times, 95), found / len(frames)
+
+    # Decision stage on synthetic two-hand frames: P1 left half pointing up, P2 right half pointing right
+    rng = np.random.default_rng(0)
+    two_hands = [HandResults([
+        (synthetic_hand(-90, args.width, args.height, cx=0.25, jitter=0.02, rng=rng), Handedness("Left")),
+        (synthetic_hand(0, args.width, args.height, cx=0.75, jitter=0.02, rng=rng), Handedness("Right")),
+    ]) for _ in range(args.frames)]
+
+    def decision_us(mode):
+        players = [Player(1, "left", PointingGestureDetector(), None),
+                   Player(2, "right", PointingGestureDetector(), None)]
+        times = []
+        decided = {1: None, 2: None}
+        for i, results in enumerate(two_hands):
+            t = i / 30.0
+            start = time.perf_counter()
+            if mode == "single":
+                decided[1] = players[0].detector.detect_pointing_direction(
+                    results.multi_hand_landmarks[0], args.width, args.height, t) or decided[1]
+            else:
+                assigned = assign_hands(results, players, mode)
+                for player in players:
+                    if assigned[player.id] is not None:
+                        gesture = player.detector.detect_pointing_direction(
+                            assigned[player.id], args.width, args.height, t)
+                        decided[player.id] = gesture or decided[player.id]
+            times.append((time.perf_counter() - start) * 1e6)
+        return percentile(times, 50), decided
+
+    rows = []
+    for label, max_hands, players in (("1 player, max_num_hands=1", 1, 1),
+                                      ("2 players, shared graph", 2, 2)):
+        p50, p95, hands_per_frame = inference_ms(max_hands)
+        mode = "single" if players == 1 else args.assign
+        decide_us, decided = decision_us(mode)
+        rows.append({
+            "setup": label,
+            "infer_p50_ms": f"{p50:.2f}",
+            "infer_p95_ms": f"{p95:.2f}",
+            "infer_ms_per_player": f"{p50 / players:.2f}",
+            "hands_per_frame": f"{hands_per_frame:.2f}",
+            "decide_us": f"{decide_us:.0f}",
+            "decided": " ".join(f"P{k}={v}" for k, v in decided.items() if k <= players),
+        })
+    print(f"Two-player assignment: {args.assign}")
+    print_table(rows, ["setup", "infer_p50_ms", "infer_p95_ms", "infer_ms_per_player",
+                       "hands_per_frame", "decide_us", "decided"])
+
+
+def bench_ingest(args):
+    """Server-side cost per upload: JPEG frame (decode + Hands) vs browser-tracked landmarks"""
+    import json
+    import mediapipe as mp
+    from frame_codec import decode_frame
+    from gestures import PointingGestureDetector
+    from landmarks import pack_landmark_packet, results_from_json, unpack_landmark_packet
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    frame_messages = []
+    for frame in frames:
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        frame_messages.append(json.dumps({"type": "frame", "frame": "data:image/jpeg;base64,"
+                                          + base64.b64encode(buffer).decode('ascii')}))
+    hands_points = []
+    for i in range(args.frames):
+        hand = synthetic_hand((i // 8) * 90 % 360 - 90, args.width, args.height)
+        hands_points.append([[lm.x, lm.y, lm.z] for lm in hand.landmark])
+    json_messages = [json.dumps({"type": "landmarks", "width": args.width, "height": args.height,
+                                 "hands": [{"points": p, "handedness": "Right", "score": 0.9}]})
+                     for p in hands_points]
+    binary_messages = [pack_landmark_packet([(p, "Right", 0.9)], args.width, args.height)
+                       for p in hands_points]
+
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=1,
+                                     min_detection_confidence=0.6, min_tracking_confidence=0.5)
+
+    def frame_path(message, detector):
+        frame, width, height = decode_frame(json.loads(message)["frame"])
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            return detector.detect_pointing_direction(results.multi_hand_landmarks[0], width, height)
+        return None
+
+    def json_path(message, detector):
+        data = json.loads(message)
+        results = results_from_json(data["hands"])
+        return detector.detect_pointing_direction(results.multi_hand_landmarks[0], data["width"], data["height"])
+
+    def binary_path(message, detector):
+        results, width, height, _, _, _ = unpack_landmark_packet(message)
+        return detector.detect_pointing_direction(results.multi_hand_landmarks[0], width, height)
+
+    rows = []
+    for name, handle, messages in (("frame (decode + Hands)", frame_path, frame_messages),
+                                   ("landmarks JSON", json_path, json_messages),
+                                   ("landmarks binary", binary_path, binary_messages)):
+        detector = PointingGestureDetector()
+        handle(messages[0], detector)  # Warm up
+        times = []
+        decided = 0
+        for message in messages:
+            start = time.perf_counter()
+            decided += handle(message, detector) is not None
+            times.append((time.perf_counter() - start) * 1e6)
+        mean_us = float(np.mean(times))
+        rows.append({
+            "upload": name,
+            "bytes": f"{np.mean([len(m) for m in messages]):.0f}",
+            "mean_us": f"{mean_us:.0f}",
+            "p95_us": f"{percentile(times, 95):.0f}",
+            "uploads_per_core_s": f"{1e6 / mean_us:.0f}",
+            "decided": f"{decided}/{len(messages)}",
+        })
+    hands.close()
+    print_table(rows, ["upload", "bytes", "mean_us", "p95_us", "uploads_per_core_s", "decided"])
+
+
+def _ring_consumer(name, count, results):
+    """Stand-in controller: drain the command ring, wait on its wake-up in between"""
+    from command_ring import CommandRing
+
+    ring = CommandRing(name, create=False)
+    ring.attach()
+    handoff_us = []
+    while len(handoff_us) < count:
+        command = ring.pop()
+        if command is None:
+            ring.wait(0.1)
+            continue
+        handoff_us.append((time.perf_counter_ns() - command[3]) / 1000)
+    ring.detach()
+    ring.close()
+    results.put(handoff_us)
+
+
+def _pipe_consumer(path, count, results):
+    """Stand-in controller: accept a connection, read lines until the writer closes, repeat"""
+    handoff_us = []
+
+    def consume(data):
+        for line in data.decode().splitlines():
+            if line:
+                handoff_us.append((time.perf_counter_ns() - int(line.split()[1])) / 1000)
+
+    if sys.platform.startswith("win"):
+        import _winapi
+        while len(handoff_us) < count:
+            handle = _winapi.CreateNamedPipe(
+                path, _winapi.PIPE_ACCESS_DUPLEX,
+                _winapi.PIPE_TYPE_MESSAGE | _winapi.PIPE_READMODE_MESSAGE | _winapi.PIPE_WAIT,
+                _winapi.PIPE_UNLIMITED_INSTANCES, 256, 256, 0, _winapi.NULL)
+            _winapi.ConnectNamedPipe(handle, False)
+            while True:
+                try:
+                    data, _ = _winapi.ReadFile(handle, 256)
+                except OSError:
+                    break  # Writer closed
+                consume(data)
+            _winapi.CloseHandle(handle)
+    else:
+        # FIFO: open blocks until the producer opens it, like ConnectNamedPipe
+        while len(handoff_us) < count:
+            with open(path, "rb", buffering=0) as fifo:
+                while True:
+                    data = fifo.read(256)
+                    if not data:
+                        break
+                    consume(data)
+    results.put(handoff_us)
+
+
+def bench_channel(args):
+    """Command handoff latency: per-command named pipe vs shared-memory ring"""
+    import multiprocessing as mp_
+    import os
+    import tempfile
+    from command_ring import CommandRing
+
+    directions = ["UP", "RIGHT", "DOWN", "LEFT"]
+    interval = 1.0 / args.rate
+    rows = []
+
+    for channel in ("pipe", "ring"):
+        results = mp_.Queue()
+        send_us = []
+        if channel == "ring":
+            ring = CommandRing(f"kinsnake_bench_{os.getpid()}", capacity=64)
+            consumer = mp_.Process(target=_ring_consumer, args=(ring.name, args.commands, results))
+            consumer.start()
+            while not ring.consumer_alive():
+                time.sleep(0.01)
+
+            def send(direction, stamp):
+                ring.push(direction, timestamp_ns=stamp)
+        else:
+            if sys.platform.startswith("win"):
+                path = rf"\\.\pipe\kinsnake_bench_{os.getpid()}"
+            else:
+                path = os.path.join(tempfile.gettempdir(), f"kinsnake_bench_{os.getpid()}.fifo")
+                os.mkfifo(path)
+            consumer = mp_.Process(target=_pipe_consumer, args=(path, args.commands, results))
+            consumer.start()
+
+            def send(direction, stamp):
+                # Same open/write/close cycle as HandTrackingServer.send_to_controller
+                while True:
+                    try:
+                        with open(path, "w", buffering=1) as pipe:
+                            pipe.write(f"{direction} {stamp}\n")
+                            pipe.flush()
+                        return
+                    except (FileNotFoundError, OSError):
+                        if not sys.platform.startswith("win"):
+                            raise
+                        time.sleep(0.0005)  # Between pipe instances (the C loop also has gaps)
+
+        time.sleep(0.2)
+        next_at = time.perf_counter()
+        for i in range(args.commands):
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+            stamp = time.perf_counter_ns()
+            send(directions[i % 4], stamp)
+            send_us.append((time.perf_counter_ns() - stamp) / 1000)
+
+        handoff_us = results.get(timeout=30)
+        consumer.join(timeout=5)
+        if channel == "ring":
+            dropped = ring.dropped
+            ring.close()
+            ring.unlink()
+        else:
+            dropped = 0
+            if not sys.platform.startswith("win"):
+                os.unlink(path)
+
+        rows.append({
+            "channel": channel if channel == "ring" else "pipe (open per command)",
+            "commands": len(handoff_us),
+            "dropped": dropped,
+            "send_p50_us": f"{percentile(send_us, 50):.1f}",
+            "send_p99_us": f"{percentile(send_us, 99):.1f}",
+            "handoff_p50_us": f"{percentile(handoff_us, 50):.1f}",
+            "handoff_p95_us": f"{percentile(handoff_us, 95):.1f}",
+            "handoff_p99_us": f"{percentile(handoff_us, 99):.1f}",
+        })
+    print(f"{args.commands} commands at {args.rate:.0f}/s to a local stand-in consumer process")
+    print_table(rows, ["channel", "commands", "dropped", "send_p50_us", "send_p99_us",
+                       "handoff_p50_us", "handoff_p95_us", "handoff_p99_us"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KinSnake backend benchmarks")
+    parser.add_argument("--video", help="Recorded session to use instead of synthetic frames")
+    parser.add_argument("--frames", type=int, default=120, help="Frames per run")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("inference", help="In-process Hands vs multi-process inference pool")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    p.set_defaults(func=bench_inference)
+
+    p = sub.add_parser("decode", help="Uploaded frame decode: legacy vs reduced-resolution")
+    p.set_defaults(func=bench_decode)
+
+    p = sub.add_parser("preprocess", help="Per-frame allocation of capture/mirror/RGB preprocessing")
+    p.set_defaults(func=bench_preprocess)
+
+    p = sub.add_parser("live", help="Synchronous Hands vs Tasks HandLandmarker live-stream")
+    p.add_argument("--model", default="hand_landmarker.task", help="Path to hand_landmarker.task")
+    p.add_argument("--fps", type=float, default=30.0, help="Simulated camera rate")
+    p.set_defaults(func=bench_live)
+
+    p = sub.add_parser("record", help="Write a landmark recording from --video")
+    p.add_argument("--out", required=True, help="Output .jsonl path")
+    p.add_argument("--label", help="Ground-truth direction for every frame (for training data)")
+    p.set_defaults(func=bench_record)
+
+    p = sub.add_parser("predict", help="Vote-only vs predictive direction on a landmark session")
+    p.add_argument("--landmarks", help="Recording from `bench.py record` (default: synthetic session)")
+    p.add_argument("--horizons", type=float, nargs="+", default=[40, 60, 90])
+    p.set_defaults(func=bench_predict)
+
+    p = sub.add_parser("classify", help="Angle-band rules vs trained classifier on a labelled session")
+    p.add_argument("--train", nargs="+", help="Labelled recordings to train on (default: synthetic)")
+    p.add_argument("--landmarks", help="Labelled recording to evaluate on (default: synthetic)")
+    p.add_argument("--accept", type=float, default=0.7, help="Confidence that skips the vote")
+    p.set_defaults(func=bench_classify)
+
+    p = sub.add_parser("engine", help="Server-side snake games per core: bitmap engine vs list port")
+    p.add_argument("--games", type=int, nargs="+", default=[100, 500, 1000])
+    p.add_argument("--ticks", type=int, default=300)
+    p.add_argument("--grid", type=int, default=20)
+    p.add_argument("--tick-ms", type=float, default=150.0, help="Tick the capacity estimate is for")
+    p.set_defaults(func=bench_engine)
+
+    p = sub.add_parser("preview", help="Camera preview: WebSocket JSON/base64 vs MJPEG stream")
+    p.set_defaults(func=bench_preview)
+
+    p = sub.add_parser("capture", help="Achieved fps and capture-to-read latency per capture source")
+    p.add_argument("--sources", nargs="+",
+                   help="Capture sources, e.g. 0 v4l2:/dev/video0 (default: synthetic, file, images)")
+    p.add_argument("--fourcc", nargs="+", default=["MJPG", "YUYV"], help="Formats to try on cameras")
+    p.add_argument("--fps", type=float, default=30.0, help="Requested frame rate")
+    p.add_argument("--seconds", type=float, default=5.0, help="Read time per source")
+    p.set_defaults(func=bench_capture)
+
+    p = sub.add_parser("gate", help="Motion gate: skipped frames, CPU saved, gesture delay")
+    p.add_argument("--threshold", type=float, default=2.0, help="Motion score below which frames are skipped")
+    p.add_argument("--refresh", type=float, nargs="+", default=[250, 500], help="Minimum refresh intervals (ms)")
+    p.add_argument("--fps", type=float, default=30.0, help="Frame rate of the session")
+    p.set_defaults(func=bench_gate)
+
+    p = sub.add_parser("players", help="Per-player cost: one graph per player vs a shared two-hand graph")
+    p.add_argument("--assign", choices=["halves", "handedness"], default="halves",
+                   help="How hands are assigned to players")
+    p.set_defaults(func=bench_players)
+
+    p = sub.add_parser("ingest", help="Server cost per upload: JPEG frame vs browser-tracked landmarks")
+    p.set_defaults(func=bench_ingest)
+
+    p = sub.add_parser("channel", help="Controller command handoff: named pipe vs shared-memory ring")
+    p.add_argument("--commands", type=int, default=500)
+    p.add_argument("--rate", type=float, default=50.0, help="Commands per second")
+    p.set_defaults(func=bench_channel)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
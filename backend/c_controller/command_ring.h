@@ -0,0 +1,132 @@
+// Shared-memory command ring (consumer side)
+// Same layout as backend/command_ring.py: the Python server creates the
+// named mapping "Local\<name>" and the auto-reset event "Local\<name>_wake",
+// pushes fixed-size records and signals; the controller pops them here.
+// The controller stamps consumer_heartbeat_ns every loop; the server only
+// uses the ring while that stamp is fresh, and on attach the controller
+// skips commands a previous (crashed) instance left unread.
+#ifndef COMMAND_RING_H
+#define COMMAND_RING_H
+
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include <windows.h>
+
+#define KS_RING_MAGIC   0x4252534Bu  // "KSRB"
+#define KS_RING_VERSION 2u
+
+enum {
+    KS_DIR_NONE = 0,
+    KS_DIR_UP = 1,
+    KS_DIR_DOWN = 2,
+    KS_DIR_LEFT = 3,
+    KS_DIR_RIGHT = 4
+};
+
+typedef struct {
+    uint64_t seq;
+    uint64_t timestamp_ns;  // QueryPerformanceCounter in ns (Python time.perf_counter_ns)
+    uint8_t direction;      // KS_DIR_*
+    uint8_t player;
+    uint8_t reserved[14];
+} ks_command_t;             // 32 bytes
+
+typedef struct {
+    uint32_t magic;
+    uint32_t version;
+    uint32_t capacity;      // Power of 2
+    uint32_t record_size;
+    volatile uint64_t consumer_heartbeat_ns;  // ks_now_ns() of the last consumer loop, 0 = detached
+    uint8_t pad0[40];
+    volatile uint64_t write_seq;  // Producer line
+    volatile uint64_t dropped;
+    uint8_t pad1[48];
+    volatile uint64_t read_seq;   // Consumer line
+    uint8_t pad2[56];
+    ks_command_t records[];       // Offset 192
+} ks_ring_t;
+
+typedef struct {
+    HANDLE mapping;
+    HANDLE wake;
+    ks_ring_t *ring;
+    char name[128];
+} ks_ring_handle_t;
+
+static const char *ks_direction_name(uint8_t code) {
+    static const char *names[] = {"NONE", "UP", "DOWN", "LEFT", "RIGHT"};
+    return code <= KS_DIR_RIGHT ? names[code] : "NONE";
+}
+
+static uint64_t ks_now_ns(void) {
+    static LARGE_INTEGER freq;
+    LARGE_INTEGER now;
+    if (freq.QuadPart == 0) QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&now);
+    return (uint64_t)((double)now.QuadPart * 1e9 / (double)freq.QuadPart);
+}
+
+// Consumer liveness stamp (same clock as the records' timestamps)
+static void ks_ring_heartbeat(ks_ring_handle_t *h) {
+    h->ring->consumer_heartbeat_ns = ks_now_ns();
+}
+
+// Open the server's ring; returns 0 on success (the server may not have created it yet)
+static int ks_ring_open(ks_ring_handle_t *h, const char *name) {
+    char path[160];
+    memset(h, 0, sizeof(*h));
+    snprintf(h->name, sizeof(h->name), "%s", name);
+
+    snprintf(path, sizeof(path), "Local\\%s", name);
+    h->mapping = OpenFileMappingA(FILE_MAP_ALL_ACCESS, FALSE, path);
+    if (h->mapping == NULL) return -1;
+    h->ring = (ks_ring_t *)MapViewOfFile(h->mapping, FILE_MAP_ALL_ACCESS, 0, 0, 0);
+    if (h->ring == NULL || h->ring->magic != KS_RING_MAGIC || h->ring->version != KS_RING_VERSION
+            || h->ring->record_size != sizeof(ks_command_t)) {
+        if (h->ring) UnmapViewOfFile(h->ring);
+        CloseHandle(h->mapping);
+        memset(h, 0, sizeof(*h));
+        return -2;
+    }
+
+    snprintf(path, sizeof(path), "Local\\%s_wake", name);
+    h->wake = CreateEventA(NULL, FALSE, FALSE, path);  // Opens the server's event if it exists
+    // Directions queued for a previous controller are stale: start at the producer's line
+    h->ring->read_seq = h->ring->write_seq;
+    MemoryBarrier();
+    ks_ring_heartbeat(h);
+    return 0;
+}
+
+// Pop the next command; returns 1 if one was read
+static int ks_ring_pop(ks_ring_handle_t *h, ks_command_t *out) {
+    ks_ring_t *ring = h->ring;
+    uint64_t read = ring->read_seq;
+    uint64_t write = ring->write_seq;
+    MemoryBarrier();  // Read write_seq before the record it publishes
+    if (read == write) return 0;
+    *out = ring->records[read & (ring->capacity - 1)];
+    MemoryBarrier();  // Finish copying before freeing the slot
+    ring->read_seq = read + 1;
+    return 1;
+}
+
+// Wait for the producer's wake-up (or timeout), then heartbeat
+static void ks_ring_wait(ks_ring_handle_t *h, DWORD timeout_ms) {
+    if (h->wake) WaitForSingleObject(h->wake, timeout_ms);
+    else Sleep(1);
+    ks_ring_heartbeat(h);
+}
+
+static void ks_ring_close(ks_ring_handle_t *h) {
+    if (h->ring) {
+        h->ring->consumer_heartbeat_ns = 0;
+        UnmapViewOfFile(h->ring);
+    }
+    if (h->mapping) CloseHandle(h->mapping);
+    if (h->wake) CloseHandle(h->wake);
+    memset(h, 0, sizeof(*h));
+}
+
+#endif
@@ -4,6 +4,7 @@
 #include <windows.h>
 #include <process.h>
 #include <time.h>
+#include "command_ring.h"
 
 // Global control
 volatile int running = 1;
@@ -15,6 +16,7 @@ typedef struct {
     double threshold;
     int fps;
     char *pipe_path;
+    char *ring_name;
     int debug;
 } config_t;
 
@@ -22,6 +24,8 @@ typedef struct {
 BOOL WINAPI console_handler(DWORD ctrl_type);
 void log_command(const char *command, const char *action);
 void execute_game_command(const char *command, char *response);
+void execute_direction_code(uint8_t code, uint8_t player);
+unsigned __stdcall ring_consumer(void *arg);
 void print_usage(const char *prog_name);
 config_t parse_arguments(int argc, char *argv[]);
 
@@ -79,6 +83,54 @@ void execute_game_command(const char *command, char *response) {
     }
 }
 
+// Execute a ring command (direction code, no string parsing)
+void execute_direction_code(uint8_t code, uint8_t player) {
+    switch (code) {
+        case KS_DIR_UP:
+        case KS_DIR_DOWN:
+        case KS_DIR_LEFT:
+        case KS_DIR_RIGHT:
+            log_command(ks_direction_name(code), "executed (ring)");
+            printf("[GAME] P%u moving %s\n", (unsigned)(player ? player : 1), ks_direction_name(code));
+            break;
+        default:
+            log_command("?", "unknown (ring)");
+            printf("[GAME] Unknown direction code: %u\n", (unsigned)code);
+    }
+}
+
+// Shared-memory ring consumer thread (runs next to the pipe server)
+unsigned __stdcall ring_consumer(void *arg) {
+    config_t *config = (config_t *)arg;
+    ks_ring_handle_t ring;
+    ks_command_t command;
+
+    while (running) {
+        // The server creates the ring; keep trying until it exists
+        if (ks_ring_open(&ring, config->ring_name) != 0) {
+            Sleep(500);
+            continue;
+        }
+        printf("[CONTROLLER] Ring attached: %s (%u slots)\n", config->ring_name, ring.ring->capacity);
+
+        while (running) {
+            if (!ks_ring_pop(&ring, &command)) {
+                ks_ring_wait(&ring, 100);  // Heartbeats too
+                continue;
+            }
+            ks_ring_heartbeat(&ring);  // Busy draining: still alive
+            if (config->debug) {
+                printf("[CONTROLLER] << Ring #%llu: %s (%.1f us handoff)\n",
+                       (unsigned long long)command.seq, ks_direction_name(command.direction),
+                       (double)(ks_now_ns() - command.timestamp_ns) / 1000.0);
+            }
+            execute_direction_code(command.direction, command.player);
+        }
+        ks_ring_close(&ring);
+    }
+    return 0;
+}
+
 // Parse arguments
 config_t parse_arguments(int argc, char *argv[]) {
     config_t config = {
@@ -86,6 +138,7 @@ config_t parse_arguments(int argc, char *argv[]) {
         .threshold = 0.5,
         .fps = 30,
         .pipe_path = "\\\\.\\pipe\\vcgi_pipe",
+        .ring_name = NULL,
         .debug = 0
     };
     
@@ -98,6 +151,8 @@ config_t parse_arguments(int argc, char *argv[]) {
             config.fps = atoi(argv[++i]);
         } else if (strcmp(argv[i], "-p") == 0 && i + 1 < argc) {
             config.pipe_path = argv[++i];
+        } else if (strcmp(argv[i], "-r") == 0 && i + 1 < argc) {
+            config.ring_name = argv[++i];
         } else if (strcmp(argv[i], "-d") == 0) {
             config.debug = 1;
         } else if (strcmp(argv[i], "-l") == 0 && i + 1 < argc) {
@@ -120,6 +175,7 @@ void print_usage(const char *prog_name) {
     printf("  -t <threshold> Threshold (default: 0.5)\n");
     printf("  -f <fps>      FPS (default: 30)\n");
     printf("  -p <pipe>     Pipe path (default: \\\\.\\pipe\\vcgi_pipe)\n");
+    printf("  -r <ring>     Also read commands from the shared-memory ring <ring> (e.g. kinsnake_ring)\n");
     printf("  -d            Debug mode\n");
     printf("  -l <logfile>  Log file\n");
     printf("  -h            Show help\n");
@@ -131,6 +187,7 @@ int main(int argc, char *argv[]) {
     printf("=== Motion Controller (Bidirectional) ===\n");
     printf("Game: %s\n", config.game);
     printf("Pipe: %s\n", config.pipe_path);
+    printf("Ring: %s\n", config.ring_name ? config.ring_name : "off");
     printf("Debug: %s\n", config.debug ? "ON" : "OFF");
     printf("=========================================\n\n");
     
@@ -139,6 +196,12 @@ int main(int argc, char *argv[]) {
     printf("[CONTROLLER] Starting bidirectional server...\n");
     printf("[CONTROLLER] Press Ctrl+C to stop\n\n");
     
+    // Ring commands are handled on their own thread; the pipe stays available as fallback
+    HANDLE ring_thread = NULL;
+    if (config.ring_name) {
+        ring_thread = (HANDLE)_beginthreadex(NULL, 0, ring_consumer, &config, 0, NULL);
+    }
+    
     while (running) {
         HANDLE pipe_handle = INVALID_HANDLE_VALUE;
         
@@ -216,6 +279,11 @@ int main(int argc, char *argv[]) {
         Sleep(100);
     }
     
+    if (ring_thread) {
+        WaitForSingleObject(ring_thread, 1000);
+        CloseHandle(ring_thread);
+    }
+    
     printf("[CONTROLLER] Shutting down\n");
     return 0;
 }
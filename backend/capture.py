@@ -0,0 +1,319 @@
+"""
+Camera Capture Sources
+open_capture() returns an object with the cv2.VideoCapture interface
+(read / set / get / isOpened / release) for a real camera, a recording, an
+image sequence or a synthetic source, so the whole pipeline can run on a
+machine without a webcam.
+
+KINSNAKE_CAMERA_SOURCE:
+    0, 1, ...              camera index (DirectShow on Windows, V4L2 on Linux)
+    v4l2:/dev/video0       V4L2 device by path
+    file:session.mp4       recording, paced at its own fps and looped
+    images:frames/*.jpg    image sequence (glob), paced at the requested fps and looped
+    synthetic              generated moving pattern at the requested size and fps
+
+On V4L2 the MJPG FOURCC is requested before size and fps: uncompressed YUYV
+at 1280x720 usually cannot reach 30 fps over USB 2. KINSNAKE_CAMERA_FOURCC
+overrides it (e.g. YUYV, or empty to keep the driver default). What the
+device actually granted is in capture.granted.
+
+Every source sets capture.last_capture_time (time.monotonic() seconds) for
+the frame just read, when known, so capture-to-read latency can be measured.
+"""
+
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+
+def _fourcc_name(value):
+    code = int(value)
+    if code <= 0:
+        return None
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class _Paced:
+    """Releases frames on a fixed schedule, like a camera that blocks until the next frame"""
+
+    def __init__(self, fps):
+        self.fps = float(fps)
+        self._next_frame_at = time.monotonic()
+        self.last_capture_time = None
+
+    def _wait_for_frame(self):
+        delay = self._next_frame_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        # The frame "exists" from its due time on
+        self.last_capture_time = self._next_frame_at
+        self._next_frame_at = max(self._next_frame_at + 1.0 / self.fps, time.monotonic())
+
+
+class CameraCapture:
+    """cv2.VideoCapture on a device, with format negotiation and frame timestamps"""
+
+    def __init__(self, device, api, width=None, height=None, fps=None, fourcc=None):
+        self.name = f"{cv2.videoio_registry.getBackendName(api) if api != cv2.CAP_ANY else 'auto'}:{device}"
+        self.cap = cv2.VideoCapture(device, api)
+        self.api = api
+        self.last_capture_time = None
+        self.granted = {}
+        if self.cap.isOpened():
+            self.negotiate(width, height, fps, fourcc)
+
+    def negotiate(self, width=None, height=None, fps=None, fourcc=None):
+        """Request format/size/fps (FOURCC first - V4L2 picks sizes per format) and read back the result"""
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Always hand out the newest frame
+
+        self.granted = {
+            "source": self.name,
+            "fourcc": _fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(self.cap.get(cv2.CAP_PROP_FPS), 2),
+            "requested": {"fourcc": fourcc, "width": width, "height": height, "fps": fps},
+        }
+        return self.granted
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            # V4L2 reports the driver's buffer timestamp (CLOCK_MONOTONIC ms);
+            # other backends give nothing usable, so fall back to "now"
+            stamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 if self.api == cv2.CAP_V4L2 else 0.0
+            now = time.monotonic()
+            self.last_capture_time = stamp if 0 < now - stamp < 5 else None
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class FileCapture(_Paced):
+    """Recording played back at its own frame rate, looped"""
+
+    def __init__(self, path, width=None, height=None, fps=None, loop=True):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+        self.size = (width, height) if width and height else None
+        native_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+        super().__init__(fps or native_fps or 30.0)
+        self.granted = {
+            "source": f"file:{path}",
+            "fourcc": _fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)) if self.cap.isOpened() else None,
+            "width": width or int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": height or int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.fps,
+        }
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = float(value)
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self.cap.get(prop)
+
+    def read(self, image=None):
+        self._wait_for_frame()
+        ret, frame = self.cap.read(None if self.size else image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(None if self.size else image)
+        if ret and self.size and frame.shape[1::-1] != self.size:
+            frame = cv2.resize(frame, self.size, dst=image if image is not None and image.shape[1::-1] == self.size else None)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceCapture(_Paced):
+    """Still images (glob pattern, sorted) played back as a paced, looped stream"""
+
+    def __init__(self, pattern, width=None, height=None, fps=None, loop=True):
+        self.paths = sorted(glob.glob(pattern))
+        self.loop = loop
+        self.size = (width, height) if width and height else None
+        self._index = 0
+        self._cache = {}  # index -> decoded frame (sequences are short test clips)
+        super().__init__(fps or 30.0)
+        first = self._load(0) if self.paths else None
+        self.granted = {
+            "source": f"images:{pattern}",
+            "fourcc": None,
+            "width": first.shape[1] if first is not None else 0,
+            "height": first.shape[0] if first is not None else 0,
+            "fps": self.fps,
+            "frames": len(self.paths),
+        }
+
+    def _load(self, index):
+        frame = self._cache.get(index)
+        if frame is None:
+            frame = cv2.imread(self.paths[index], cv2.IMREAD_COLOR)
+            if frame is not None and self.size and frame.shape[1::-1] != self.size:
+                frame = cv2.resize(frame, self.size)
+            self._cache[index] = frame
+        return frame
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = float(value)
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.granted["width"])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.granted["height"])
+        return 0.0
+
+    def read(self, image=None):
+        if self._index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self._index = 0
+        self._wait_for_frame()
+        frame = self._load(self._index)
+        self._index += 1
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+
+    def release(self):
+        self.paths = []
+        self._cache.clear()
+
+
+class SyntheticCapture(_Paced):
+    """Paced generator of moving test frames with the VideoCapture interface"""
+
+    def __init__(self, width=1280, height=720, fps=30.0):
+        super().__init__(fps)
+        self.width = int(width)
+        self.height = int(height)
+        self._opened = True
+        self._index = 0
+        self._background = None
+
+    @property
+    def granted(self):
+        return {"source": "synthetic", "fourcc": None, "width": self.width,
+                "height": self.height, "fps": self.fps}
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = float(value)
+        else:
+            return False
+        self._background = None
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+
+        # Block like a camera until the next frame is due
+        self._wait_for_frame()
+
+        shape = (self.height, self.width, 3)
+        if self._background is None or self._background.shape != shape:
+            rng = np.random.default_rng(0)
+            self._background = rng.integers(0, 60, size=shape, dtype=np.uint8)
+        if image is None or image.shape != shape:
+            image = np.empty(shape, dtype=np.uint8)
+
+        np.copyto(image, self._background)
+        cx = int(self.width * (0.2 + 0.6 * (self._index % 60) / 60))
+        cv2.circle(image, (cx, self.height // 2), self.height // 8, (180, 200, 220), -1)
+        self._index += 1
+        return True, image
+
+    def release(self):
+        self._opened = False
+
+
+def default_camera_api():
+    """Native capture API for camera indices on this platform"""
+    if sys.platform.startswith("win"):
+        return cv2.CAP_DSHOW
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+
+def open_capture(source="0", width=None, height=None, fps=None):
+    """Open a capture source by name (see module docstring) and request size/fps"""
+    source = str(source).strip()
+
+    if source == "synthetic":
+        return SyntheticCapture(width or 1280, height or 720, fps or 30.0)
+    if source.startswith("file:"):
+        return FileCapture(source[5:], width, height)
+    if source.startswith("images:"):
+        return ImageSequenceCapture(source[7:], width, height, fps)
+
+    if source.startswith("v4l2:"):
+        device, api = source[5:], cv2.CAP_V4L2
+        device = int(device) if device.isdigit() else device
+    else:
+        device, api = int(source), default_camera_api()
+
+    # MJPG by default on V4L2; elsewhere keep the driver's format unless asked
+    fourcc = os.getenv('KINSNAKE_CAMERA_FOURCC', "MJPG" if api == cv2.CAP_V4L2 else "")
+    return CameraCapture(device, api, width, height, fps, fourcc or None)
@@ -0,0 +1,267 @@
+"""
+Shared-Memory Command Ring (Python side)
+Single-producer / single-consumer ring of fixed-size command records in a
+memory-mapped region shared with the C controller (c_controller/command_ring.h
+has the same layout). The server pushes, the controller's ring thread pops;
+nothing is opened or connected per command.
+
+Layout (little endian, 64-byte lines so producer and consumer fields never
+share a cache line):
+
+    0    magic "KSRB", version, capacity (power of 2), record size
+    16   consumer_heartbeat_ns (consumer clock, refreshed every wait; 0 = detached)
+    64   write_seq (producer), dropped (producer)
+    128  read_seq (consumer)
+    192  records[capacity], 32 bytes each:
+         seq u64, timestamp_ns u64 (time.perf_counter_ns / QueryPerformanceCounter),
+         direction u8 (DIRECTION_CODES), player u8, 14 reserved bytes
+
+The producer fills a record, then publishes it by storing write_seq + 1
+(an aligned 8-byte store, so the consumer never sees a half-written index).
+When the ring is full (consumer stalled) the new command is dropped and
+counted; the consumer is never overtaken.
+
+Liveness: the consumer stamps consumer_heartbeat_ns at least every wait
+timeout, and the producer only uses the ring while that stamp is younger
+than HEARTBEAT_TIMEOUT_S, so a crashed controller does not leave the server
+writing into a ring nobody reads. A consumer that attaches starts at the
+current write_seq: commands queued for a previous (dead) controller are
+stale directions and are skipped, not replayed.
+
+Wake-up: after each push the producer signals a named auto-reset event
+("<name>_wake", Windows) or writes a byte to the "<path>.wake" FIFO
+(POSIX, used by the benchmark stand-in). The consumer drains the ring and
+then waits on it with a timeout.
+"""
+
+import mmap
+import os
+import select
+import struct
+import sys
+import tempfile
+import time
+
+MAGIC = 0x4252534B  # "KSRB"
+VERSION = 2
+RECORD_SIZE = 32
+HEADER_SIZE = 192
+
+DIRECTION_CODES = {"UP": 1, "DOWN": 2, "LEFT": 3, "RIGHT": 4}
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+# Consumer counts as gone when its heartbeat is older than this (it waits 100 ms at a time)
+HEARTBEAT_TIMEOUT_S = 0.5
+
+# Offsets into the region as 8-byte words
+_HEARTBEAT = 16 // 8
+_WRITE_SEQ = 64 // 8
+_DROPPED = 72 // 8
+_READ_SEQ = 128 // 8
+
+_HEADER = struct.Struct("<IIII")
+_RECORD = struct.Struct("<QQBB14x")
+
+IS_WINDOWS = sys.platform.startswith("win")
+
+
+class _WindowsEvent:
+    """Named auto-reset event (the controller opens the same name)"""
+
+    def __init__(self, name):
+        import ctypes
+        from ctypes import wintypes
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._kernel32.CreateEventW.argtypes = (wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR)
+        self._kernel32.SetEvent.argtypes = (wintypes.HANDLE,)
+        self._kernel32.WaitForSingleObject.argtypes = (wintypes.HANDLE, wintypes.DWORD)
+        self._kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        self._handle = self._kernel32.CreateEventW(None, False, False, name)
+        if not self._handle:
+            raise OSError(ctypes.get_last_error(), f"CreateEventW({name}) failed")
+
+    def signal(self):
+        self._kernel32.SetEvent(self._handle)
+
+    def wait(self, timeout_s):
+        self._kernel32.WaitForSingleObject(self._handle, int(timeout_s * 1000))
+
+    def close(self):
+        if self._handle:
+            self._kernel32.CloseHandle(self._handle)
+            self._handle = None
+
+
+class _FifoEvent:
+    """POSIX stand-in for the named event: a FIFO carrying one byte per wake-up"""
+
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path):
+            try:
+                os.mkfifo(path)
+            except FileExistsError:
+                pass
+        self._fd = None  # Producer side, opened once a reader exists
+
+    def signal(self):
+        if self._fd is None:
+            try:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                return  # No consumer waiting on the FIFO yet
+        try:
+            os.write(self._fd, b"\x01")
+        except BlockingIOError:
+            pass  # Plenty of wake-ups already pending
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout_s):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        ready, _, _ = select.select([self._fd], [], [], timeout_s)
+        if ready:
+            try:
+                os.read(self._fd, 4096)
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def ring_path(name):
+    """Backing file for a ring name on POSIX (Windows uses a named mapping)"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, name)
+
+
+class CommandRing:
+    """One end of a command ring; the server creates it (create=True) and pushes"""
+
+    def __init__(self, name="kinsnake_ring", capacity=64, create=True):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of 2")
+        self.name = name
+        self.size = HEADER_SIZE + capacity * RECORD_SIZE
+
+        if IS_WINDOWS:
+            # Page-file backed named mapping "Local\\<name>" (lives while a handle is open)
+            self._mm = mmap.mmap(-1, self.size, tagname=f"Local\\{name}")
+            self._event = _WindowsEvent(f"Local\\{name}_wake")
+        else:
+            path = ring_path(name)
+            fd = os.open(path, os.O_RDWR | (os.O_CREAT if create else 0), 0o600)
+            try:
+                if create:
+                    os.ftruncate(fd, self.size)
+                self._mm = mmap.mmap(fd, self.size)
+            finally:
+                os.close(fd)
+            self._event = _FifoEvent(path + ".wake")
+
+        self._words = memoryview(self._mm).cast("Q")
+        if create:
+            self._mm[:self.size] = bytes(self.size)
+            _HEADER.pack_into(self._mm, 0, MAGIC, VERSION, capacity, RECORD_SIZE)
+        magic, version, self.capacity, record_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{name} is not a version {VERSION} command ring")
+        self._mask = self.capacity - 1
+
+    def heartbeat_age_s(self):
+        """Seconds since the consumer's last heartbeat (None if none is attached)"""
+        stamp = self._words[_HEARTBEAT]
+        if stamp == 0:
+            return None
+        return max(0.0, (time.perf_counter_ns() - stamp) / 1e9)
+
+    def consumer_alive(self, timeout_s=HEARTBEAT_TIMEOUT_S):
+        """Producer: is a consumer reading the ring right now?"""
+        age = self.heartbeat_age_s()
+        return age is not None and age < timeout_s
+
+    def attach(self):
+        """Consumer: skip whatever a previous consumer left unread and start the heartbeat"""
+        self._words[_READ_SEQ] = self._words[_WRITE_SEQ]
+        self.heartbeat()
+
+    def heartbeat(self):
+        """Consumer: stamp liveness (same clock as record timestamps)"""
+        self._words[_HEARTBEAT] = time.perf_counter_ns()
+
+    def detach(self):
+        self._words[_HEARTBEAT] = 0
+
+    @property
+    def dropped(self):
+        return self._words[_DROPPED]
+
+    def pending(self):
+        return self._words[_WRITE_SEQ] - self._words[_READ_SEQ]
+
+    def push(self, direction, player=0, timestamp_ns=None):
+        """Producer: append a command and wake the consumer; returns its seq, or None if full"""
+        seq = self._words[_WRITE_SEQ]
+        if seq - self._words[_READ_SEQ] >= self.capacity:
+            self._words[_DROPPED] += 1
+            return None
+        code = DIRECTION_CODES.get(direction, 0)
+        stamp = time.perf_counter_ns() if timestamp_ns is None else timestamp_ns
+        _RECORD.pack_into(self._mm, HEADER_SIZE + (seq & self._mask) * RECORD_SIZE, seq, stamp, code, player)
+        self._words[_WRITE_SEQ] = seq + 1  # Publish
+        self._event.signal()
+        return seq
+
+    def pop(self):
+        """Consumer: next (seq, direction, player, timestamp_ns), or None when empty"""
+        seq = self._words[_READ_SEQ]
+        if seq == self._words[_WRITE_SEQ]:
+            return None
+        record_seq, stamp, code, player = _RECORD.unpack_from(
+            self._mm, HEADER_SIZE + (seq & self._mask) * RECORD_SIZE)
+        self._words[_READ_SEQ] = seq + 1  # Free the slot
+        return record_seq, DIRECTION_NAMES.get(code), player, stamp
+
+    def wait(self, timeout_s=0.1):
+        """Consumer: block until the producer signals (or timeout), then heartbeat"""
+        self._event.wait(timeout_s)
+        self.heartbeat()
+
+    def stats(self):
+        age = self.heartbeat_age_s()
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "written": self._words[_WRITE_SEQ],
+            "read": self._words[_READ_SEQ],
+            "dropped": self.dropped,
+            "consumer_alive": self.consumer_alive(),
+            "consumer_heartbeat_age_ms": round(age * 1000, 1) if age is not None else None,
+        }
+
+    def close(self):
+        if getattr(self, "_words", None) is not None:
+            self._words.release()
+            self._words = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        if getattr(self, "_event", None) is not None:
+            self._event.close()
+            self._event = None
+
+    def unlink(self):
+        """Remove the POSIX backing files (no-op on Windows)"""
+        if not IS_WINDOWS:
+            for path in (ring_path(self.name), ring_path(self.name) + ".wake"):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
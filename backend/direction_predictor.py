@@ -0,0 +1,122 @@
+"""
+Motion-Extrapolated Direction Prediction
+Tracks the pointing angle and its angular velocity over the last few frames
+and commits to a new direction as soon as the extrapolated angle will be
+clearly inside that direction's band within a short horizon, instead of
+waiting for the finger to cross the band and pass the stability vote.
+
+Rollback: an early command that the normal vote has not confirmed within
+`rollback_s` is abandoned (the voted direction is sent again) and prediction
+is paused for `cooldown_s`, which bounds the rate of false commands.
+"""
+
+from collections import deque
+import time
+
+import numpy as np
+
+# Band centers in degrees (image coordinates, y points down)
+BAND_CENTERS = {"RIGHT": 0.0, "DOWN": 90.0, "LEFT": 180.0, "UP": -90.0}
+
+
+def wrap_angle(angle):
+    """Wrap degrees into [-180, 180)"""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def band_for_angle(angle, margin=0.0):
+    """Direction whose band contains angle at least `margin` degrees from the edges, else None"""
+    for direction, center in BAND_CENTERS.items():
+        if abs(wrap_angle(angle - center)) <= 45.0 - margin:
+            return direction
+    return None
+
+
+class DirectionPredictor:
+    """Predicts the next pointing direction from angular velocity"""
+
+    def __init__(self, horizon_ms=60.0, margin_deg=8.0, min_speed_dps=200.0,
+                 window=5, rollback_s=0.15, cooldown_s=0.4):
+        self.horizon_s = horizon_ms / 1000.0
+        self.margin_deg = margin_deg
+        self.min_speed_dps = min_speed_dps
+        self.rollback_s = rollback_s
+        self.cooldown_s = cooldown_s
+
+        self._samples = deque(maxlen=window)  # (t, unwrapped angle)
+        self._pending = None  # (direction, predicted_at)
+        self._cooldown_until = 0.0
+
+        # Stats
+        self.predictions = 0
+        self.confirmed = 0
+        self.rolled_back = 0
+        self.lead_times = deque(maxlen=200)  # seconds gained on confirmed predictions
+
+    def reset(self):
+        """Forget motion history (finger lost or not extended)"""
+        self._samples.clear()
+
+    def angular_velocity(self):
+        """Least-squares slope of angle over time in deg/s (0 with too few samples)"""
+        if len(self._samples) < 3:
+            return 0.0
+        t = np.array([s[0] for s in self._samples])
+        a = np.array([s[1] for s in self._samples])
+        t = t - t.mean()
+        denom = float((t * t).sum())
+        if denom <= 0:
+            return 0.0
+        return float((t * (a - a.mean())).sum() / denom)
+
+    def update(self, angle, voted, timestamp=None):
+        """Feed one frame; returns the direction to emit instead of `voted`, or None"""
+        now = time.time() if timestamp is None else timestamp
+
+        # Unwrap so a sweep across +/-180 stays continuous
+        if self._samples:
+            previous = self._samples[-1][1]
+            angle = previous + wrap_angle(angle - previous)
+        self._samples.append((now, angle))
+
+        if self._pending is not None:
+            direction, predicted_at = self._pending
+            if voted == direction:
+                # The vote caught up - prediction was right
+                self.confirmed += 1
+                self.lead_times.append(now - predicted_at)
+                self._pending = None
+                return None
+            if now - predicted_at > self.rollback_s:
+                # Not confirmed in time: roll back to the voted direction and back off
+                self.rolled_back += 1
+                self._pending = None
+                self._cooldown_until = now + self.cooldown_s
+                return None
+            return direction  # Hold the early command while waiting for confirmation
+
+        if now < self._cooldown_until:
+            return None
+
+        velocity = self.angular_velocity()
+        if abs(velocity) < self.min_speed_dps:
+            return None
+
+        current = band_for_angle(angle)
+        target = band_for_angle(angle + velocity * self.horizon_s, self.margin_deg)
+        if target is None or target == current or target == voted:
+            return None
+
+        self.predictions += 1
+        self._pending = (target, now)
+        return target
+
+    def stats(self):
+        lead_ms = [t * 1000 for t in self.lead_times]
+        return {
+            "predictions": self.predictions,
+            "confirmed": self.confirmed,
+            "rolled_back": self.rolled_back,
+            "false_rate": round(self.rolled_back / self.predictions, 3) if self.predictions else 0.0,
+            "mean_lead_ms": round(float(np.mean(lead_ms)), 1) if lead_ms else 0.0,
+        }
@@ -0,0 +1,113 @@
+"""
+Latest-Wins Admission Control for Uploaded Frames
+Each connection keeps at most one pending "frame" message. A newer upload
+replaces the pending one before it is ever decoded, so gestures are always
+computed on the freshest frame no matter how fast the client sends.
+"""
+
+import asyncio
+import time
+
+
+class FrameAdmission:
+    """Per-connection single-slot frame queue with rate feedback for the client"""
+
+    def __init__(self, process, send, report_interval=1.0):
+        # process(frame_data, handedness, capture_time) -> result dict (awaitable)
+        # send(message dict) -> awaitable
+        self.process = process
+        self.send = send
+        self.report_interval = report_interval
+
+        self._pending = None  # (frame_data, handedness, frame_id, received_at, capture_time)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closed = False
+
+        # Counters for the current report window
+        self._window_start = time.time()
+        self._window_received = 0
+        self._window_accepted = 0
+        self._window_dropped = 0
+        self.total_dropped = 0
+
+    def start(self):
+        """Start the per-connection processing task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def offer(self, frame_data, handedness="right", frame_id=None, capture_time=None):
+        """Admit a frame; silently supersedes any frame still waiting (never blocks)
+
+        capture_time: epoch seconds the client captured it (server clock), if known
+        """
+        if self._pending is not None:
+            self._window_dropped += 1
+            self.total_dropped += 1
+        self._pending = (frame_data, handedness, frame_id, time.time(), capture_time)
+        self._window_received += 1
+        self._wakeup.set()
+
+    async def _run(self):
+        while not self._closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+
+            frame_data, handedness, frame_id, received_at, capture_time = pending
+            result = await self.process(frame_data, handedness, capture_time or received_at)
+            self._window_accepted += 1
+
+            message = {
+                "type": "frame_result",
+                "queue_ms": round((time.time() - received_at) * 1000, 1),
+                **result
+            }
+            if frame_id is not None:
+                message["id"] = frame_id
+            try:
+                await self.send(message)
+                await self._maybe_report()
+            except Exception:
+                # Connection gone - the endpoint's receive loop will clean up
+                break
+
+    async def _maybe_report(self):
+        """Tell the client how many frames per second we actually accept"""
+        now = time.time()
+        elapsed = now - self._window_start
+        if elapsed < self.report_interval:
+            return
+
+        received_fps = self._window_received / elapsed
+        accepted_fps = self._window_accepted / elapsed
+        dropped = self._window_dropped
+
+        self._window_start = now
+        self._window_received = 0
+        self._window_accepted = 0
+        self._window_dropped = 0
+
+        await self.send({
+            "type": "backpressure",
+            "accepted_fps": round(accepted_fps, 1),
+            "received_fps": round(received_fps, 1),
+            "dropped": dropped,
+            "timestamp": now
+        })
+
+    async def close(self):
+        """Stop processing and discard any pending frame"""
+        self._closed = True
+        self._pending = None
+        self._wakeup.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
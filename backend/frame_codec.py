@@ -0,0 +1,96 @@
+"""
+Uploaded Frame Decoding
+Turns a base64 data URL from the browser into a BGR frame at (or near)
+inference resolution, using OpenCV's reduced-size JPEG decode so large
+uploads are never fully decoded just to be shrunk again.
+"""
+
+import binascii
+import os
+
+import cv2
+import numpy as np
+
+# Longest side MediaPipe needs; the palm/landmark models run well below this
+INFERENCE_MAX_SIDE = int(os.getenv('KINSNAKE_INFERENCE_MAX_SIDE', '640'))
+
+# libjpeg can scale by 1/2, 1/4 and 1/8 during the IDCT
+REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# JPEG start-of-frame markers (baseline, extended, progressive, lossless...)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def b64_payload(frame_data):
+    """Decode the base64 body of a data URL (or bare base64) into bytes"""
+    # Slice once past the header instead of split(); a2b_base64 reads an ASCII
+    # str in place, so there is no extra str -> bytes copy either
+    comma = frame_data.find(',', 0, 64)
+    if comma != -1:
+        frame_data = frame_data[comma + 1:]
+    return binascii.a2b_base64(frame_data)
+
+
+def jpeg_size(data):
+    """Read (width, height) from a JPEG header without decoding, or None"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    n = len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # no length field
+            i += 2
+            continue
+        length = (data[i + 2] << 8) | data[i + 3]
+        if marker in _SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+
+def reduced_decode_flag(width, height, max_side=INFERENCE_MAX_SIDE):
+    """Pick the largest JPEG scale-down that keeps the longest side >= max_side"""
+    longest = max(width, height)
+    for factor, flag in REDUCED_FLAGS:
+        if longest // factor >= max_side:
+            return flag, factor
+    return cv2.IMREAD_COLOR, 1
+
+
+def decode_frame(frame_data, max_side=INFERENCE_MAX_SIDE):
+    """Decode an uploaded frame near inference size
+
+    Returns (frame, source_width, source_height). The source size is what the
+    pixel-space gesture thresholds are tuned for, so callers should keep using
+    it even though the returned frame may be smaller.
+    """
+    data = b64_payload(frame_data)
+    buf = np.frombuffer(data, np.uint8)
+
+    # Header scan on the bytes object (int indexing, no numpy scalars)
+    size = jpeg_size(data)
+    if size is None:
+        # Not a JPEG (or header not found) - regular full decode
+        frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        if frame is None:
+            return None, 0, 0
+        height, width = frame.shape[:2]
+        return frame, width, height
+
+    width, height = size
+    flag, _ = reduced_decode_flag(width, height, max_side)
+    frame = cv2.imdecode(buf, flag)
+    return frame, width, height
@@ -0,0 +1,82 @@
+"""
+Allocation-Free Frame Preprocessing
+Capture, mirror and RGB conversion all write into buffers that are reused
+frame after frame, instead of allocating three fresh 1280x720 arrays each time.
+"""
+
+import cv2
+import numpy as np
+
+from landmarks import mirror_results
+
+
+class FramePreprocessor:
+    """Reads camera frames into reused buffers and prepares them for inference
+
+    With flip_pixels=False the mirror effect is applied to the landmarks after
+    inference instead of to every pixel; only preview frames that are actually
+    shown get flipped.
+    """
+
+    def __init__(self, mirror=True, flip_pixels=True):
+        self.mirror = mirror
+        self.flip_pixels = flip_pixels
+        self._capture = None
+        self._mirrored = None
+        self._rgb = None
+        self._scaled = None
+
+    @property
+    def mirrors_landmarks(self):
+        return self.mirror and not self.flip_pixels
+
+    @staticmethod
+    def _reuse(buffer, shape):
+        """Return buffer if it already has this shape, otherwise a new one"""
+        if buffer is None or buffer.shape != shape:
+            return np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def read(self, cap):
+        """cap.read() into the capture buffer; returns (ret, frame ready for inference)"""
+        ret, frame = cap.read(self._capture) if self._capture is not None else cap.read()
+        if not ret or frame is None:
+            return False, None
+        self._capture = frame
+
+        if self.mirror and self.flip_pixels:
+            self._mirrored = self._reuse(self._mirrored, frame.shape)
+            frame = cv2.flip(frame, 1, dst=self._mirrored)
+        return True, frame
+
+    def forget_capture_buffer(self):
+        """Stop reusing the capture buffer (a hung read may still write into it later)"""
+        self._capture = None
+        self._mirrored = None
+
+    def rgb_buffer(self, frame):
+        """Preallocated destination for the BGR -> RGB conversion of frame"""
+        self._rgb = self._reuse(self._rgb, frame.shape)
+        return self._rgb
+
+    def scale_for_inference(self, frame, max_width):
+        """Downscale into a reused buffer when frame is wider than max_width"""
+        height, width = frame.shape[:2]
+        if not max_width or width <= max_width:
+            return frame
+        shape = (int(height * max_width / width), int(max_width), frame.shape[2])
+        self._scaled = self._reuse(self._scaled, shape)
+        return cv2.resize(frame, (shape[1], shape[0]), dst=self._scaled, interpolation=cv2.INTER_AREA)
+
+    def fix_results(self, results):
+        """Apply the mirror to inference results when pixels were not flipped"""
+        if self.mirrors_landmarks:
+            mirror_results(results)
+        return results
+
+    def preview(self, frame):
+        """Frame to draw the overlay on and show to the user (always mirrored)"""
+        if self.mirrors_landmarks:
+            self._mirrored = self._reuse(self._mirrored, frame.shape)
+            return cv2.flip(frame, 1, dst=self._mirrored)
+        return frame
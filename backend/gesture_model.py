@@ -0,0 +1,139 @@
+"""
+Trainable Pointing Classifier
+A small softmax (multinomial logistic regression) model over normalized
+landmark features, trained offline from labelled landmark recordings.
+Pure NumPy: classifying one hand is a 42x5 matrix-vector product.
+
+Train:
+    python gesture_model.py --out gesture_model.npz session_up.jsonl session_left.jsonl ...
+
+Recordings come from `bench.py record --label <DIRECTION>`; samples labelled
+NONE teach the model what "not pointing" looks like.
+"""
+
+import argparse
+
+import numpy as np
+
+CLASSES = ("UP", "DOWN", "LEFT", "RIGHT", "NONE")
+
+
+def landmark_features(hand_landmarks, frame_width, frame_height):
+    """Pixel-aspect landmarks relative to the wrist, scaled by palm size -> (42,) float32"""
+    points = np.array([(lm.x * frame_width, lm.y * frame_height) for lm in hand_landmarks.landmark],
+                      dtype=np.float32)
+    points -= points[0]
+    # Wrist -> middle-finger base is stable across poses
+    scale = float(np.hypot(points[9, 0], points[9, 1])) or 1.0
+    return (points / scale).ravel()
+
+
+class SoftmaxClassifier:
+    """Multinomial logistic regression with feature standardization"""
+
+    def __init__(self, weights=None, bias=None, mean=None, std=None, classes=CLASSES):
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.std = std
+        self.classes = tuple(classes)
+
+    def fit(self, X, y, epochs=300, lr=0.5, l2=1e-3):
+        """Full-batch gradient descent on cross-entropy; y holds class indices"""
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.int64)
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0) + 1e-6
+        Xs = (X - self.mean) / self.std
+
+        n, f = Xs.shape
+        c = len(self.classes)
+        self.weights = np.zeros((f, c), dtype=np.float32)
+        self.bias = np.zeros(c, dtype=np.float32)
+        onehot = np.eye(c, dtype=np.float32)[y]
+
+        for _ in range(epochs):
+            probs = self._softmax(Xs @ self.weights + self.bias)
+            grad = (probs - onehot) / n
+            self.weights -= lr * (Xs.T @ grad + l2 * self.weights)
+            self.bias -= lr * grad.sum(axis=0)
+        return self
+
+    @staticmethod
+    def _softmax(z):
+        z = z - z.max(axis=-1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, x):
+        return self._softmax(((x - self.mean) / self.std) @ self.weights + self.bias)
+
+    def save(self, path):
+        np.savez(path, weights=self.weights, bias=self.bias, mean=self.mean, std=self.std,
+                 classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["weights"], data["bias"], data["mean"], data["std"],
+                   [str(c) for c in data["classes"]])
+
+
+class LearnedGestureClassifier:
+    """GestureClassifier backed by a SoftmaxClassifier"""
+
+    def __init__(self, model):
+        self.model = model
+        self._none = model.classes.index("NONE") if "NONE" in model.classes else None
+
+    @classmethod
+    def load(cls, path):
+        return cls(SoftmaxClassifier.load(path))
+
+    def classify(self, hand_landmarks, frame_width, frame_height):
+        """Return (direction or None, confidence)"""
+        probs = self.model.predict_proba(landmark_features(hand_landmarks, frame_width, frame_height))
+        best = int(probs.argmax())
+        if best == self._none:
+            return None, float(probs[best])
+        return self.model.classes[best], float(probs[best])
+
+
+def dataset_from_samples(samples, frame_width=1280, frame_height=720):
+    """Features and class indices for labelled samples with a hand (unlabelled ones are skipped)"""
+    X, y = [], []
+    for _, hand_landmarks, _, label in samples:
+        if hand_landmarks is None or label not in CLASSES:
+            continue
+        X.append(landmark_features(hand_landmarks, frame_width, frame_height))
+        y.append(CLASSES.index(label))
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.int64)
+
+
+def main(argv=None):
+    from landmarks import read_recording
+
+    parser = argparse.ArgumentParser(description="Train the pointing gesture classifier")
+    parser.add_argument("recordings", nargs="+", help="Labelled landmark recordings (.jsonl)")
+    parser.add_argument("--out", default="gesture_model.npz")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--epochs", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    samples = []
+    for path in args.recordings:
+        samples.extend(read_recording(path))
+    X, y = dataset_from_samples(samples, args.width, args.height)
+    if len(X) == 0:
+        raise SystemExit("No labelled samples found")
+
+    model = SoftmaxClassifier().fit(X, y, epochs=args.epochs)
+    accuracy = float((model.predict_proba(X).argmax(axis=1) == y).mean())
+    model.save(args.out)
+    counts = {c: int((y == i).sum()) for i, c in enumerate(CLASSES)}
+    print(f"Trained on {len(X)} samples {counts}; training accuracy {accuracy:.3f}; saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Pointing Gesture Detection
+Rules that turn MediaPipe hand landmarks into UP / DOWN / LEFT / RIGHT.
+One detector instance per tracked hand, since it keeps a short history
+for the stability vote.
+"""
+
+import numpy as np
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+
+
+def angle_to_direction(angle):
+    """Map a pointing angle (degrees, -180..180, y down) to a direction"""
+    if -40 <= angle <= 40:
+        return "RIGHT"
+    elif 50 < angle <= 130:
+        return "DOWN"
+    elif angle > 140 or angle <= -140:
+        return "LEFT"
+    else:  # -130 < angle < -50
+        return "UP"
+
+
+def is_finger_extended(hand_landmarks, finger_tip_id):
+    """Check if a finger is extended STRICTLY"""
+    if finger_tip_id == 4:  # Thumb
+        tip = hand_landmarks.landmark[4]
+        base = hand_landmarks.landmark[2]
+    else:  # Other fingers
+        tip = hand_landmarks.landmark[finger_tip_id]
+        mid = hand_landmarks.landmark[finger_tip_id - 1]
+        base = hand_landmarks.landmark[finger_tip_id - 2]
+
+    wrist = hand_landmarks.landmark[0]
+
+    # Calculate distances from wrist
+    tip_dist = ((tip.x - wrist.x)**2 + (tip.y - wrist.y)**2)**0.5
+    base_dist = ((base.x - wrist.x)**2 + (base.y - wrist.y)**2)**0.5
+
+    # STRICT check if finger is straight and extended
+    if finger_tip_id != 4:
+        mid_dist = ((mid.x - wrist.x)**2 + (mid.y - wrist.y)**2)**0.5
+        # Finger must be clearly extended AND straight
+        is_extended = tip_dist > base_dist * 1.15  # Stricter (was 1.05)
+        is_straight = mid_dist > base_dist and mid_dist < tip_dist
+
+        # Also check other fingers are NOT extended (only index pointing)
+        if finger_tip_id == 8:  # Index finger
+            # Check that middle, ring, pinky are curled
+            middle_tip = hand_landmarks.landmark[12]
+            ring_tip = hand_landmarks.landmark[16]
+            pinky_tip = hand_landmarks.landmark[20]
+
+            middle_dist = ((middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2)**0.5
+            ring_dist = ((ring_tip.x - wrist.x)**2 + (ring_tip.y - wrist.y)**2)**0.5
+            pinky_dist = ((pinky_tip.x - wrist.x)**2 + (pinky_tip.y - wrist.y)**2)**0.5
+
+            # Other fingers should be closer to wrist (curled)
+            others_curled = (middle_dist < tip_dist * 0.9 and
+                             ring_dist < tip_dist * 0.9 and
+                             pinky_dist < tip_dist * 0.9)
+
+            return is_extended and is_straight and others_curled
+
+        return is_extended and is_straight
+
+    return tip_dist > base_dist * 1.1
+
+
+def pointing_vector(hand_landmarks, frame_width, frame_height):
+    """Weighted index-finger direction in pixels, or None if the finger is not extended"""
+    index_base = hand_landmarks.landmark[5]
+    index_mid = hand_landmarks.landmark[6]
+    index_2nd = hand_landmarks.landmark[7]
+    index_tip = hand_landmarks.landmark[8]
+
+    # Check if index finger is extended
+    if not is_finger_extended(hand_landmarks, 8):
+        return None
+
+    # Convert to pixel coordinates
+    tip_x = int(index_tip.x * frame_width)
+    tip_y = int(index_tip.y * frame_height)
+    second_x = int(index_2nd.x * frame_width)
+    second_y = int(index_2nd.y * frame_height)
+    mid_x = int(index_mid.x * frame_width)
+    mid_y = int(index_mid.y * frame_height)
+    base_x = int(index_base.x * frame_width)
+    base_y = int(index_base.y * frame_height)
+
+    # Calculate pointing direction using entire finger
+    dx1 = mid_x - base_x
+    dy1 = mid_y - base_y
+    dx2 = second_x - mid_x
+    dy2 = second_y - mid_y
+    dx3 = tip_x - second_x
+    dy3 = tip_y - second_y
+
+    # Weighted average (tip segment weighted more)
+    dx = (dx1 + dx2 + dx3 * 2) / 4
+    dy = (dy1 + dy2 + dy3 * 2) / 4
+    return dx, dy
+
+
+class PointingGestureDetector:
+    """Pointing classifier with a 2-of-3 stability vote
+
+    By default directions come from the hand-tuned angle bands. A pluggable
+    classifier (any object with classify(hand_landmarks, frame_width,
+    frame_height) -> (direction or None, confidence), e.g.
+    gesture_model.LearnedGestureClassifier) can replace them; frames it is at
+    least `accept_confidence` sure about skip the vote.
+    """
+
+    # Lower threshold - responsive but clear
+    threshold = 15
+
+    def __init__(self, predictor=None, classifier=None, accept_confidence=0.7):
+        self.gesture_history = []  # Track recent gestures for stability
+        self.predictor = predictor  # Optional DirectionPredictor (early commands, angle-band rules only)
+        self.classifier = classifier
+        self.accept_confidence = accept_confidence
+        self.last_angle = None
+        self.last_confidence = None
+
+    def vote(self, detected):
+        """Light stability check: requires 2 out of last 3 frames (FASTER)"""
+        self.gesture_history.append(detected)
+        if len(self.gesture_history) > 3:
+            self.gesture_history.pop(0)
+
+        # Quick confirmation - 2 out of 3 frames
+        if len(self.gesture_history) >= 2 and self.gesture_history.count(detected) >= 2:
+            return detected
+        return None
+
+    def detect_pointing_direction(self, hand_landmarks, frame_width, frame_height, timestamp=None):
+        """Detect which direction the index finger is pointing with stability"""
+        if self.classifier is not None:
+            detected, confidence = self.classifier.classify(hand_landmarks, frame_width, frame_height)
+            self.last_confidence = confidence
+            if detected is None:
+                return None
+            voted = self.vote(detected)
+            if confidence >= self.accept_confidence:
+                return detected  # Confident single frame - no need to wait for the vote
+            return voted
+
+        vector = pointing_vector(hand_landmarks, frame_width, frame_height)
+        if vector is None:
+            self.last_angle = None
+            if self.predictor is not None:
+                self.predictor.reset()
+            return None
+        dx, dy = vector
+
+        # Use angles for accurate direction
+        if abs(dx) > self.threshold or abs(dy) > self.threshold:
+            angle = np.arctan2(dy, dx) * 180 / np.pi  # -180 to 180
+            self.last_angle = angle
+
+            # Map angles to directions
+            detected = angle_to_direction(angle)
+
+            voted = self.vote(detected)
+
+            if self.predictor is not None:
+                predicted = self.predictor.update(angle, voted, timestamp)
+                if predicted is not None:
+                    return predicted
+            return voted
+
+        self.last_angle = None
+        if self.predictor is not None:
+            self.predictor.reset()
+        return None
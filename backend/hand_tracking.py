@@ -2,8 +2,13 @@
 Clean Hand Tracking with MediaPipe
 Detects finger pointing direction
 With ElevenLabs voice narration
+
+Headless (no window, no drawing; stop with Ctrl+C / SIGTERM):
+    python hand_tracking.py --headless --stats-interval 5
+or KINSNAKE_HEADLESS=1 / KINSNAKE_STATS_INTERVAL=5 in the environment.
 """
 
+import argparse
 import cv2
 import mediapipe as mp
 import time
@@ -15,9 +20,18 @@ import signal
 import sys
 import atexit
 
+import numpy as np
+
+from capture import open_capture
+from frame_preprocess import FramePreprocessor
+from motion_gate import MotionGate
+from structured_log import get_logger, hot, shutdown_logging
+
 # Load environment variables
 load_dotenv()
 
+log = get_logger("SYSTEM")
+
 # ElevenLabs imports (new API)
 try:
     from elevenlabs.client import ElevenLabs
@@ -28,12 +42,16 @@ try:
     pygame.mixer.init()
 except ImportError as e:
     ELEVENLABS_AVAILABLE = False
-    print(f"[SYSTEM] Voice libraries not installed: {e}")
+    log.info(f"Voice libraries not installed: {e}")
 
 class HandTracker:
-    def __init__(self):
+    def __init__(self, headless=False, stats_interval=0.0):
         """Initialize MediaPipe hand tracker"""
-        print("=== Hand Tracking System with Voice ===")
+        log.info("=== Hand Tracking System with Voice ===")
+        
+        # Headless: no window, no drawing - every frame goes to tracking only
+        self.headless = headless
+        self.stats_interval = stats_interval  # Seconds between fps/latency lines (0 = off)
         
         # Setup cleanup handlers for Windows termination
         self.setup_signal_handlers()
@@ -49,13 +67,13 @@ class HandTracker:
                     self.elevenlabs_client = ElevenLabs(api_key=api_key)
                     self.voice_id = os.getenv('ELEVENLABS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM')
                     self.voice_enabled = True
-                    print("[SYSTEM] Voice narration enabled")
+                    log.info("Voice narration enabled")
                 except Exception as e:
-                    print(f"[SYSTEM] Voice disabled: {e}")
+                    log.info(f"Voice disabled: {e}")
             else:
-                print("[SYSTEM] Voice disabled (no API key)")
+                log.info("Voice disabled (no API key)")
         else:
-            print("[SYSTEM] Voice disabled (ElevenLabs not installed)")
+            log.info("Voice disabled (ElevenLabs not installed)")
         
         # MediaPipe setup
         self.mp_hands = mp.solutions.hands
@@ -71,6 +89,19 @@ class HandTracker:
         self.cap = None
         self.running = False
         
+        # Reused capture/mirror/RGB buffers. The window shows every frame, so
+        # pixels are flipped; headless only needs the landmarks mirrored.
+        self.preprocessor = FramePreprocessor(mirror=True, flip_pixels=not headless)
+        
+        # Optional motion gate: reuse the last results while the scene is static
+        self.motion_gate = None
+        if os.getenv('KINSNAKE_MOTION_GATE', '0') == '1':
+            self.motion_gate = MotionGate(
+                threshold=float(os.getenv('KINSNAKE_MOTION_THRESHOLD', '2.0')),
+                min_refresh_s=float(os.getenv('KINSNAKE_MIN_REFRESH_MS', '250')) / 1000
+            )
+        self.last_results = None
+        
         # Gesture tracking
         self.last_gesture = None
         self.last_gesture_time = 0
@@ -80,12 +111,12 @@ class HandTracker:
         # C controller
         self.c_controller = None
         
-        print("[SYSTEM] Ready")
+        log.info("Ready")
     
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful termination"""
         def signal_handler(signum, frame):
-            print("\n[SYSTEM] Termination signal received, cleaning up...")
+            log.info("Termination signal received, cleaning up...")
             self.running = False
             self.cleanup()
             sys.exit(0)
@@ -104,32 +135,28 @@ class HandTracker:
         try:
             path = os.path.join(os.getcwd(), "c_controller", "motion_controller_persistent.exe")
             if not os.path.exists(path):
-                print(f"[SYSTEM] Controller not found")
+                log.info("Controller not found")
                 return False
             
             self.c_controller = subprocess.Popen([path, "-d", "-l", "controller.log"])
             time.sleep(1)
-            print("[SYSTEM] Controller started")
+            log.info("Controller started")
             return True
         except Exception as e:
-            print(f"[SYSTEM] Controller error: {e}")
+            log.error(f"Controller error: {e}")
             return False
     
     def start_camera(self):
         """Start camera"""
         try:
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+            self.cap = open_capture(os.getenv('KINSNAKE_CAMERA_SOURCE', '0'), width=640, height=480)
             if not self.cap.isOpened():
                 return False
             
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            
-            print("[SYSTEM] Camera ready")
+            log.info(f"Camera ready: {self.cap.granted}")
             return True
         except Exception as e:
-            print(f"[SYSTEM] Camera error: {e}")
+            log.error(f"Camera error: {e}")
             return False
     
     def detect_pointing_direction(self, hand_landmarks, frame_width, frame_height):
@@ -263,7 +290,7 @@ class HandTracker:
                 pipe.write(f"{gesture}\n")
                 pipe.flush()
             
-            print(f"[SYSTEM] Sent: {gesture}")
+            log.info("Sent: %s", gesture, extra=hot("gesture_sent", per_second=10))
             
             # Speak the gesture
             self.speak_gesture(gesture)
@@ -271,39 +298,101 @@ class HandTracker:
             self.last_gesture = gesture
             self.last_gesture_time = current_time
         except Exception as e:
-            print(f"[SYSTEM] Send error: {e}")
+            log.warning("Send error: %s", e, extra=hot("send_error", per_second=1))
+    
+    def track(self, frame):
+        """Hand results for a frame (reused from the last inference if the motion gate allows)"""
+        if self.motion_gate is not None and not self.motion_gate.should_infer(frame) \
+                and self.last_results is not None:
+            return self.last_results
+        
+        # Convert to RGB for MediaPipe
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.preprocessor.rgb_buffer(frame))
+        results = self.preprocessor.fix_results(self.hands.process(rgb_frame))
+        if self.motion_gate is not None:
+            self.motion_gate.inferred()
+            self.last_results = results
+        return results
+    
+    def run_headless(self):
+        """Tracking loop without any window or drawing; ends on a signal or camera loss"""
+        log.info("Headless mode - stop with Ctrl+C or SIGTERM")
+        
+        frames = 0
+        gestures = 0
+        latencies = []  # ms from frame read to gesture decision
+        window_start = time.perf_counter()
+        
+        while self.running:
+            ret, frame = self.preprocessor.read(self.cap)
+            if not ret:
+                log.error("Camera stopped delivering frames")
+                break
+            read_at = time.perf_counter()
+            
+            results = self.track(frame)
+            
+            if results.multi_hand_landmarks:
+                frame_height, frame_width = frame.shape[:2]
+                for hand_landmarks in results.multi_hand_landmarks:
+                    gesture, _ = self.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+                    if gesture:
+                        self.send_gesture(gesture)
+                        gestures += 1
+            
+            frames += 1
+            latencies.append((time.perf_counter() - read_at) * 1000)
+            
+            if self.stats_interval > 0:
+                elapsed = time.perf_counter() - window_start
+                if elapsed >= self.stats_interval:
+                    log.info(f"{frames / elapsed:.1f} fps | latency p50 {np.percentile(latencies, 50):.1f} ms "
+                             f"p95 {np.percentile(latencies, 95):.1f} ms | {gestures} gestures"
+                             + (f" | {self.motion_gate.stats()['skip_rate'] * 100:.0f}% gated"
+                                if self.motion_gate is not None else ""))
+                    frames = gestures = 0
+                    latencies.clear()
+                    window_start = time.perf_counter()
     
     def run(self):
         """Main loop"""
-        print("[SYSTEM] Starting...")
+        log.info("Starting...")
         
         # Start controller
         if not self.start_controller():
-            print("[SYSTEM] Warning: Controller not started")
+            log.warning("Controller not started")
         
         # Start camera
         if not self.start_camera():
-            print("[SYSTEM] Error: Camera failed")
+            log.error("Camera failed")
             return
         
         self.running = True
-        print("[SYSTEM] Ready! Point your INDEX FINGER to control")
-        print("[SYSTEM] Press 'q' to quit")
+        log.info("Ready! Point your INDEX FINGER to control")
+        
+        if self.headless:
+            try:
+                self.run_headless()
+            except KeyboardInterrupt:
+                log.info("Stopped")
+            except Exception as e:
+                log.error(f"{e}")
+            finally:
+                self.cleanup()
+                os._exit(0)
+        
+        log.info("Press 'q' to quit")
         
         window_name = 'Hand Tracking - Point Your Finger'
         
         try:
             while self.running:
-                ret, frame = self.cap.read()
+                # Read and mirror into reused buffers
+                ret, frame = self.preprocessor.read(self.cap)
                 if not ret:
                     break
                 
-                # Flip for mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Convert to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb_frame)
+                results = self.track(frame)
                 
                 frame_height, frame_width = frame.shape[:2]
                 
@@ -339,25 +428,25 @@ class HandTracker:
                 # Quit check - must come before window check
                 key = cv2.waitKey(1) & 0xFF
                 if key == ord('q'):
-                    print("\n[SYSTEM] Quit key pressed")
+                    log.info("Quit key pressed")
                     break
                 
                 # Check if window was closed (X button clicked)
                 try:
                     if cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) < 1:
-                        print("\n[SYSTEM] Window X button clicked")
+                        log.info("Window X button clicked")
                         self.running = False
                         break
                 except:
                     # Window was destroyed
-                    print("\n[SYSTEM] Window closed")
+                    log.info("Window closed")
                     self.running = False
                     break
                 
         except KeyboardInterrupt:
-            print("\n[SYSTEM] Stopped")
+            log.info("Stopped")
         except Exception as e:
-            print(f"\n[SYSTEM] Error: {e}")
+            log.error(f"{e}")
         finally:
             self.cleanup()
             # Force exit to ensure everything stops
@@ -372,7 +461,7 @@ class HandTracker:
             return
         
         self._cleaned_up = True
-        print("[SYSTEM] Cleaning up...")
+        log.info("Cleaning up...")
         self.running = False
         
         # Release camera
@@ -383,10 +472,11 @@ class HandTracker:
                 pass
         
         # Close OpenCV windows
-        try:
-            cv2.destroyAllWindows()
-        except:
-            pass
+        if not getattr(self, 'headless', False):
+            try:
+                cv2.destroyAllWindows()
+            except:
+                pass
         
         # Close MediaPipe hands
         if hasattr(self, 'hands'):
@@ -400,18 +490,29 @@ class HandTracker:
             try:
                 self.c_controller.terminate()
                 self.c_controller.wait(timeout=3)
-                print("[SYSTEM] C controller terminated")
+                log.info("C controller terminated")
             except:
                 try:
                     self.c_controller.kill()
-                    print("[SYSTEM] C controller force stopped")
+                    log.info("C controller force stopped")
                 except:
                     pass
         
-        print("[SYSTEM] Cleanup complete")
+        log.info("Cleanup complete")
+        # run() ends with os._exit(), which skips atexit - flush the log writer now
+        shutdown_logging()
 
 def main():
-    tracker = HandTracker()
+    parser = argparse.ArgumentParser(description="Standalone hand tracker for the C controller")
+    parser.add_argument("--headless", action="store_true",
+                        default=os.getenv('KINSNAKE_HEADLESS', '0') == '1',
+                        help="No window or drawing; stop with Ctrl+C / SIGTERM")
+    parser.add_argument("--stats-interval", type=float,
+                        default=float(os.getenv('KINSNAKE_STATS_INTERVAL', '0')),
+                        help="Print an fps/latency line every N seconds (0 = off)")
+    args = parser.parse_args()
+    
+    tracker = HandTracker(headless=args.headless, stats_interval=args.stats_interval)
     tracker.run()
 
 if __name__ == "__main__":
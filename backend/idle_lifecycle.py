@@ -0,0 +1,177 @@
+"""
+Idle Resource Lifecycle
+Releases the camera (and optionally the Hands graph) when nobody needs them
+and brings them back quickly when someone does.
+
+Holders are (kind, owner) pairs, e.g. ("game", websocket) while that client's
+game is running. With no holders and no activity (touch()) for `idle_s`
+seconds, on_suspend() runs; the next acquire()/touch()/resume() runs the warm
+resume path (reopen the camera, pre-warm the graph) before work continues.
+Open streams stay registered while suspended and wait in wait_resumed().
+"""
+
+import asyncio
+import time
+
+from structured_log import get_logger
+
+log = get_logger("SERVER")
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def rss_mb():
+    """Resident memory of this process in MB (None without psutil)"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    return round(psutil.Process().memory_info().rss / 1e6, 1)
+
+
+class IdleLifecycle:
+    """Reference-counted idle detection with suspend / warm-resume hooks
+
+    on_suspend() and on_resume() are coroutines; on_resume returns a dict of
+    timings that is kept for stats(). A hook that raises is logged and the
+    lifecycle still leaves the suspended state, so waiters are never stranded.
+    """
+
+    def __init__(self, idle_s, on_suspend, on_resume, poll_s=1.0):
+        self.idle_s = idle_s
+        self.on_suspend = on_suspend
+        self.on_resume = on_resume
+        self.poll_s = poll_s
+
+        self.holders = set()  # (kind, owner)
+        self.suspended = False
+        self.last_active = time.monotonic()
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._resume_task = None
+        self._suspend_task = None
+        self._task = None
+
+        # Stats
+        self.suspensions = 0
+        self.suspended_at = None
+        self.idle_seconds = 0.0
+        self.last_resume = None  # timings from on_resume
+        self.resume_ms = []
+        self.rss_before_suspend = None
+        self.rss_suspended = None
+
+    def start(self):
+        """Start the idle monitor (call from the event loop)"""
+        if self.idle_s > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def acquire(self, kind, owner):
+        self.holders.add((kind, owner))
+        self.touch()
+
+    def release(self, kind, owner):
+        self.holders.discard((kind, owner))
+        self.last_active = time.monotonic()
+
+    def release_owner(self, owner):
+        """Drop every hold of a disconnected client"""
+        self.holders = {h for h in self.holders if h[1] is not owner}
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        """Record activity; wakes suspended resources in the background"""
+        self.last_active = time.monotonic()
+        if self.suspended:
+            self._start_resume()
+
+    async def wait_resumed(self):
+        await self._resumed.wait()
+
+    async def resume(self):
+        """Warm resume; returns once resources are back (no-op when not suspended)"""
+        if self.suspended:
+            await asyncio.shield(self._start_resume())
+
+    def _start_resume(self):
+        if self._resume_task is None or self._resume_task.done():
+            self._resume_task = asyncio.create_task(self._resume())
+        return self._resume_task
+
+    async def _resume(self):
+        try:
+            if self._suspend_task is not None:
+                try:
+                    await self._suspend_task  # Let a suspend in progress finish first
+                except Exception:
+                    pass  # Logged by _run
+
+            start = time.perf_counter()
+            timings = await self.on_resume() or {}
+            timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self.last_resume = timings
+            self.resume_ms.append(timings["total_ms"])
+            self.resume_ms = self.resume_ms[-50:]
+        except Exception as e:
+            log.error(f"Resume from idle failed: {e}")
+        finally:
+            # Waiters always wake; a failed resource ends its stream by itself
+            if self.suspended_at is not None:
+                self.idle_seconds += time.monotonic() - self.suspended_at
+            self.suspended_at = None
+            self.suspended = False
+            self.last_active = time.monotonic()
+            self._resumed.set()
+
+    async def _suspend(self):
+        self.rss_before_suspend = rss_mb()
+        await self.on_suspend()
+        self.rss_suspended = rss_mb()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_s)
+            if self.suspended or self.holders:
+                continue
+            if time.monotonic() - self.last_active < self.idle_s:
+                continue
+
+            self.suspended = True
+            self.suspended_at = time.monotonic()
+            self._resumed.clear()
+            self.suspensions += 1
+            self._suspend_task = asyncio.ensure_future(self._suspend())
+            try:
+                await self._suspend_task
+            except Exception as e:
+                # Resources may be half released; the next resume reopens what it can
+                log.error(f"Idle suspend failed: {e}")
+            finally:
+                self._suspend_task = None
+
+    def stats(self):
+        idle_seconds = self.idle_seconds
+        if self.suspended_at is not None:
+            idle_seconds += time.monotonic() - self.suspended_at
+        return {
+            "idle_timeout_s": self.idle_s,
+            "holders": len(self.holders),
+            "suspended": self.suspended,
+            "suspensions": self.suspensions,
+            "idle_seconds": round(idle_seconds, 1),
+            "last_resume": self.last_resume,
+            "mean_resume_ms": round(sum(self.resume_ms) / len(self.resume_ms), 1) if self.resume_ms else None,
+            "rss_mb": rss_mb(),
+            "rss_mb_before_suspend": self.rss_before_suspend,
+            "rss_mb_suspended": self.rss_suspended,
+        }
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
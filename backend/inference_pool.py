@@ -0,0 +1,332 @@
+"""
+Process-Pool Hand Inference
+Each worker process owns its own MediaPipe Hands graph, so inference scales
+across cores instead of contending for one GIL.
+
+Frames travel through a multiprocessing.shared_memory ring of fixed-size slots.
+Only a tiny descriptor (seq, slot, height, width, is_bgr) goes over the pipe to
+the worker, and only landmarks + handedness come back.
+"""
+
+import multiprocessing as mp_proc
+from multiprocessing import connection as mp_connection
+from multiprocessing import shared_memory
+from concurrent.futures import Future, InvalidStateError
+import itertools
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from landmarks import pack_results, unpack_results
+from structured_log import get_logger
+
+log = get_logger("SERVER")
+
+# Same graph settings HandTrackingServer uses in-process
+DEFAULT_HANDS_CONFIG = {
+    "static_image_mode": False,
+    "max_num_hands": 1,
+    "model_complexity": 1,
+    "min_detection_confidence": 0.6,
+    "min_tracking_confidence": 0.5,
+}
+
+
+class InferencePoolBusy(RuntimeError):
+    """Raised by submit(block=False) when every ring slot is in flight"""
+
+
+class WorkerCrashed(RuntimeError):
+    """Set on futures whose worker died before returning a result"""
+
+
+def _worker_main(worker_id, shm_name, slot_shape, num_slots, task_conn, result_conn, hands_config):
+    """Worker process entry point: attach the ring, build a Hands graph, serve descriptors"""
+    # Import inside the child so the parent never pays for a second graph
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((num_slots,) + tuple(slot_shape), dtype=np.uint8, buffer=shm.buf)
+    rgb = np.empty(slot_shape, dtype=np.uint8)
+    hands = mp.solutions.hands.Hands(**hands_config)
+
+    try:
+        while True:
+            try:
+                task = task_conn.recv()
+            except EOFError:
+                break
+            if task is None:
+                break
+
+            seq, slot, height, width, is_bgr = task
+            try:
+                frame = ring[slot, :height, :width]
+                if is_bgr:
+                    # Convert into a reused buffer instead of allocating per frame
+                    dst = rgb[:height, :width]
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+                    frame = dst
+                results = hands.process(frame)
+                result_conn.send((seq, pack_results(results), None))
+            except Exception as e:
+                result_conn.send((seq, None, repr(e)))
+    finally:
+        hands.close()
+        del ring
+        shm.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, process, task_conn, result_conn):
+        self.started_at = time.time()
+        self.process = process
+        self.task_conn = task_conn
+        self.result_conn = result_conn
+        self.in_flight = set()  # seq numbers dispatched to this worker
+        self.send_lock = threading.Lock()
+        self.dead = False  # Set under the pool lock once it is being replaced
+
+
+class InferencePool:
+    """Pool of hand-inference worker processes fed through a shared-memory ring"""
+
+    def __init__(self, num_workers, frame_width=1280, frame_height=720,
+                 slots_per_worker=2, hands_config=None):
+        self.num_workers = max(1, int(num_workers))
+        self.slot_shape = (int(frame_height), int(frame_width), 3)
+        self.num_slots = self.num_workers * max(1, int(slots_per_worker))
+        self.hands_config = dict(hands_config or DEFAULT_HANDS_CONFIG)
+
+        # spawn: MediaPipe and OpenCV keep threads that do not survive fork()
+        self._ctx = mp_proc.get_context("spawn")
+        slot_bytes = int(np.prod(self.slot_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_bytes * self.num_slots)
+        self._ring = np.ndarray((self.num_slots,) + self.slot_shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        self._lock = threading.Lock()
+        self._free_slots = list(range(self.num_slots))
+        self._slot_available = threading.Semaphore(self.num_slots)
+        self._pending = {}  # seq -> (future, slot, worker_index, submitted_at monotonic)
+        self._seq = itertools.count()
+        self._closing = False
+
+        # Stats
+        self.restarts = 0
+        self.completed = 0
+
+        self._workers = [self._spawn_worker(i) for i in range(self.num_workers)]
+
+        self._collector = threading.Thread(target=self._collect_results, name="inference-pool-collector", daemon=True)
+        self._collector.start()
+        log.info(f"Inference pool started ({self.num_workers} workers, {self.num_slots} slots "
+              f"of {self.slot_shape[1]}x{self.slot_shape[0]})")
+
+    def _spawn_worker(self, worker_id):
+        task_recv, task_send = self._ctx.Pipe(duplex=False)
+        result_recv, result_send = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._shm.name, self.slot_shape, self.num_slots,
+                  task_recv, result_send, self.hands_config),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # Close the child's ends in the parent so EOF is seen if the child dies
+        task_recv.close()
+        result_send.close()
+        return _Worker(process, task_send, result_recv)
+
+    def submit(self, frame, is_bgr=True, block=True, timeout=None):
+        """Queue a frame for inference and return a Future resolving to MediaPipe-style results"""
+        if self._closing:
+            raise RuntimeError("Inference pool is closed")
+
+        if not self._slot_available.acquire(blocking=block, timeout=timeout if block else None):
+            raise InferencePoolBusy("No free inference slot")
+
+        height, width = frame.shape[:2]
+        max_height, max_width = self.slot_shape[:2]
+        if height > max_height or width > max_width:
+            # Landmarks are normalized, so a downscaled frame gives the same answer
+            scale = min(max_width / width, max_height / height)
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            height, width = frame.shape[:2]
+
+        future = Future()
+        with self._lock:
+            # Least-loaded live worker (a dead one has an empty in_flight but a broken pipe)
+            live = [i for i, w in enumerate(self._workers) if not w.dead]
+            if not live:
+                self._slot_available.release()
+                future.set_exception(WorkerCrashed("No live inference worker (restarting)"))
+                return future
+            worker_index = min(live, key=lambda i: len(self._workers[i].in_flight))
+            worker = self._workers[worker_index]
+            slot = self._free_slots.pop()
+            seq = next(self._seq)
+            worker.in_flight.add(seq)
+            self._pending[seq] = (future, slot, worker_index, time.monotonic())
+
+        self._ring[slot, :height, :width] = frame
+        try:
+            with worker.send_lock:
+                worker.task_conn.send((seq, slot, height, width, is_bgr))
+        except (OSError, ValueError) as e:
+            self._finish(seq, error=WorkerCrashed(f"Dispatch failed: {e}"))
+        return future
+
+    def _finish(self, seq, packed=None, error=None):
+        """Resolve a pending request and return its slot to the ring"""
+        with self._lock:
+            entry = self._pending.pop(seq, None)
+            if entry is None:
+                return
+            future, slot, worker_index, _ = entry
+            self._workers[worker_index].in_flight.discard(seq)
+            self._free_slots.append(slot)
+        self._slot_available.release()
+
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                self.completed += 1
+                future.set_result(unpack_results(packed))
+        except InvalidStateError:
+            pass  # The caller gave up on it (deadline); the slot is free all the same
+
+    def _collect_results(self):
+        """Background thread: resolve futures and restart crashed workers"""
+        while not self._closing:
+            workers = list(self._workers)
+            waitables = {}
+            for index, worker in enumerate(workers):
+                waitables[worker.result_conn] = index
+                waitables[worker.process.sentinel] = index
+
+            ready = mp_connection.wait(list(waitables.keys()), timeout=0.5)
+            crashed = set()
+            for obj in ready:
+                index = waitables[obj]
+                worker = workers[index]
+                if obj is worker.process.sentinel:
+                    crashed.add(index)
+                    continue
+                try:
+                    seq, packed, error = worker.result_conn.recv()
+                except (EOFError, OSError):
+                    crashed.add(index)
+                    continue
+                if error is not None:
+                    self._finish(seq, error=RuntimeError(f"Inference failed: {error}"))
+                else:
+                    self._finish(seq, packed=packed)
+
+            if not self._closing:
+                for index in crashed:
+                    self._restart_worker(index)
+
+    def _restart_worker(self, index):
+        """Fail the dead worker's in-flight frames and replace it"""
+        old = self._workers[index]
+        with self._lock:
+            old.dead = True  # submit() stops picking it before its slots free up
+        old.process.join(timeout=0.5)
+        exitcode = old.process.exitcode
+        # Drain anything the worker managed to send before dying
+        try:
+            while old.result_conn.poll():
+                seq, packed, error = old.result_conn.recv()
+                self._finish(seq, packed=packed, error=RuntimeError(error) if error else None)
+        except (EOFError, OSError):
+            pass
+
+        with self._lock:
+            stranded = list(old.in_flight)
+        for seq in stranded:
+            self._finish(seq, error=WorkerCrashed(f"Worker {index} exited with code {exitcode}"))
+
+        for conn in (old.task_conn, old.result_conn):
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+        # Back off if the worker dies right after starting (e.g. graph fails to load)
+        if time.time() - old.started_at < 1.0:
+            time.sleep(1.0)
+
+        self._workers[index] = self._spawn_worker(index)
+        self.restarts += 1
+        log.warning(f"Inference worker {index} crashed (exit code {exitcode}), restarted")
+
+    def restart_hung_workers(self, deadline_s):
+        """Kill workers holding a frame longer than deadline_s; returns their indexes
+
+        A worker whose graph hangs never exits, so the collector would never
+        restart it. Once killed, the collector sees it exit and _restart_worker
+        fails its frames and replaces it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            hung = {worker_index for _, _, worker_index, submitted_at in self._pending.values()
+                    if now - submitted_at > deadline_s and not self._workers[worker_index].dead}
+            processes = [self._workers[index].process for index in hung]
+        for process in processes:
+            process.kill()
+        return sorted(hung)
+
+    def stats(self):
+        """Snapshot of pool state"""
+        with self._lock:
+            in_flight = len(self._pending)
+        return {
+            "workers": self.num_workers,
+            "slots": self.num_slots,
+            "in_flight": in_flight,
+            "completed": self.completed,
+            "restarts": self.restarts,
+        }
+
+    def close(self, timeout=3.0):
+        """Stop workers and release the shared-memory ring"""
+        if self._closing:
+            return
+        self._closing = True
+        self._collector.join(timeout=1.0)
+
+        for worker in self._workers:
+            try:
+                with worker.send_lock:
+                    worker.task_conn.send(None)
+            except (OSError, ValueError):
+                pass
+
+        deadline = time.time() + timeout
+        for worker in self._workers:
+            worker.process.join(timeout=max(0.0, deadline - time.time()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+            for conn in (worker.task_conn, worker.result_conn):
+                try:
+                    conn.close()
+                except OSError:
+                    pass
+
+        with self._lock:
+            pending = list(self._pending.keys())
+        for seq in pending:
+            self._finish(seq, error=RuntimeError("Inference pool closed"))
+
+        del self._ring
+        try:
+            self._shm.close()
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,200 @@
+"""
+Lightweight Hand Landmark Containers
+Mirror the layout of MediaPipe Hands results so the gesture logic can run on
+landmarks that crossed a process boundary or came from somewhere else
+"""
+
+from collections import namedtuple
+import json
+import struct
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Binary landmark packet (browser-side tracking, see pack_landmark_packet):
+# magic, version, hand count, player, flags, frame width, frame height, id
+PACKET_MAGIC = b"KSLM"
+PACKET_VERSION = 1
+PACKET_FLAG_MIRROR = 0x01
+_PACKET_HEADER = struct.Struct("<4sBBBBHHI")
+_PACKET_HAND = struct.Struct("<BB")  # handedness (0 = Left, 1 = Right), score * 255
+_HAND_POINTS_SIZE = NUM_LANDMARKS * 3 * 4  # float32 x, y, z
+
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+Classification = namedtuple("Classification", ["label", "score"])
+
+
+class HandLandmarks:
+    """Stand-in for a MediaPipe NormalizedLandmarkList (exposes .landmark[i].x/y/z)"""
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        self.landmark = [Landmark(float(x), float(y), float(z)) for x, y, z in points]
+
+
+class Handedness:
+    """Stand-in for a MediaPipe ClassificationList (exposes .classification[0].label)"""
+    __slots__ = ("classification",)
+
+    def __init__(self, label, score=1.0):
+        self.classification = [Classification(label, float(score))]
+
+
+class HandResults:
+    """Stand-in for the object returned by Hands.process()"""
+    __slots__ = ("multi_hand_landmarks", "multi_handedness")
+
+    def __init__(self, hands=None):
+        # Same convention as MediaPipe: None when no hand was found
+        hands = hands or []
+        self.multi_hand_landmarks = [h for h, _ in hands] or None
+        self.multi_handedness = [c for _, c in hands] or None
+
+
+def pack_results(results):
+    """Reduce MediaPipe results to a small picklable list of (points, label, score)"""
+    packed = []
+    if results.multi_hand_landmarks and results.multi_handedness:
+        for hand_landmarks, hand_info in zip(results.multi_hand_landmarks, results.multi_handedness):
+            points = np.array(
+                [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark],
+                dtype=np.float32
+            )
+            classification = hand_info.classification[0]
+            packed.append((points, classification.label, float(classification.score)))
+    return packed
+
+
+def unpack_results(packed):
+    """Rebuild a HandResults object from the output of pack_results()"""
+    return HandResults([
+        (HandLandmarks(points), Handedness(label, score))
+        for points, label, score in packed
+    ])
+
+
+def mirror_results(results):
+    """Mirror results from an unflipped frame as if the frame had been flipped
+
+    Flips landmark x-coordinates and swaps handedness, since MediaPipe labels
+    hands assuming a mirrored (selfie) input. Works in place on MediaPipe
+    protos and on HandResults alike.
+    """
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            points = hand_landmarks.landmark
+            for i, lm in enumerate(points):
+                if isinstance(lm, Landmark):
+                    points[i] = lm._replace(x=1.0 - lm.x)
+                else:
+                    lm.x = 1.0 - lm.x
+
+    if results.multi_handedness:
+        for hand_info in results.multi_handedness:
+            classification = hand_info.classification[0]
+            swapped = "Left" if classification.label == "Right" else "Right"
+            if isinstance(classification, Classification):
+                hand_info.classification[0] = classification._replace(label=swapped)
+            else:
+                classification.label = swapped
+    return results
+
+
+def results_from_json(hands):
+    """HandResults from a "landmarks" message: [{"points": 21 x [x, y, z] (or 63 floats), "handedness", "score"}]"""
+    if not isinstance(hands, list):
+        raise ValueError("hands must be a list")
+    parsed = []
+    for hand in hands:
+        points = np.asarray(hand.get("points"), dtype=np.float64)
+        if points.size == NUM_LANDMARKS * 2:
+            points = np.column_stack([points.reshape(NUM_LANDMARKS, 2), np.zeros(NUM_LANDMARKS)])
+        if points.size != NUM_LANDMARKS * 3:
+            raise ValueError(f"expected {NUM_LANDMARKS} points per hand")
+        points = points.reshape(NUM_LANDMARKS, 3)
+        if not np.isfinite(points).all():
+            raise ValueError("points must be finite")
+        label = str(hand.get("handedness", "Right")).capitalize()
+        if label not in ("Left", "Right"):
+            raise ValueError("handedness must be Left or Right")
+        parsed.append((HandLandmarks(points), Handedness(label, hand.get("score", 1.0))))
+    return HandResults(parsed)
+
+
+def parse_handedness(value):
+    """Client-supplied "handedness" field -> "left", "right" or None when absent (ValueError otherwise)"""
+    if value is None:
+        return None
+    if not isinstance(value, str) or value.lower() not in ("left", "right"):
+        raise ValueError("handedness must be left or right")
+    return value.lower()
+
+
+def check_frame_size(width, height):
+    """Frame size the landmarks were normalized to; the detector's pixel thresholds need a real frame"""
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive")
+    return width, height
+
+
+def pack_landmark_packet(hands, width, height, message_id=0, player=0, mirror=False):
+    """Binary landmark message: hands is a list of (points (21, 3), label, score)"""
+    parts = [_PACKET_HEADER.pack(PACKET_MAGIC, PACKET_VERSION, len(hands), player,
+                                 PACKET_FLAG_MIRROR if mirror else 0, width, height, message_id)]
+    for points, label, score in hands:
+        parts.append(_PACKET_HAND.pack(1 if label == "Right" else 0, int(round(min(max(score, 0.0), 1.0) * 255))))
+        parts.append(np.asarray(points, dtype="<f4").reshape(NUM_LANDMARKS, 3).tobytes())
+    return b"".join(parts)
+
+
+def unpack_landmark_packet(data):
+    """Parse a binary landmark message -> (HandResults, width, height, message_id, player, mirror)"""
+    if len(data) < _PACKET_HEADER.size:
+        raise ValueError("packet too short")
+    magic, version, count, player, flags, width, height, message_id = _PACKET_HEADER.unpack_from(data, 0)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION:
+        raise ValueError("not a version 1 landmark packet")
+    hand_size = _PACKET_HAND.size + _HAND_POINTS_SIZE
+    if len(data) != _PACKET_HEADER.size + count * hand_size:
+        raise ValueError("packet length does not match hand count")
+    check_frame_size(width, height)
+
+    hands = []
+    offset = _PACKET_HEADER.size
+    for _ in range(count):
+        label, score = _PACKET_HAND.unpack_from(data, offset)
+        points = np.frombuffer(data, dtype="<f4", count=NUM_LANDMARKS * 3,
+                               offset=offset + _PACKET_HAND.size).reshape(NUM_LANDMARKS, 3)
+        if not np.isfinite(points).all():
+            raise ValueError("points must be finite")
+        hands.append((HandLandmarks(points), Handedness("Right" if label else "Left", score / 255)))
+        offset += hand_size
+    return HandResults(hands), width, height, message_id, player, bool(flags & PACKET_FLAG_MIRROR)
+
+
+def write_recording(path, samples):
+    """Save a landmark recording as JSON lines
+
+    samples: iterable of (timestamp, hand_landmarks or None, handedness label, direction label or None).
+    The direction label is optional ground truth for training and evaluation.
+    """
+    with open(path, "w") as f:
+        for t, hand_landmarks, handedness, label in samples:
+            points = None
+            if hand_landmarks is not None:
+                points = [[round(lm.x, 5), round(lm.y, 5), round(lm.z, 5)] for lm in hand_landmarks.landmark]
+            f.write(json.dumps({"t": t, "points": points, "handedness": handedness, "label": label}) + "\n")
+
+
+def read_recording(path):
+    """Load a recording written by write_recording() -> list of (t, HandLandmarks or None, handedness, label)"""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            hand_landmarks = HandLandmarks(row["points"]) if row.get("points") else None
+            samples.append((row["t"], hand_landmarks, row.get("handedness"), row.get("label")))
+    return samples
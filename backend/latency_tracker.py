@@ -0,0 +1,202 @@
+"""
+Glass-to-Gesture Latency
+Measures end-to-end latency from camera capture to the moment a client
+applied the resulting gesture, with per-connection clock synchronization.
+
+Clock sync (NTP style, server initiated after {"type": "clock_sync"}):
+
+    server -> client  {"type": "clock_ping", "seq", "t0"}         t0 = server send
+    client -> server  {"type": "clock_pong", "seq", "t0", "t1", "t2"}
+                      t1 = client receive, t2 = client send (client clock)
+    server receives at t3:
+        rtt    = (t3 - t0) - (t2 - t1)
+        offset = ((t1 - t0) + (t2 - t3)) / 2      client clock - server clock
+
+The offset of the lowest-RTT sample of the last few rounds is used (the
+one least distorted by queueing). All times are epoch milliseconds.
+
+Gesture events carry "seq" and "capture_ts" (server clock, when the frame
+was captured); camera frames carry "capture_ts". A client reports
+{"type": "applied", "seq", "applied_ts"} (client clock) when it acted on a
+gesture, and the latency is applied_ts - offset - capture_ts, split into
+the server part (capture -> sent) and the rest (network + client).
+"""
+
+import itertools
+import math
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+def now_ms():
+    return time.time() * 1000.0
+
+
+def _summary(values):
+    if not values:
+        return {"count": 0}
+    array = np.asarray(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(array, 50)), 1),
+        "p95_ms": round(float(np.percentile(array, 95)), 1),
+        "p99_ms": round(float(np.percentile(array, 99)), 1),
+        "max_ms": round(float(array.max()), 1),
+    }
+
+
+class ClockSync:
+    """Clock offset / RTT estimate for one connection"""
+
+    def __init__(self, keep=16):
+        self.samples = deque(maxlen=keep)  # (rtt_ms, offset_ms)
+
+    def add(self, t0, t1, t2, t3):
+        rtt = (t3 - t0) - (t2 - t1)
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        self.samples.append((max(rtt, 0.0), offset))
+
+    @property
+    def synced(self):
+        return bool(self.samples)
+
+    def best(self):
+        """(rtt_ms, offset_ms) of the lowest-RTT sample"""
+        return min(self.samples) if self.samples else (None, None)
+
+    def to_server(self, client_ms):
+        _, offset = self.best()
+        return client_ms - (offset or 0.0)
+
+
+class _Connection:
+    def __init__(self, name, window):
+        self.name = name
+        self.clock = ClockSync()
+        self.end_to_end = deque(maxlen=window)
+        self.server_part = deque(maxlen=window)
+        self.client_part = deque(maxlen=window)
+        self.unsynced_reports = 0
+        self.unknown_reports = 0
+
+
+class LatencyTracker:
+    """Stamps outgoing events, runs clock sync and aggregates applied reports"""
+
+    def __init__(self, window=1000, max_events=4096):
+        self.window = window
+        self.max_events = max_events
+        self._events = OrderedDict()  # seq -> (capture_ms, sent_ms)
+        self._seq = 0
+        self._pings = {}  # (connection key, seq) -> t0
+        self._ping_seq = 0
+        self._connections = {}
+        self._names = itertools.count(1)
+        self.all_end_to_end = deque(maxlen=window * 4)
+
+    def _connection(self, key):
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = self._connections[key] = _Connection(f"c{next(self._names)}", self.window)
+        return connection
+
+    def stamp(self, message, capture_time=None):
+        """Add "seq" and "capture_ts" (capture_time in epoch seconds) to a gesture event"""
+        self._seq += 1
+        sent = now_ms()
+        capture = capture_time * 1000.0 if capture_time is not None else sent
+        self._events[self._seq] = (capture, sent)
+        if len(self._events) > self.max_events:
+            self._events.popitem(last=False)
+        message["seq"] = self._seq
+        message["capture_ts"] = round(capture, 1)
+        return message
+
+    def ping(self, key):
+        """Next clock_ping message for this connection"""
+        self._ping_seq += 1
+        t0 = now_ms()
+        self._pings[(key, self._ping_seq)] = t0
+        if len(self._pings) > self.max_events:
+            del self._pings[next(iter(self._pings))]  # Never answered
+        return {"type": "clock_ping", "seq": self._ping_seq, "t0": t0}
+
+    def pong(self, key, data):
+        """Handle a clock_pong; returns True if it matched a ping"""
+        t3 = now_ms()
+        t0 = self._pings.pop((key, data.get("seq")), None)
+        if t0 is None:
+            return False
+        t1, t2 = float(data["t1"]), float(data["t2"])
+        if not (math.isfinite(t1) and math.isfinite(t2)):
+            return False
+        self._connection(key).clock.add(t0, t1, t2, t3)
+        return True
+
+    def server_time(self, key, client_ms):
+        """Client-clock ms -> server epoch seconds (None if missing, malformed or the connection is not synced)"""
+        connection = self._connections.get(key)
+        if client_ms is None or connection is None or not connection.clock.synced:
+            return None
+        try:
+            client_ms = float(client_ms)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(client_ms):
+            return None
+        return connection.clock.to_server(client_ms) / 1000.0
+
+    def clock(self, key):
+        """{"offset_ms", "rtt_ms"} for a connection (None until synced)"""
+        rtt, offset = self._connection(key).clock.best()
+        return {
+            "offset_ms": round(offset, 2) if offset is not None else None,
+            "rtt_ms": round(rtt, 2) if rtt is not None else None,
+        }
+
+    def applied(self, key, seq, applied_ts):
+        """Client applied gesture `seq` at applied_ts (client clock); returns latency ms or None"""
+        connection = self._connection(key)
+        event = self._events.get(seq)
+        if event is None:
+            connection.unknown_reports += 1
+            return None
+        if not connection.clock.synced:
+            connection.unsynced_reports += 1
+            return None
+        applied_ts = float(applied_ts)
+        if not math.isfinite(applied_ts):
+            return None
+        capture, sent = event
+        applied = connection.clock.to_server(applied_ts)
+        end_to_end = applied - capture
+        connection.end_to_end.append(end_to_end)
+        connection.server_part.append(sent - capture)
+        connection.client_part.append(applied - sent)
+        self.all_end_to_end.append(end_to_end)
+        return end_to_end
+
+    def forget(self, key):
+        """Connection closed"""
+        self._connections.pop(key, None)
+        self._pings = {k: v for k, v in self._pings.items() if k[0] is not key}
+
+    def connection_stats(self, key):
+        connection = self._connection(key)
+        return {
+            "connection": connection.name,
+            **self.clock(key),
+            "end_to_end": _summary(list(connection.end_to_end)),
+            "server_ms": _summary(list(connection.server_part)),
+            "network_client_ms": _summary(list(connection.client_part)),
+            "unsynced_reports": connection.unsynced_reports,
+            "unknown_reports": connection.unknown_reports,
+        }
+
+    def stats(self):
+        return {
+            "end_to_end": _summary(list(self.all_end_to_end)),
+            "connections": [self.connection_stats(key) for key in self._connections],
+        }
@@ -0,0 +1,351 @@
+"""
+KinSnake WebSocket Load Test
+Opens N synthetic players against /ws. Every player sends game_state and
+direction commands and streams JPEG frames through the "frame" message at a
+fixed rate (or, with --upload landmarks/binary, browser-tracked landmarks
+instead of frames); player 0 can also start the server camera. Each step of the ramp
+reports achieved throughput, command -> gesture and frame -> frame_result
+latency, server CPU / memory, and the first player count that saturates.
+
+Run against a server on the synthetic camera source (no webcam needed):
+    python loadtest.py --spawn-server --players 1 2 4 8 16
+or against one that is already running:
+    KINSNAKE_CAMERA_SOURCE=synthetic python server.py
+    python loadtest.py --server-pid <pid> --players 1 2 4 8
+
+Commands and frames carry an "id" that the server echoes back, which is how
+responses are matched to requests. Players also sync clocks with the server
+(clock_sync) and report every gesture event as applied on receipt, so the
+e2e columns are capture -> applied latency on the server clock (commands are
+stamped with the client's send time as their capture time).
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import cv2
+import websockets
+
+from bench import load_frames, percentile, print_table, synthetic_hand
+from landmarks import pack_landmark_packet
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DIRECTIONS = ("UP", "RIGHT", "DOWN", "LEFT")
+
+
+def encode_frames(frames, quality=70):
+    """JPEG + base64 data URLs, as the frontend uploads them"""
+    encoded = []
+    for frame in frames:
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            encoded.append("data:image/jpeg;base64," + base64.b64encode(buffer).decode("ascii"))
+    return encoded
+
+
+def landmark_payloads(count, width, height):
+    """One hand sweeping through every direction, as browser-side tracking would report it"""
+    payloads = []
+    for i in range(count):
+        angle = (i // 8) * 90 % 360 - 90  # Hold each direction for 8 frames: UP, RIGHT, DOWN, LEFT
+        hand = synthetic_hand(angle, width, height)
+        points = [[lm.x, lm.y, lm.z] for lm in hand.landmark]
+        payloads.append(points)
+    return payloads
+
+
+def upload_message(upload, payload, message_id, width, height):
+    """Wire message for one upload; binary ids are integers"""
+    if upload == "frame":
+        return json.dumps({"type": "frame", "id": message_id, "frame": payload})
+    if upload == "landmarks":
+        return json.dumps({"type": "landmarks", "id": message_id, "width": width, "height": height,
+                           "hands": [{"points": payload, "handedness": "Right", "score": 0.9}]})
+    return pack_landmark_packet([(payload, "Right", 0.9)], width, height, message_id)
+
+
+class PlayerStats:
+    """Counters and latency samples for one player during one step"""
+
+    def __init__(self):
+        self.frames_sent = 0
+        self.frame_results = 0
+        self.frame_latencies = []  # ms
+        self.commands_sent = 0
+        self.gestures = 0
+        self.command_latencies = []  # ms
+        self.camera_frames = 0
+        self.end_to_end = []  # ms, capture -> applied here (server clock)
+        self.dropped = 0
+        self.errors = 0
+
+
+async def run_player(index, url, frames, fps, command_rate, start_camera, stop_at, stats,
+                     upload="frame", size=(640, 480)):
+    """One synthetic client; returns when stop_at (perf_counter) is reached"""
+    sent_at = {}  # id -> perf_counter
+    clock = {}  # This client's offset from the server clock (clock_offset message)
+
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.recv()  # "connected"
+            await ws.send(json.dumps({"type": "game_state", "running": True}))
+            await ws.send(json.dumps({"type": "clock_sync"}))
+            if start_camera:
+                await ws.send(json.dumps({"type": "start_camera"}))
+
+            async def receive():
+                async for raw in ws:
+                    received = time.time() * 1000
+                    message = json.loads(raw)
+                    kind = message.get("type")
+                    if kind == "clock_ping":
+                        await ws.send(json.dumps({"type": "clock_pong", "seq": message["seq"], "t0": message["t0"],
+                                                  "t1": received, "t2": time.time() * 1000}))
+                        continue
+                    if kind == "clock_offset":
+                        clock.update(message)
+                    if kind == "gesture" and "seq" in message:
+                        # "Applying" the event is receiving it; the server aggregates these too
+                        await ws.send(json.dumps({"type": "applied", "seq": message["seq"], "applied_ts": received}))
+                        if clock.get("offset_ms") is not None:
+                            stats.end_to_end.append(received - clock["offset_ms"] - message["capture_ts"])
+                    sent = sent_at.pop(message.get("id"), None)
+                    if kind in ("frame_result", "landmark_result"):
+                        stats.frame_results += 1
+                        if sent is not None:
+                            stats.frame_latencies.append((time.perf_counter() - sent) * 1000)
+                    elif kind == "gesture" and sent is not None:
+                        stats.gestures += 1
+                        stats.command_latencies.append((time.perf_counter() - sent) * 1000)
+                    elif kind == "camera_frame":
+                        stats.camera_frames += 1
+                    elif kind == "backpressure":
+                        stats.dropped += message.get("dropped", 0)
+
+            async def send():
+                frame_interval = 1.0 / fps if fps > 0 else None
+                command_interval = 1.0 / command_rate if command_rate > 0 else None
+                now = time.perf_counter()
+                next_frame = now
+                next_command = now + (command_interval or 0)
+                sequence = 0
+                while True:
+                    now = time.perf_counter()
+                    if now >= stop_at:
+                        return
+                    if frame_interval is not None and now >= next_frame:
+                        message_id = (index + 1) * 1_000_000 + sequence if upload == "binary" else f"p{index}-f{sequence}"
+                        sent_at[message_id] = now
+                        await ws.send(upload_message(upload, frames[sequence % len(frames)], message_id, *size))
+                        stats.frames_sent += 1
+                        next_frame += frame_interval
+                        sequence += 1
+                    if command_interval is not None and now >= next_command:
+                        message_id = f"p{index}-c{sequence}"
+                        sent_at[message_id] = now
+                        await ws.send(json.dumps({"type": "command", "id": message_id, "capture_ts": time.time() * 1000,
+                                                  "gesture": DIRECTIONS[stats.commands_sent % 4]}))
+                        stats.commands_sent += 1
+                        next_command += command_interval
+                    upcoming = min(t for t in (next_frame if frame_interval else None,
+                                               next_command if command_interval else None,
+                                               stop_at) if t is not None)
+                    await asyncio.sleep(max(0.0, upcoming - time.perf_counter()))
+
+            receiver = asyncio.create_task(receive())
+            try:
+                await send()
+                await asyncio.sleep(0.5)  # Let in-flight responses arrive
+            finally:
+                receiver.cancel()
+                try:
+                    await receiver
+                except (asyncio.CancelledError, websockets.ConnectionClosed):
+                    pass
+                if start_camera:
+                    await ws.send(json.dumps({"type": "stop_camera"}))
+    except (OSError, websockets.WebSocketException):
+        stats.errors += 1
+
+
+async def sample_process(process, stop_at, samples):
+    """Poll server CPU% and RSS until stop_at"""
+    process.cpu_percent(None)  # Prime the counter
+    while time.perf_counter() < stop_at:
+        await asyncio.sleep(0.5)
+        try:
+            samples.append((process.cpu_percent(None), process.memory_info().rss))
+        except psutil.Error:
+            return
+
+
+async def run_step(args, frames, players, process):
+    stop_at = time.perf_counter() + args.duration
+    stats = [PlayerStats() for _ in range(players)]
+    samples = []
+
+    tasks = [run_player(i, args.url, frames, args.fps, args.command_rate,
+                        args.camera and i == 0, stop_at, stats[i], args.upload, (args.width, args.height))
+             for i in range(players)]
+    if process is not None:
+        tasks.append(sample_process(process, stop_at, samples))
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = max(1e-6, min(time.perf_counter(), stop_at) - started)
+
+    frame_latencies = [v for s in stats for v in s.frame_latencies]
+    command_latencies = [v for s in stats for v in s.command_latencies]
+    end_to_end = [v for s in stats for v in s.end_to_end]
+    frames_sent = sum(s.frames_sent for s in stats)
+    frame_results = sum(s.frame_results for s in stats)
+    commands_sent = sum(s.commands_sent for s in stats)
+
+    row = {
+        "players": players,
+        "target_fps": round(players * args.fps, 1),
+        "sent_fps": round(frames_sent / elapsed, 1),
+        "result_fps": round(frame_results / elapsed, 1),
+        "frame_p50": round(percentile(frame_latencies, 50), 1),
+        "frame_p95": round(percentile(frame_latencies, 95), 1),
+        "frame_p99": round(percentile(frame_latencies, 99), 1),
+        "cmd_p50": round(percentile(command_latencies, 50), 1),
+        "cmd_p95": round(percentile(command_latencies, 95), 1),
+        "cmd_ok": f"{sum(s.gestures for s in stats)}/{commands_sent}",
+        "e2e_p50": round(percentile(end_to_end, 50), 1),
+        "e2e_p95": round(percentile(end_to_end, 95), 1),
+        "dropped": sum(s.dropped for s in stats),
+        "cam_fps": round(stats[0].camera_frames / elapsed, 1) if args.camera else "",
+        "errors": sum(s.errors for s in stats),
+    }
+    if samples:
+        row["cpu_%"] = round(sum(c for c, _ in samples) / len(samples), 1)
+        row["rss_mb"] = round(max(m for _, m in samples) / 1e6, 1)
+
+    # Saturated: the server answers fewer frames than requested, or too slowly
+    answered = row["result_fps"] / row["target_fps"] if row["target_fps"] else 1.0
+    p95 = max(row["frame_p95"], row["cmd_p95"])
+    row["saturated"] = "yes" if (answered < args.min_ratio or p95 > args.p95_limit_ms or row["errors"]) else "no"
+    return row
+
+
+def wait_for_server(url, timeout=60.0):
+    """Poll /health until the server answers"""
+    health = url.replace("ws://", "http://").replace("wss://", "https://").rsplit("/ws", 1)[0] + "/health"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(health, timeout=1.0):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def spawn_server():
+    """Start server.py on the synthetic camera source"""
+    env = dict(os.environ, KINSNAKE_CAMERA_SOURCE="synthetic")
+    return subprocess.Popen([sys.executable, "server.py"], env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def main_async(args):
+    if args.upload == "frame":
+        frames = encode_frames(load_frames(args.video, args.frames, args.width, args.height), args.quality)
+    else:
+        frames = landmark_payloads(args.frames, args.width, args.height)
+    sample = upload_message(args.upload, frames[0], 0, args.width, args.height)
+    print(f"{len(frames)} {args.upload} uploads, {len(sample) / 1024:.1f} KB each")
+
+    server_process = None
+    process = None
+    if args.spawn_server:
+        server_process = spawn_server()
+        args.server_pid = server_process.pid
+    try:
+        if not wait_for_server(args.url):
+            raise SystemExit(f"Server did not answer at {args.url}")
+        if args.server_pid:
+            if PSUTIL_AVAILABLE:
+                process = psutil.Process(args.server_pid)
+            else:
+                print("psutil not installed - server CPU/memory will not be reported")
+
+        rows = []
+        saturation = None
+        for players in args.players:
+            row = await run_step(args, frames, players, process)
+            rows.append(row)
+            print(f"  {players} players: {row['result_fps']} results/s, frame p95 {row['frame_p95']} ms, "
+                  f"command p95 {row['cmd_p95']} ms")
+            if row["saturated"] == "yes" and saturation is None:
+                saturation = players
+                if not args.keep_going:
+                    break
+
+        columns = ["players", "target_fps", "sent_fps", "result_fps", "frame_p50", "frame_p95",
+                   "frame_p99", "cmd_p50", "cmd_p95", "cmd_ok", "e2e_p50", "e2e_p95", "dropped"]
+        if args.camera:
+            columns.append("cam_fps")
+        if process is not None:
+            columns += ["cpu_%", "rss_mb"]
+        columns += ["errors", "saturated"]
+        print()
+        print_table(rows, columns)
+        print()
+        if saturation is None:
+            print(f"No saturation up to {args.players[-1]} players at {args.fps} fps each")
+        else:
+            print(f"Saturation at {saturation} players ({saturation * args.fps:.0f} frames/s offered)")
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            try:
+                server_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server_process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KinSnake WebSocket load test")
+    parser.add_argument("--url", default="ws://localhost:8000/ws")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Concurrent players per ramp step")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--fps", type=float, default=15.0, help="Frames uploaded per player per second (0 = none)")
+    parser.add_argument("--command-rate", type=float, default=2.0, help="Commands per player per second")
+    parser.add_argument("--camera", action="store_true", help="Player 0 also starts the server camera stream")
+    parser.add_argument("--upload", choices=["frame", "landmarks", "binary"], default="frame",
+                        help="What players upload: JPEG frames, JSON landmarks or binary landmark packets")
+    parser.add_argument("--video", help="Recorded session to upload instead of synthetic frames")
+    parser.add_argument("--frames", type=int, default=60, help="Distinct frames to cycle through")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=70, help="JPEG quality of uploads")
+    parser.add_argument("--server-pid", type=int, help="Sample CPU/memory of this server process")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="Start server.py with KINSNAKE_CAMERA_SOURCE=synthetic for the run")
+    parser.add_argument("--p95-limit-ms", type=float, default=250.0,
+                        help="p95 latency above which a step counts as saturated")
+    parser.add_argument("--min-ratio", type=float, default=0.9,
+                        help="Answered/offered frame ratio below which a step counts as saturated")
+    parser.add_argument("--keep-going", action="store_true", help="Keep ramping after saturation")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
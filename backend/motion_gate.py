@@ -0,0 +1,87 @@
+"""
+Static-Scene Motion Gate
+Decides before inference whether a frame can reuse the previous hand
+results. Each frame is shrunk to a tiny grayscale thumbnail (64x36 by
+default: a bilinear step to 4x that size, then an area average - a few
+hundred microseconds at 1280x720, and the averaging hides sensor noise)
+and compared with the thumbnail of the last frame that actually went
+through MediaPipe; the mean absolute difference is the motion score.
+
+Below `threshold` (gray levels) the scene has not changed since the last
+inference, so its landmarks are still valid and the caller reuses them.
+Inference always runs again after `min_refresh_s`, so tracking never goes
+stale and slow drifts are picked up.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Frame-difference gate in front of hand inference"""
+
+    def __init__(self, threshold=2.0, min_refresh_s=0.25, size=(64, 36)):
+        self.threshold = threshold
+        self.min_refresh_s = min_refresh_s
+        self.size = size
+
+        self._mid = np.empty((size[1] * 4, size[0] * 4, 3), dtype=np.uint8)
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._reference = None  # Thumbnail of the last inferred frame
+        self._diff = np.empty_like(self._gray)
+        self._last_inference = 0.0
+
+        # Stats
+        self.frames = 0
+        self.skipped = 0
+        self.last_score = None
+        self.gate_us = 0.0  # Smoothed cost of the check itself
+
+    def should_infer(self, frame, timestamp=None):
+        """True if this frame needs inference; call inferred() after running it"""
+        start = time.perf_counter()
+        now = time.monotonic() if timestamp is None else timestamp
+        self.frames += 1
+
+        cv2.resize(frame, self._mid.shape[1::-1], dst=self._mid, interpolation=cv2.INTER_LINEAR)
+        cv2.resize(self._mid, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        infer = True
+        if self._reference is not None:
+            cv2.absdiff(self._gray, self._reference, dst=self._diff)
+            self.last_score = float(self._diff.mean())
+            infer = (self.last_score >= self.threshold
+                     or now - self._last_inference >= self.min_refresh_s)
+
+        if not infer:
+            self.skipped += 1
+        cost_us = (time.perf_counter() - start) * 1e6
+        self.gate_us = cost_us if self.frames == 1 else self.gate_us * 0.95 + cost_us * 0.05
+        return infer
+
+    def inferred(self, timestamp=None):
+        """The frame from the last should_infer() call went through inference"""
+        self._last_inference = time.monotonic() if timestamp is None else timestamp
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            np.copyto(self._reference, self._gray)
+
+    def reset(self):
+        """Forget the reference (e.g. after the camera was reopened)"""
+        self._reference = None
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            "last_score": round(self.last_score, 2) if self.last_score is not None else None,
+            "gate_us": round(self.gate_us, 1),
+            "threshold": self.threshold,
+            "min_refresh_ms": round(self.min_refresh_s * 1000),
+        }
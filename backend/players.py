@@ -0,0 +1,69 @@
+"""
+Two-Player Mode
+One camera and one Hands graph (max_num_hands=2) serve two players. Each
+detected hand is assigned to a player either by handedness ("Left" /
+"Right") or by which half of the mirrored preview its wrist is in, and every
+player keeps its own gesture detector (stability vote, predictor), gesture
+events and controller pipe.
+"""
+
+ASSIGN_MODES = ("halves", "handedness")
+PLAYER_IDS = (1, 2)
+
+
+def parse_player_id(value):
+    """Client-supplied "player" field -> 1 or 2, None when absent (ValueError otherwise)"""
+    if not value:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"player must be one of {PLAYER_IDS}")
+    player_id = int(value)
+    if player_id not in PLAYER_IDS:
+        raise ValueError(f"player must be one of {PLAYER_IDS}")
+    return player_id
+
+
+class Player:
+    """One player's hand slot, temporal filtering and controller target"""
+
+    def __init__(self, player_id, side, detector, pipe_path):
+        self.id = player_id
+        self.side = side  # "left" / "right": preview half or hand label
+        self.detector = detector
+        self.pipe_path = pipe_path
+        self.ring = None  # CommandRing when KINSNAKE_CONTROLLER_CHANNEL=ring
+
+        # Per-player controller rate limiting (same fields the server uses for one player)
+        self.last_gesture = None
+        self.last_gesture_time = 0
+
+        self.hand = None  # Landmarks assigned this frame
+        self.gesture = None
+
+    def __repr__(self):
+        return f"Player({self.id}, {self.side})"
+
+
+def assign_hands(results, players, mode="halves"):
+    """Map each player id to its hand landmarks this frame (missing players -> None)
+
+    results must already be in preview (mirrored) coordinates. If two hands
+    compete for one slot, the first one MediaPipe reported wins.
+    """
+    assigned = {player.id: None for player in players}
+    if not results.multi_hand_landmarks:
+        return assigned
+
+    labels = results.multi_handedness or [None] * len(results.multi_hand_landmarks)
+    by_side = {player.side: player for player in players}
+    for hand_landmarks, hand_info in zip(results.multi_hand_landmarks, labels):
+        if mode == "handedness":
+            if hand_info is None:
+                continue
+            side = hand_info.classification[0].label.lower()
+        else:
+            side = "left" if hand_landmarks.landmark[0].x < 0.5 else "right"
+        player = by_side.get(side)
+        if player is not None and assigned[player.id] is None:
+            assigned[player.id] = hand_landmarks
+    return assigned
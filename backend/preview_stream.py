@@ -0,0 +1,93 @@
+"""
+Shared JPEG Preview + MJPEG Stream
+The camera stream loop encodes each preview frame once and publishes it
+here. The WebSocket path base64-wraps the same bytes into camera_frame
+messages; GET /preview.mjpg serves them as multipart/x-mixed-replace so a
+browser can show the preview in a plain <img> and decode it natively.
+
+MJPEG viewers receive exactly the frames the stream loop publishes (the same
+adaptive preview rate as the WebSocket path). A viewer that falls behind
+skips straight to the newest frame instead of queueing old ones.
+"""
+
+import asyncio
+import time
+
+BOUNDARY = "frame"
+
+
+class PreviewHub:
+    """Latest encoded preview frame with waiters for the next one"""
+
+    def __init__(self):
+        self.jpeg = None
+        self.sequence = 0
+        self.timestamp = 0.0
+        self._new_frame = None  # asyncio.Event, created on the event loop
+
+        # Stats
+        self.published = 0
+        self.viewers = 0
+        self.mjpeg_frames = 0
+        self.mjpeg_bytes = 0
+        self.ws_frames = 0
+        self.ws_bytes = 0
+
+    def _event(self):
+        if self._new_frame is None:
+            self._new_frame = asyncio.Event()
+        return self._new_frame
+
+    def publish(self, jpeg, timestamp=None):
+        """Store a new encoded frame (bytes or a cv2.imencode buffer) and wake viewers"""
+        self.jpeg = jpeg.tobytes() if hasattr(jpeg, "tobytes") else bytes(jpeg)
+        self.sequence += 1
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.published += 1
+
+        # Wake everyone waiting on this frame; later waiters get a fresh event
+        event, self._new_frame = self._event(), asyncio.Event()
+        event.set()
+
+    def count_ws_send(self, size):
+        self.ws_frames += 1
+        self.ws_bytes += size
+
+    async def next_frame(self, after_sequence, timeout=1.0):
+        """Newest frame newer than after_sequence, or None after `timeout` seconds"""
+        if self.jpeg is not None and self.sequence > after_sequence:
+            return self.jpeg, self.sequence
+        try:
+            await asyncio.wait_for(self._event().wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.jpeg, self.sequence
+
+    async def mjpeg(self, is_disconnected):
+        """multipart/x-mixed-replace body; ends when is_disconnected() (awaitable) is true"""
+        self.viewers += 1
+        sequence = 0
+        try:
+            while not await is_disconnected():
+                frame = await self.next_frame(sequence)
+                if frame is None:
+                    continue  # No new frame (stream idle or stopped) - recheck the client
+                jpeg, sequence = frame
+                part = (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n").encode("ascii") + jpeg + b"\r\n"
+                self.mjpeg_frames += 1
+                self.mjpeg_bytes += len(part)
+                yield part
+        finally:
+            self.viewers -= 1
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "viewers": self.viewers,
+            "mjpeg_frames": self.mjpeg_frames,
+            "mjpeg_bytes": self.mjpeg_bytes,
+            "ws_frames": self.ws_frames,
+            "ws_bytes": self.ws_bytes,
+            "last_frame_age_s": round(time.time() - self.timestamp, 2) if self.jpeg is not None else None,
+        }
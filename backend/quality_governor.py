@@ -0,0 +1,101 @@
+"""
+Runtime Quality Governor
+Watches per-frame processing time against a frame budget and moves between
+ordered quality levels (model complexity, inference resolution, overlay
+detail) with hysteresis, so weak machines hold frame rate and strong ones
+use the headroom.
+"""
+
+from collections import namedtuple
+import time
+
+QualityLevel = namedtuple("QualityLevel", ["name", "model_complexity", "inference_width", "overlay"])
+
+# Lowest to highest. "high" is the original fixed configuration.
+QUALITY_LEVELS = (
+    QualityLevel("low", model_complexity=0, inference_width=480, overlay="fast"),
+    QualityLevel("medium", model_complexity=0, inference_width=960, overlay="full"),
+    QualityLevel("high", model_complexity=1, inference_width=1280, overlay="full"),
+)
+
+
+class QualityGovernor:
+    """Chooses a quality level from an exponential moving average of frame time
+
+    Steps down after `down_frames` consecutive frames over budget and steps up
+    only after `up_frames` consecutive frames under `up_ratio` * budget, with a
+    cooldown after every change so the level does not oscillate.
+    """
+
+    def __init__(self, budget_ms=33.0, levels=QUALITY_LEVELS, start_level=None,
+                 down_frames=15, up_frames=90, up_ratio=0.6, cooldown_s=3.0,
+                 smoothing=0.1):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.index = len(levels) - 1 if start_level is None else start_level
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.up_ratio = up_ratio
+        self.cooldown_s = cooldown_s
+        self.smoothing = smoothing
+
+        self.avg_ms = None
+        self._over = 0
+        self._under = 0
+        self._last_change = 0.0
+        self.history = []  # (timestamp, from_name, to_name, avg_ms)
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def record(self, frame_ms):
+        """Add one frame's processing time; returns the new level if it changed, else None"""
+        if self.avg_ms is None:
+            self.avg_ms = frame_ms
+        else:
+            self.avg_ms += self.smoothing * (frame_ms - self.avg_ms)
+
+        if self.avg_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self.avg_ms < self.budget_ms * self.up_ratio:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        now = time.time()
+        if now - self._last_change < self.cooldown_s:
+            return None
+
+        if self._over >= self.down_frames and self.index > 0:
+            return self._change(self.index - 1, now)
+        if self._under >= self.up_frames and self.index < len(self.levels) - 1:
+            return self._change(self.index + 1, now)
+        return None
+
+    def _change(self, index, now):
+        previous = self.level
+        self.index = index
+        self._over = 0
+        self._under = 0
+        self._last_change = now
+        self.history.append((now, previous.name, self.level.name, round(self.avg_ms, 1)))
+        del self.history[:-20]
+        return self.level
+
+    def stats(self):
+        return {
+            "level": self.level.name,
+            "model_complexity": self.level.model_complexity,
+            "inference_width": self.level.inference_width,
+            "overlay": self.level.overlay,
+            "budget_ms": self.budget_ms,
+            "avg_frame_ms": round(self.avg_ms, 1) if self.avg_ms is not None else None,
+            "changes": [
+                {"time": t, "from": a, "to": b, "avg_frame_ms": ms}
+                for t, a, b, ms in self.history
+            ],
+        }
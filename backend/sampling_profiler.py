@@ -0,0 +1,204 @@
+"""
+On-Demand Sampling Profiler + Event-Loop Lag
+Started by GET /debug/profile for a fixed window while the server keeps
+running; nothing exists (no thread, no task, no hooks) outside that window,
+so profiling costs nothing when it is not active.
+
+SamplingProfiler is a daemon thread that snapshots every other thread's
+Python stack with sys._current_frames() every `interval_s` (event loop,
+"hands" inference executor, pool collector, rebuild threads ...) and counts
+identical stacks. The result is exported as collapsed stacks
+("thread;outer;...;inner count", for flamegraph.pl / speedscope / inferno)
+or as a speedscope JSON document with one sampled profile per thread.
+
+LoopLagMonitor runs on the event loop over the same window: it asks to
+wake up every `interval_s` and records how late each wakeup actually was.
+A blocked loop (a synchronous call in a coroutine, a long callback) shows
+up as lag even when the sampled stacks look idle.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def _frame_name(code):
+    name = getattr(code, "co_qualname", code.co_name)  # co_qualname: Python 3.11+
+    module = code.co_filename.replace("\\", "/").rsplit("/", 1)[-1]
+    if module.endswith(".py"):
+        module = module[:-3]
+    return f"{module}.{name}"
+
+
+def _summary(values_ms):
+    """count / mean / p50 / p95 / p99 / max of a list of milliseconds"""
+    if not values_ms:
+        return {"count": 0}
+    ordered = sorted(values_ms)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 2),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+class SamplingProfiler:
+    """Periodic stack sampler for every Python thread except itself"""
+
+    def __init__(self, interval_s=0.005, max_depth=64):
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.counts = Counter()  # (thread name, (frame, ...) root first) -> samples
+        self.frames = {}  # frame key -> (name, file, first line)
+        self.samples = 0
+        self.sampler_s = 0.0  # Time spent taking samples
+        self.started_at = None
+        self.duration_s = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration_s = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own = threading.get_ident()
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if key not in self.frames:
+                        self.frames[key] = (_frame_name(code), code.co_filename, code.co_firstlineno)
+                    stack.append(key)
+                    frame = frame.f_back
+                stack.reverse()
+                self.counts[(names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+            del frame
+            self.samples += 1
+            self.sampler_s += time.perf_counter() - start
+
+            next_at += self.interval_s
+            delay = next_at - time.perf_counter()
+            if delay <= 0:
+                next_at = time.perf_counter()  # Fell behind: don't burst to catch up
+            self._stop.wait(max(delay, 0))
+
+    def collapsed(self):
+        """Collapsed stacks, one "thread;outer;...;inner count" line per distinct stack"""
+        lines = []
+        for (thread, stack), count in self.counts.most_common():
+            names = [thread.replace(";", ":").replace(" ", "_")]
+            names += [self.frames[key][0].replace(";", ":").replace(" ", "_") for key in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="kinsnake"):
+        """speedscope file-format document: one sampled profile per thread"""
+        index = {key: i for i, key in enumerate(self.frames)}
+        frames = [{"name": n, "file": f, "line": line} for n, f, line in self.frames.values()]
+        by_thread = {}
+        for (thread, stack), count in self.counts.items():
+            profile = by_thread.setdefault(thread, {"samples": [], "weights": []})
+            profile["samples"].append([index[key] for key in stack])
+            profile["weights"].append(count * self.interval_s)
+        profiles = [{
+            "type": "sampled",
+            "name": thread,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(p["weights"]), 6),
+            "samples": p["samples"],
+            "weights": p["weights"],
+        } for thread, p in sorted(by_thread.items())]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "kinsnake sampling_profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "interval_ms": round(self.interval_s * 1000, 2),
+            "duration_s": round(self.duration_s, 2),
+            "achieved_interval_ms": round(self.duration_s / self.samples * 1000, 2) if self.samples else None,
+            "sampler_overhead_pct": round(self.sampler_s / self.duration_s * 100, 2) if self.duration_s else None,
+            "threads": sorted({thread for thread, _ in self.counts}),
+        }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps `interval_s`"""
+
+    def __init__(self, interval_s=0.01, slow_ms=50.0):
+        self.interval_s = interval_s
+        self.slow_ms = slow_ms
+        self.lags_ms = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            self.lags_ms.append(max(0.0, (loop.time() - scheduled) * 1000))
+
+    def stats(self):
+        summary = _summary(self.lags_ms)
+        summary["interval_ms"] = round(self.interval_s * 1000, 2)
+        summary[f"over_{self.slow_ms:.0f}ms"] = sum(1 for lag in self.lags_ms if lag > self.slow_ms)
+        return summary
+
+
+async def profile_window(seconds, interval_s=0.005, lag_interval_s=0.01):
+    """Sample all threads and event-loop lag for `seconds`; the loop keeps running meanwhile"""
+    profiler = SamplingProfiler(interval_s)
+    lag = LoopLagMonitor(lag_interval_s)
+    profiler.start()
+    lag.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await lag.stop()
+        # join() is short (at most one interval) but keep it off the loop
+        await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+    return profiler, lag
@@ -15,16 +15,44 @@ import signal
 import sys
 import atexit
 from pathlib import Path
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import base64
+import hmac
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from capture import open_capture
+from command_ring import CommandRing
+from frame_admission import FrameAdmission
+from frame_codec import decode_frame
+from direction_predictor import DirectionPredictor
+from frame_preprocess import FramePreprocessor
+from gesture_model import LearnedGestureClassifier
+from gestures import PointingGestureDetector, is_finger_extended
+from idle_lifecycle import IdleLifecycle
+from preview_stream import PreviewHub, BOUNDARY
+from quality_governor import QualityGovernor
+from snake_engine import SnakeScheduler
+from stall_watchdog import StallWatchdog
+from structured_log import get_logger, hot, dropped_records
+from inference_pool import DEFAULT_HANDS_CONFIG, InferencePool, InferencePoolBusy
+from motion_gate import MotionGate
+from latency_tracker import LatencyTracker
+from landmarks import (
+    HandResults, check_frame_size, mirror_results, parse_handedness, results_from_json, unpack_landmark_packet
+)
+from players import ASSIGN_MODES, Player, assign_hands, parse_player_id
+from sampling_profiler import profile_window
 
 # Load environment variables
 load_dotenv()
 
+log = get_logger("SERVER")
+
 # Voice system removed
 
 app = FastAPI(title="KinSnake Backend Server")
@@ -38,9 +66,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+CONTROLLER_PIPE = r"\\.\pipe\vcgi_pipe"
+
+
 class HandTrackingServer:
     def __init__(self):
-        print("=== KinSnake Backend Server ===")
+        log.info("=== KinSnake Backend Server ===")
         
         # Setup cleanup handlers
         self.setup_signal_handlers()
@@ -52,23 +83,156 @@ class HandTrackingServer:
         self.active_stream_websocket = None  # Track which websocket owns the stream
         self.game_is_running = False  # Track if game is active
         
+        # Two-player mode (KINSNAKE_PLAYERS=2): one graph tracks up to two hands
+        self.num_players = 2 if os.getenv('KINSNAKE_PLAYERS', '1') == '2' else 1
+        
         # MediaPipe setup (optimized for better tracking)
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            model_complexity=1,  # 1 = balanced (better tracking than 0)
-            min_detection_confidence=0.6,  # Higher for better initial detection
-            min_tracking_confidence=0.5  # Balanced for smooth tracking
-        )
+        self.hands_complexity = 1  # 1 = balanced (better tracking than 0)
+        self.hands = None  # Built below unless the inference pool takes over
+        
+        # Quality governor: trades model complexity, inference resolution and
+        # overlay detail to hold the frame budget (KINSNAKE_QUALITY_GOVERNOR=0 disables)
+        self.quality_governor = None
+        if os.getenv('KINSNAKE_QUALITY_GOVERNOR', '1') == '1':
+            self.quality_governor = QualityGovernor(
+                budget_ms=float(os.getenv('KINSNAKE_FRAME_BUDGET_MS', '33'))
+            )
+        self.hands_rebuild_thread = None
+        
+        # Optional MediaPipe Tasks live-stream backend for the camera stream
+        # (KINSNAKE_INFERENCE_BACKEND=tasks). Uploaded frames keep using self.hands.
+        self.live_tracker = None
+        self.live_hand = None  # Latest selected-hand landmarks from the live tracker
+        self.live_gesture = None
+        self.live_frame_size = (1280, 720)
+        self.live_dispatches = set()  # Gesture dispatch tasks from live results (asyncio holds tasks weakly)
+        self.event_loop = None
+        self.live_model_path = os.getenv('KINSNAKE_HAND_MODEL', str(Path(__file__).parent / "hand_landmarker.task"))
+        if os.getenv('KINSNAKE_INFERENCE_BACKEND', 'solutions') == 'tasks':
+            try:
+                from tasks_backend import LiveStreamHandTracker
+                self.live_tracker = LiveStreamHandTracker(self.on_live_result, model_path=self.live_model_path)
+                log.info("Using MediaPipe Tasks live-stream inference")
+            except Exception as e:
+                log.warning(f"Tasks backend unavailable, using Hands: {e}")
+        
+        # In-process inference runs on one dedicated thread so the event loop
+        # keeps receiving while a frame is processed (also serializes graph access)
+        self.inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hands")
+        # Camera reads run on their own thread too, so a hung device cannot block the loop
+        self.capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        
+        # Optional multi-process inference (KINSNAKE_INFERENCE_WORKERS=0 keeps it in-process)
+        self.inference_pool = None
+        inference_workers = int(os.getenv('KINSNAKE_INFERENCE_WORKERS', '0'))
+        if inference_workers > 0:
+            try:
+                self.inference_pool = InferencePool(
+                    inference_workers, frame_width=1280, frame_height=720,
+                    hands_config={**DEFAULT_HANDS_CONFIG, "max_num_hands": self.num_players}
+                )
+            except Exception as e:
+                log.warning(f"Inference pool unavailable, using in-process Hands: {e}")
+        if self.inference_pool is None:
+            # Every pool worker holds its own graph; in-process inference needs this one
+            self.hands = self.build_hands(self.hands_complexity)
         
         # Gesture tracking - INSTANT response
         self.last_gesture = None
         self.last_gesture_time = 0
         self.gesture_cooldown = 0.05  # 50ms - INSTANT response
-        self.gesture_history = []  # Track recent gestures for stability
+        # Pointing rules + stability vote; optional early commands from motion
+        # extrapolation (KINSNAKE_PREDICTIVE=1)
+        self.direction_predictor = None
+        if os.getenv('KINSNAKE_PREDICTIVE', '0') == '1':
+            self.direction_predictor = DirectionPredictor(
+                horizon_ms=float(os.getenv('KINSNAKE_PREDICT_HORIZON_MS', '60'))
+            )
+        
+        # Optional trained classifier instead of the angle-band rules (KINSNAKE_GESTURE_MODEL=model.npz)
+        self.gesture_classifier = None
+        model_path = os.getenv('KINSNAKE_GESTURE_MODEL')
+        if model_path:
+            try:
+                self.gesture_classifier = LearnedGestureClassifier.load(model_path)
+                log.info(f"Gesture classifier loaded from {model_path}")
+            except Exception as e:
+                log.warning(f"Gesture classifier unavailable, using angle rules: {e}")
+        self.gesture_detector = PointingGestureDetector(
+            predictor=self.direction_predictor,
+            classifier=self.gesture_classifier,
+            accept_confidence=float(os.getenv('KINSNAKE_ACCEPT_CONFIDENCE', '0.7'))
+        )
         self.stable_gesture = None  # Current stable gesture
         
+        # Two-player mode: hands are assigned to players by preview half or
+        # handedness; each player has its own detector, events and controller pipe
+        self.players = []
+        self.player_assign = os.getenv('KINSNAKE_PLAYER_ASSIGN', 'halves')
+        if self.num_players == 2:
+            if self.player_assign not in ASSIGN_MODES:
+                log.warning(f"Unknown KINSNAKE_PLAYER_ASSIGN '{self.player_assign}', using halves")
+                self.player_assign = 'halves'
+            if self.live_tracker is not None:
+                log.warning("Two-player mode needs the solutions backend; the camera stream stays single-player")
+            for player_id, side in ((1, "left"), (2, "right")):
+                predictor = None
+                if self.direction_predictor is not None:
+                    predictor = DirectionPredictor(
+                        horizon_ms=float(os.getenv('KINSNAKE_PREDICT_HORIZON_MS', '60'))
+                    )
+                self.players.append(Player(
+                    player_id, side,
+                    PointingGestureDetector(
+                        predictor=predictor,
+                        classifier=self.gesture_classifier,
+                        accept_confidence=self.gesture_detector.accept_confidence
+                    ),
+                    os.getenv(f'KINSNAKE_P{player_id}_PIPE',
+                              CONTROLLER_PIPE if player_id == 1 else CONTROLLER_PIPE + "_p2")
+                ))
+            log.info(f"Two-player mode ({self.player_assign}): "
+                     + ", ".join(f"P{p.id} {p.side} -> {p.pipe_path}" for p in self.players))
+        
+        # Optional server-side snake games, one per connection, all on one
+        # fixed tick (KINSNAKE_SNAKE_ENGINE=1). Gestures steer them directly.
+        self.snake_scheduler = None
+        if os.getenv('KINSNAKE_SNAKE_ENGINE', '0') == '1':
+            self.snake_scheduler = SnakeScheduler(
+                self.send_snake,
+                tick_ms=float(os.getenv('KINSNAKE_SNAKE_TICK_MS', '150'))
+            )
+        
+        # Controller channel: named pipe (default), or a shared-memory command
+        # ring (KINSNAKE_CONTROLLER_CHANNEL=ring) with the pipe as fallback
+        # whenever no controller is reading the ring
+        self.command_ring = None
+        if os.getenv('KINSNAKE_CONTROLLER_CHANNEL', 'pipe') == 'ring':
+            ring_name = os.getenv('KINSNAKE_RING_NAME', 'kinsnake_ring')
+            try:
+                self.command_ring = CommandRing(ring_name)
+                for player in self.players:
+                    player.ring = self.command_ring if player.id == 1 else CommandRing(f"{ring_name}_p{player.id}")
+                log.info(f"Controller command ring: {ring_name}")
+            except Exception as e:
+                log.warning(f"Command ring unavailable, using the named pipe: {e}")
+                self.command_ring = None
+        
+        # Stall watchdog: deadlines on the last good frame / inference result
+        # while streaming, escalating reopen camera -> rebuild graph -> notify
+        self.frame_deadline_s = float(os.getenv('KINSNAKE_FRAME_DEADLINE_MS', '2000')) / 1000
+        self.inference_deadline_s = float(os.getenv('KINSNAKE_INFERENCE_DEADLINE_MS', '3000')) / 1000
+        self.watchdog = None
+        if os.getenv('KINSNAKE_WATCHDOG', '1') == '1':
+            self.watchdog = StallWatchdog(
+                {"reopen_camera": self.recover_camera, "rebuild_graph": self.recover_graph,
+                 "notify": self.notify_pipeline_status},
+                is_active=lambda: self.streaming_active and self.camera_active and not self.camera_suspended,
+                frame_deadline_s=self.frame_deadline_s,
+                inference_deadline_s=self.inference_deadline_s
+            )
+        
         # C controller
         self.c_controller = None
         self.start_controller()
@@ -78,13 +242,102 @@ class HandTrackingServer:
         
         # Frame streaming
         self.streaming_active = False
+        # Encoded previews are shared by camera_frame messages and GET /preview.mjpg;
+        # a client that watches the MJPEG stream can turn the WebSocket copy off
+        self.preview_hub = PreviewHub()
+        self.ws_preview = True
+        
+        # Glass-to-gesture latency: gesture events carry seq/capture_ts, clients
+        # sync clocks (clock_sync) and report when they applied them (applied)
+        self.latency = LatencyTracker()
+        self.clock_sync_rounds = int(os.getenv('KINSNAKE_CLOCK_SYNC_ROUNDS', '8'))
+        
+        # GET /debug/profile exists only when KINSNAKE_DEBUG_TOKEN is set
+        self.debug_token = os.getenv('KINSNAKE_DEBUG_TOKEN') or None
+        self.profiling = False
+        
+        # Idle lifecycle: with no running game and no client activity for
+        # KINSNAKE_IDLE_TIMEOUT_S, release the camera (and the Hands graph with
+        # KINSNAKE_IDLE_RELEASE_GRAPH=1); the next client that needs them warm-resumes
+        self.camera_suspended = False
+        self.release_graph_when_idle = os.getenv('KINSNAKE_IDLE_RELEASE_GRAPH', '0') == '1'
+        self.lifecycle = IdleLifecycle(
+            float(os.getenv('KINSNAKE_IDLE_TIMEOUT_S', '120')),
+            self.suspend_resources,
+            self.resume_resources
+        )
+        
+        # Optional motion gate: on a static scene the camera stream reuses the
+        # last hand results instead of running inference (KINSNAKE_MOTION_GATE=1)
+        self.motion_gate = None
+        if os.getenv('KINSNAKE_MOTION_GATE', '0') == '1':
+            self.motion_gate = MotionGate(
+                threshold=float(os.getenv('KINSNAKE_MOTION_THRESHOLD', '2.0')),
+                min_refresh_s=float(os.getenv('KINSNAKE_MIN_REFRESH_MS', '250')) / 1000
+            )
+        
+        # Reused capture/mirror/RGB buffers. By default the mirror effect is
+        # applied to landmarks instead of flipping every captured pixel.
+        self.preprocessor = FramePreprocessor(
+            mirror=True,
+            flip_pixels=os.getenv('KINSNAKE_FLIP_PIXELS', '0') == '1'
+        )
+        
+        log.info("Ready")
+    
+    def build_hands(self, model_complexity):
+        """Create a Hands graph with the server's tracking settings"""
+        return self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=self.num_players,
+            model_complexity=model_complexity,
+            min_detection_confidence=0.6,  # Higher for better initial detection
+            min_tracking_confidence=0.5  # Balanced for smooth tracking
+        )
+    
+    def apply_quality_level(self, level):
+        """Switch to a governor quality level without stalling the stream"""
+        governor = self.quality_governor
+        log.info(f"Quality level -> {level.name} (complexity {level.model_complexity}, "
+              f"{level.inference_width}px, {level.overlay} overlay; "
+              f"avg frame {governor.avg_ms:.1f} ms vs {governor.budget_ms:.0f} ms budget)")
+        
+        # Model complexity only applies to the in-process Hands graph
+        if level.model_complexity == self.hands_complexity:
+            return
+        if self.inference_pool is not None or self.live_tracker is not None:
+            return
+        if self.hands_rebuild_thread is not None and self.hands_rebuild_thread.is_alive():
+            return  # The running rebuild picks up the latest level when it finishes
         
-        print("[SERVER] Ready")
+        def rebuild():
+            # Loading a graph takes hundreds of ms - do it off the event loop,
+            # and keep going until the graph matches the governor's current level
+            while True:
+                complexity = self.quality_governor.level.model_complexity
+                if complexity == self.hands_complexity:
+                    return
+                try:
+                    new_hands = self.build_hands(complexity)
+                except Exception as e:
+                    log.error(f"Hands rebuild failed: {e}")
+                    return
+                
+                def swap():
+                    # Runs on the inference thread, between process() calls
+                    old_hands, self.hands = self.hands, new_hands
+                    self.hands_complexity = complexity
+                    if old_hands is not None:  # None while released for idle
+                        old_hands.close()
+                self.inference_executor.submit(swap).result()
+        
+        self.hands_rebuild_thread = threading.Thread(target=rebuild, name="hands-rebuild", daemon=True)
+        self.hands_rebuild_thread.start()
     
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful termination"""
         def signal_handler(signum, frame):
-            print("\n[SERVER] Termination signal received, cleaning up...")
+            log.info("Termination signal received, cleaning up...")
             self.cleanup()
             sys.exit(0)
         
@@ -100,11 +353,11 @@ class HandTrackingServer:
         try:
             controller_path = Path(__file__).parent / "c_controller" / "motion_controller_bidirectional.exe"
             if not controller_path.exists():
-                print(f"[SERVER] Bidirectional controller not found at {controller_path}")
+                log.info(f"Bidirectional controller not found at {controller_path}")
                 # Fallback to old controller
                 controller_path = Path(__file__).parent / "c_controller" / "motion_controller_persistent.exe"
                 if not controller_path.exists():
-                    print(f"[SERVER] No controller found")
+                    log.info("No controller found")
                     return False
             
             log_path = Path(__file__).parent / "controller.log"
@@ -113,162 +366,179 @@ class HandTrackingServer:
             try:
                 test_pipe = open(r"\\.\pipe\vcgi_pipe", 'w')
                 test_pipe.close()
-                print("[SERVER] C Controller already running")
+                log.info("C Controller already running")
                 return True
             except:
                 pass  # Controller not running, start it
             
+            command = [str(controller_path), "-d", "-l", str(log_path)]
+            if self.command_ring is not None and "bidirectional" in controller_path.name:
+                command += ["-r", self.command_ring.name]
             self.c_controller = subprocess.Popen(
-                [str(controller_path), "-d", "-l", str(log_path)],
+                command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 creationflags=subprocess.CREATE_NEW_CONSOLE  # Show controller window
             )
             time.sleep(2)  # Give controller more time to create pipe
-            print("[SERVER] C Controller started (bidirectional mode)")
-            print("[SERVER] Controller window should be visible")
+            log.info("C Controller started (bidirectional mode)")
+            log.info("Controller window should be visible")
             return True
         except Exception as e:
-            print(f"[SERVER] Controller error: {e}")
+            log.error(f"Controller error: {e}")
             return False
     
     def detect_pointing_direction(self, hand_landmarks, frame_width, frame_height):
         """Detect which direction the index finger is pointing with stability"""
-        wrist = hand_landmarks.landmark[0]
-        index_base = hand_landmarks.landmark[5]
-        index_mid = hand_landmarks.landmark[6]
-        index_2nd = hand_landmarks.landmark[7]
-        index_tip = hand_landmarks.landmark[8]
-        
-        # Check if index finger is extended
-        if not self.is_finger_extended(hand_landmarks, 8):
-            return None
-        
-        # Convert to pixel coordinates
-        tip_x = int(index_tip.x * frame_width)
-        tip_y = int(index_tip.y * frame_height)
-        second_x = int(index_2nd.x * frame_width)
-        second_y = int(index_2nd.y * frame_height)
-        mid_x = int(index_mid.x * frame_width)
-        mid_y = int(index_mid.y * frame_height)
-        base_x = int(index_base.x * frame_width)
-        base_y = int(index_base.y * frame_height)
-        
-        # Calculate pointing direction using entire finger
-        dx1 = mid_x - base_x
-        dy1 = mid_y - base_y
-        dx2 = second_x - mid_x
-        dy2 = second_y - mid_y
-        dx3 = tip_x - second_x
-        dy3 = tip_y - second_y
-        
-        # Weighted average (tip segment weighted more)
-        dx = (dx1 + dx2 + dx3 * 2) / 4
-        dy = (dy1 + dy2 + dy3 * 2) / 4
-        
-        # Lower threshold - responsive but clear
-        threshold = 15
-        
-        # Use angles for accurate direction
-        if abs(dx) > threshold or abs(dy) > threshold:
-            angle = np.arctan2(dy, dx) * 180 / np.pi  # -180 to 180
-            
-            # Map angles to directions
-            if -40 <= angle <= 40:
-                detected = "RIGHT"
-            elif 50 < angle <= 130:
-                detected = "DOWN"
-            elif angle > 140 or angle <= -140:
-                detected = "LEFT"
-            else:  # -130 < angle < -50
-                detected = "UP"
-            
-            # Light stability check: requires 2 out of last 3 frames (FASTER)
-            self.gesture_history.append(detected)
-            if len(self.gesture_history) > 3:
-                self.gesture_history.pop(0)
-            
-            # Quick confirmation - 2 out of 3 frames
-            if len(self.gesture_history) >= 2 and self.gesture_history.count(detected) >= 2:
-                return detected
-        
-        return None
+        return self.gesture_detector.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
     
     def is_finger_extended(self, hand_landmarks, finger_tip_id):
         """Check if a finger is extended STRICTLY"""
-        if finger_tip_id == 4:  # Thumb
-            tip = hand_landmarks.landmark[4]
-            base = hand_landmarks.landmark[2]
-        else:  # Other fingers
-            tip = hand_landmarks.landmark[finger_tip_id]
-            mid = hand_landmarks.landmark[finger_tip_id - 1]
-            base = hand_landmarks.landmark[finger_tip_id - 2]
-        
-        wrist = hand_landmarks.landmark[0]
-        
-        # Calculate distances from wrist
-        tip_dist = ((tip.x - wrist.x)**2 + (tip.y - wrist.y)**2)**0.5
-        base_dist = ((base.x - wrist.x)**2 + (base.y - wrist.y)**2)**0.5
-        
-        # STRICT check if finger is straight and extended
-        if finger_tip_id != 4:
-            mid_dist = ((mid.x - wrist.x)**2 + (mid.y - wrist.y)**2)**0.5
-            # Finger must be clearly extended AND straight
-            is_extended = tip_dist > base_dist * 1.15  # Stricter (was 1.05)
-            is_straight = mid_dist > base_dist and mid_dist < tip_dist
-            
-            # Also check other fingers are NOT extended (only index pointing)
-            if finger_tip_id == 8:  # Index finger
-                # Check that middle, ring, pinky are curled
-                middle_tip = hand_landmarks.landmark[12]
-                ring_tip = hand_landmarks.landmark[16]
-                pinky_tip = hand_landmarks.landmark[20]
-                
-                middle_dist = ((middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2)**0.5
-                ring_dist = ((ring_tip.x - wrist.x)**2 + (ring_tip.y - wrist.y)**2)**0.5
-                pinky_dist = ((pinky_tip.x - wrist.x)**2 + (pinky_tip.y - wrist.y)**2)**0.5
-                
-                # Other fingers should be closer to wrist (curled)
-                others_curled = (middle_dist < tip_dist * 0.9 and 
-                               ring_dist < tip_dist * 0.9 and 
-                               pinky_dist < tip_dist * 0.9)
-                
-                return is_extended and is_straight and others_curled
-            
-            return is_extended and is_straight
-        
-        return tip_dist > base_dist * 1.1
-    
+        return is_finger_extended(hand_landmarks, finger_tip_id)
     
-    def send_to_controller(self, gesture):
-        """Send gesture to C controller (only when game is running)"""
+    def send_to_controller(self, gesture, player=None):
+        """Send gesture to C controller (only when game is running); player picks the pipe"""
         # Only send gestures when game is active
         if not self.game_is_running:
             return None
         
         current_time = time.time()
+        state = player if player is not None else self  # Holds last_gesture / last_gesture_time
         
         # Only send if gesture changed or enough time passed
-        if gesture == self.last_gesture and current_time - self.last_gesture_time < self.gesture_cooldown:
+        if gesture == state.last_gesture and current_time - state.last_gesture_time < self.gesture_cooldown:
             return gesture  # Return cached gesture
         
         try:
-            # Write only - don't wait for response (non-blocking)
-            with open(r"\\.\pipe\vcgi_pipe", 'w', buffering=1) as pipe:
-                pipe.write(f"{gesture}\n")
-                pipe.flush()
+            ring = player.ring if player is not None else self.command_ring
+            if ring is not None and ring.consumer_alive() and ring.pending() < ring.capacity:
+                # Shared-memory handoff while the controller's heartbeat is fresh (else the pipe)
+                ring.push(gesture, player.id if player is not None else 0)
+            else:
+                # Write only - don't wait for response (non-blocking)
+                with open(player.pipe_path if player is not None else CONTROLLER_PIPE, 'w', buffering=1) as pipe:
+                    pipe.write(f"{gesture}\n")
+                    pipe.flush()
             
-            print(f"[SERVER] → C Controller: {gesture}")
+            if player is not None:
+                log.info("→ C Controller P%d: %s", player.id, gesture, extra=hot(f"controller_send_p{player.id}", per_second=10))
+            else:
+                log.info("→ C Controller: %s", gesture, extra=hot("controller_send", per_second=10))
             
             
-            self.last_gesture = gesture
-            self.last_gesture_time = current_time
+            state.last_gesture = gesture
+            state.last_gesture_time = current_time
             return gesture
             
         except Exception as e:
             # C controller not running - silently continue
             return None
     
+    async def detect_hands(self, frame, rgb_out=None):
+        """Run hand inference on a BGR frame (worker pool if enabled, otherwise in-process)
+        
+        rgb_out is an optional preallocated buffer for the RGB conversion.
+        """
+        if self.inference_pool is not None:
+            try:
+                future = self.inference_pool.submit(frame, is_bgr=True, block=False)
+            except InferencePoolBusy:
+                # Every slot is in flight - drop this frame rather than queue behind it
+                return HandResults()
+            # A hung worker times out here; the watchdog then kills and replaces it
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.inference_deadline_s)
+        
+        def process():
+            # Convert to RGB for MediaPipe
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_out)
+            if self.hands is None:
+                # Released while idle and the warm resume has not run yet
+                self.hands = self.build_hands(self.hands_complexity)
+            return self.hands.process(rgb_frame)
+        
+        loop = asyncio.get_running_loop()
+        # A hung graph times out here; the watchdog then replaces it and its thread
+        return await asyncio.wait_for(loop.run_in_executor(self.inference_executor, process),
+                                      self.inference_deadline_s)
+    
+    def select_hand(self, results, handedness):
+        """Return the landmarks of the hand matching the selected handedness, or None"""
+        if results.multi_hand_landmarks and results.multi_handedness:
+            for hand_landmarks, hand_info in zip(results.multi_hand_landmarks, results.multi_handedness):
+                # Filter by handedness
+                detected_hand = hand_info.classification[0].label.lower()
+                if detected_hand == handedness.lower():
+                    return hand_landmarks
+        return None
+    
+    async def dispatch_gesture(self, gesture, timestamp, player=None):
+        """Send a stream gesture to the controller and clients (only when game is running)
+        
+        timestamp is the wall-clock capture time of the frame it came from.
+        """
+        # The stream owner's server-side game picks it up on its next tick
+        if self.snake_scheduler is not None:
+            owner = self.active_stream_websocket
+            self.snake_scheduler.steer(owner if player is None else (owner, player.id), gesture)
+        
+        if not self.game_is_running:
+            return
+        
+        # Send to C controller (non-blocking)
+        self.send_to_controller(gesture, player)
+        
+        # Broadcast gesture
+        message = self.latency.stamp({
+            "type": "gesture",
+            "direction": gesture,
+            "timestamp": timestamp
+        }, timestamp)
+        if player is not None:
+            message["player"] = player.id
+        try:
+            await self.broadcast(message)
+        except Exception as be:
+            log.warning("Broadcast error: %s", be, extra=hot("broadcast_error", per_second=1))
+    
+    async def send_snake(self, owner, message):
+        """Snake scheduler output: owner is a websocket, or (websocket, player id) in two-player mode"""
+        if isinstance(owner, tuple):
+            owner, player_id = owner
+            message = {**message, "player": player_id}
+        await owner.send_json(message)
+    
+    def on_live_result(self, results, timestamp_ms):
+        """Live-stream tracker callback (MediaPipe thread) - hop onto the event loop"""
+        if self.event_loop is not None and not self.event_loop.is_closed():
+            self.event_loop.call_soon_threadsafe(self.handle_live_result, results, timestamp_ms)
+    
+    def handle_live_result(self, results, timestamp_ms):
+        """Classify a live-stream result on the event loop"""
+        if self.watchdog is not None:
+            self.watchdog.inference_ok()
+        results = self.preprocessor.fix_results(results)
+        frame_width, frame_height = self.live_frame_size
+        
+        hand_landmarks = self.select_hand(results, self.selected_handedness)
+        gesture = None
+        if hand_landmarks is not None:
+            gesture = self.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+        self.live_hand = hand_landmarks
+        self.live_gesture = gesture
+        
+        if gesture:
+            # Timestamps are monotonic ms at capture; report wall-clock capture time
+            capture_time = time.time() - (time.monotonic() - timestamp_ms / 1000)
+            task = asyncio.create_task(self.dispatch_gesture(gesture, capture_time))
+            self.live_dispatches.add(task)
+            task.add_done_callback(self.live_dispatch_done)
+    
+    def live_dispatch_done(self, task):
+        self.live_dispatches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Live gesture dispatch failed: %s", task.exception(),
+                        extra=hot("live_dispatch_error", per_second=1))
+    
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
         disconnected = []
@@ -281,100 +551,314 @@ class HandTrackingServer:
         for conn in disconnected:
             self.active_connections.remove(conn)
     
-    async def process_frame(self, frame_data: str, handedness: str = "right"):
-        """Process frame from frontend and detect gestures"""
+    async def process_frame(self, frame_data: str, handedness: str = "right", owner=None, capture_time=None):
+        """Process frame from frontend and detect gestures (owner = uploading websocket)"""
         try:
-            # Decode base64 frame
-            frame_bytes = base64.b64decode(frame_data.split(',')[1] if ',' in frame_data else frame_data)
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Decode base64 frame, scaled down toward inference size while decoding.
+            # Gesture thresholds are in source pixels, so keep the source size.
+            frame, frame_width, frame_height = decode_frame(frame_data)
             
             if frame is None:
                 return {"error": "Invalid frame"}
             
-            # Convert to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_frame)
-            
-            frame_height, frame_width = frame.shape[:2]
+            results = await self.detect_hands(frame)
             
-            if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, hand_info in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    # Filter by handedness
-                    detected_hand = hand_info.classification[0].label.lower()
-                    if detected_hand != handedness.lower():
-                        continue
+            hand_landmarks = self.select_hand(results, handedness)
+            if hand_landmarks is not None:
+                # Detect gesture
+                gesture = self.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+                
+                if gesture:
+                    if self.snake_scheduler is not None:
+                        self.snake_scheduler.steer(owner, gesture)
                     
-                    # Detect gesture
-                    gesture = self.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+                    # Send to C controller (non-blocking)
+                    self.send_to_controller(gesture)
+                    
+                    # Broadcast to frontend
+                    await self.broadcast(self.latency.stamp({
+                        "type": "gesture",
+                        "direction": gesture,
+                        "timestamp": time.time()
+                    }, capture_time))
                     
-                    if gesture:
-                        # Send to C controller (non-blocking)
-                        self.send_to_controller(gesture)
-                        
-                        # Broadcast to frontend
-                        await self.broadcast({
-                            "type": "gesture",
-                            "direction": gesture,
-                            "timestamp": time.time()
-                        })
-                        
-                        return {
-                            "success": True,
-                            "gesture": gesture,
-                            "handDetected": True
-                        }
+                    return {
+                        "success": True,
+                        "gesture": gesture,
+                        "handDetected": True
+                    }
             
             return {"success": True, "handDetected": False}
             
         except Exception as e:
-            print(f"[SERVER] Frame processing error: {e}")
+            log.error("Frame processing error: %s", e, extra=hot("frame_error", per_second=1))
             return {"error": str(e)}
     
-    def start_camera(self):
+    def browser_player(self, player_id=None):
+        """Gesture state for one browser-tracked client: its own vote, cooldown and controller target"""
+        player_id = int(player_id or 1)
+        target = next((p for p in self.players if p.id == player_id), None)
+        predictor = None
+        if self.direction_predictor is not None:
+            predictor = DirectionPredictor(horizon_ms=float(os.getenv('KINSNAKE_PREDICT_HORIZON_MS', '60')))
+        player = Player(
+            player_id, "browser",
+            PointingGestureDetector(
+                predictor=predictor,
+                classifier=self.gesture_classifier,
+                accept_confidence=self.gesture_detector.accept_confidence
+            ),
+            target.pipe_path if target is not None else CONTROLLER_PIPE
+        )
+        player.ring = target.ring if target is not None else self.command_ring
+        return player
+    
+    async def process_landmarks(self, results, frame_width, frame_height, player, handedness=None, owner=None):
+        """Gesture logic on landmarks tracked in the browser (no decode, no inference)
+        
+        handedness picks the hand to follow; None takes the first one sent.
+        Nothing is broadcast: each browser player's gestures concern only its
+        own connection, and a per-frame broadcast to every client would grow
+        with the square of the player count.
+        """
+        if handedness:
+            hand_landmarks = self.select_hand(results, handedness)
+        else:
+            hand_landmarks = results.multi_hand_landmarks[0] if results.multi_hand_landmarks else None
+        if hand_landmarks is None:
+            return {"success": True, "handDetected": False}
+        
+        gesture = player.detector.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+        if gesture:
+            if self.snake_scheduler is not None:
+                self.snake_scheduler.steer(owner, gesture)
+            self.send_to_controller(gesture, player)
+        return {"success": True, "gesture": gesture, "handDetected": True}
+    
+    async def clock_sync(self, websocket):
+        """NTP-style burst: clock_ping messages, answered by clock_pong in the receive loop"""
+        for _ in range(self.clock_sync_rounds):
+            await websocket.send_json(self.latency.ping(websocket))
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.25)  # Let the last pongs arrive
+        await websocket.send_json({"type": "clock_offset", **self.latency.clock(websocket)})
+    
+    def open_camera(self):
+        """Open and configure the capture device (None on failure)"""
+        # High resolution for quality (MJPG is negotiated first on V4L2)
+        cap = open_capture(os.getenv('KINSNAKE_CAMERA_SOURCE', '0'), width=1280, height=720, fps=30)
+        if not cap.isOpened():
+            return None
+        log.info(f"Capture granted: {cap.granted}")
+        return cap
+    
+    async def read_frame(self):
+        """Read the next frame on the capture thread (ret False on timeout)"""
+        cap = self.cap
+        if cap is None:
+            return False, None
+        try:
+            return await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(self.capture_executor, self.preprocessor.read, cap),
+                self.frame_deadline_s
+            )
+        except asyncio.TimeoutError:
+            return False, None
+    
+    def release_capture(self, cap):
+        """Release a capture device on the capture thread, after any read still running there
+        
+        VideoCapture.release() concurrent with read() is undefined in the backends.
+        """
+        return self.capture_executor.submit(cap.release)
+    
+    async def recover_camera(self):
+        """Watchdog: replace a capture device that stopped delivering frames"""
+        log.warning("Capture stalled - reopening the camera")
+        start = time.perf_counter()
+        old_cap, old_executor = self.cap, self.capture_executor
+        self.cap = None
+        self.capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        self.preprocessor.forget_capture_buffer()  # A hung read may still fill it
+        if old_cap is not None:
+            # Released on its own thread once the read there returns. If that read
+            # is hung, leave the device and thread behind rather than race it.
+            released = asyncio.wrap_future(old_executor.submit(old_cap.release))
+            try:
+                # A healthy read finishes within a frame interval; don't add a whole deadline
+                await asyncio.wait_for(asyncio.shield(released), min(0.5, self.frame_deadline_s))
+            except asyncio.TimeoutError:
+                log.warning("Capture read still hung - leaving the old device behind")
+        old_executor.shutdown(wait=False)
+        
+        cap = await asyncio.get_running_loop().run_in_executor(self.capture_executor, self.open_camera)
+        if cap is None:
+            log.error("Camera reopen failed")
+            return
+        if not self.camera_active:
+            self.release_capture(cap)  # Stopped while reopening
+            return
+        self.cap = cap
+        log.info(f"Camera reopened in {(time.perf_counter() - start) * 1000:.0f}ms")
+    
+    async def recover_graph(self):
+        """Watchdog: replace a hand tracking graph (and its thread) that stopped returning results"""
+        start = time.perf_counter()
+        if self.inference_pool is not None:
+            # The pool restarts workers that exit, not ones that hang: kill those first
+            hung = self.inference_pool.restart_hung_workers(self.inference_deadline_s)
+            if hung:
+                log.warning(f"Inference stalled - killed hung pool workers {hung}, the pool restarts them")
+            else:
+                log.warning("Inference stalled - no pool worker is past the deadline")
+            return
+        if self.live_tracker is not None:
+            from tasks_backend import LiveStreamHandTracker
+            log.warning("Inference stalled - recreating the live-stream tracker")
+            old_tracker = self.live_tracker
+            self.live_tracker = LiveStreamHandTracker(self.on_live_result, model_path=self.live_model_path)
+            threading.Thread(target=old_tracker.close, name="tracker-close", daemon=True).start()
+        else:
+            log.warning("Inference stalled - rebuilding the Hands graph")
+            # The stuck thread may still be inside the old graph: don't close it, just drop it
+            old_executor = self.inference_executor
+            self.inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hands")
+            old_executor.shutdown(wait=False)
+            self.hands = None
+            
+            def build():
+                self.hands = self.build_hands(self.hands_complexity)
+            
+            await asyncio.get_running_loop().run_in_executor(self.inference_executor, build)
+        log.info(f"Hand tracking rebuilt in {(time.perf_counter() - start) * 1000:.0f}ms")
+    
+    async def notify_pipeline_status(self, message):
+        """Watchdog: tell clients the preview is stalled / recovered"""
+        if message["state"] == "stalled":
+            log.error(f"Pipeline still stalled after {message['actions']}: {message}")
+        else:
+            log.info(f"Pipeline recovered: {message}")
+        await self.broadcast(message)
+    
+    async def start_camera(self):
         """Start camera capture"""
         if self.camera_active:
             return True
         
         try:
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not self.cap.isOpened():
-                print("[SERVER] Failed to open camera")
+            # On the capture thread, so a release queued by stop_camera runs first
+            self.cap = await asyncio.get_running_loop().run_in_executor(self.capture_executor, self.open_camera)
+            if self.cap is None:
+                log.error("Failed to open camera")
                 return False
             
-            # High resolution for quality
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            
             self.camera_active = True
-            print("[SERVER] Camera started")
+            log.info("Camera started")
             return True
         except Exception as e:
-            print(f"[SERVER] Camera error: {e}")
+            log.error(f"Camera error: {e}")
             return False
     
     def stop_camera(self):
         """Stop camera capture"""
         if self.cap:
+            cap, self.cap = self.cap, None
             try:
-                self.cap.release()
-                self.cap = None
+                self.release_capture(cap)
+            except RuntimeError:
+                cap.release()  # Capture thread already shut down (exit): nothing reads any more
             except:
                 pass
         self.camera_active = False
-        print("[SERVER] Camera stopped")
+        self.camera_suspended = False
+        log.info("Camera stopped")
+    
+    async def suspend_resources(self):
+        """Idle: release the capture device (and optionally the graph); streams stay registered"""
+        released = []
+        if self.camera_active and self.cap is not None:
+            self.camera_suspended = True
+            cap, self.cap = self.cap, None
+            self.release_capture(cap)
+            released.append("camera")
+        
+        if self.release_graph_when_idle and self.inference_pool is None and self.live_tracker is None:
+            def close_graph():
+                # On the inference thread, between process() calls
+                hands, self.hands = self.hands, None
+                if hands is not None:
+                    hands.close()
+            await asyncio.get_running_loop().run_in_executor(self.inference_executor, close_graph)
+            released.append("hands graph")
+        
+        log.info(f"Idle for {self.lifecycle.idle_s:.0f}s - released {', '.join(released) or 'nothing'}")
+        await self.broadcast({
+            "type": "idle",
+            "released": released,
+            "timestamp": time.time()
+        })
+    
+    async def resume_resources(self):
+        """Warm resume: reopen the camera and pre-warm the graph in parallel"""
+        loop = asyncio.get_running_loop()
+        
+        async def reopen_camera():
+            if not self.camera_suspended:
+                return None
+            start = time.perf_counter()
+            cap = None
+            try:
+                # Capture thread: after the release queued by suspend_resources
+                cap = await loop.run_in_executor(self.capture_executor, self.open_camera)
+                if cap is not None:
+                    # The first read after opening is the slow one - take it here
+                    await loop.run_in_executor(self.capture_executor, cap.read)
+            except Exception as e:
+                log.error(f"Reopening the camera after idle raised: {e}")
+                if cap is not None:
+                    self.release_capture(cap)
+                cap = None
+            finally:
+                self.camera_suspended = False
+            if cap is None:
+                log.error("Failed to reopen camera after idle")
+                self.camera_active = False  # Ends the waiting stream
+            else:
+                self.cap = cap
+            return round((time.perf_counter() - start) * 1000, 1)
+        
+        async def warm_graph():
+            if self.hands is not None or self.inference_pool is not None or self.live_tracker is not None:
+                return None
+            start = time.perf_counter()
+            
+            def warm():
+                if self.hands is None:
+                    self.hands = self.build_hands(self.hands_complexity)
+                # The first process() call initializes the graph
+                self.hands.process(np.zeros((360, 640, 3), dtype=np.uint8))
+            await loop.run_in_executor(self.inference_executor, warm)
+            return round((time.perf_counter() - start) * 1000, 1)
+        
+        camera_ms, graph_ms = await asyncio.gather(reopen_camera(), warm_graph())
+        log.info(f"Resumed from idle (camera {camera_ms} ms, graph {graph_ms} ms)")
+        await self.broadcast({
+            "type": "resumed",
+            "camera_ms": camera_ms,
+            "graph_ms": graph_ms,
+            "timestamp": time.time()
+        })
+        return {"camera_ms": camera_ms, "graph_ms": graph_ms}
     
     async def stream_camera_frames(self, websocket: WebSocket):
         """Stream camera frames with hand tracking overlay (optimized for low latency)"""
         # Prevent duplicate streams
         if self.active_stream_websocket is not None:
-            print(f"[SERVER] Stream already active, stopping old stream")
+            log.info("Stream already active, stopping old stream")
             self.streaming_active = False
             await asyncio.sleep(0.2)
         
-        if not self.start_camera():
+        if not await self.start_camera():
             await websocket.send_json({
                 "type": "error",
                 "message": "Failed to start camera"
@@ -383,84 +867,119 @@ class HandTrackingServer:
         
         self.streaming_active = True
         self.active_stream_websocket = websocket
-        print(f"[SERVER] Starting optimized camera stream for client")
+        self.event_loop = asyncio.get_running_loop()
+        self.live_hand = None
+        self.live_gesture = None
+        log.info("Starting optimized camera stream for client")
         
         frame_count = 0
         last_frame_time = 0
+        gated_results = None  # Last inferred results, reused while the scene is static
         last_gesture_broadcast = 0
         
         last_error_time = 0
         
         try:
             while self.streaming_active and self.camera_active:
+                if self.camera_suspended:
+                    # Idle: the camera is released until a client needs it again
+                    await self.lifecycle.wait_resumed()
+                    if self.motion_gate is not None:
+                        self.motion_gate.reset()
+                    continue
+                
                 try:
-                    # Read frame
-                    ret, frame = self.cap.read()
+                    # Read frame into the reused capture buffer (mirrored if flipping pixels);
+                    # stalls and failed reads are the watchdog's business
+                    ret, frame = await self.read_frame()
                     if not ret:
                         await asyncio.sleep(0.01)
                         continue
+                    if self.watchdog is not None:
+                        self.watchdog.frame_ok()
                     
                     frame_count += 1
                     current_time = time.time()
-                    
-                    # Flip for mirror effect
-                    frame = cv2.flip(frame, 1)
+                    # Wall-clock capture time of this frame (read time when the source can't tell)
+                    capture_time = current_time
+                    if getattr(self.cap, "last_capture_time", None) is not None:
+                        capture_time = current_time - (time.monotonic() - self.cap.last_capture_time)
+                    frame_start = time.perf_counter()
+                    send_s = 0.0  # Preview send time, not part of the frame's processing cost
+                    inferred = True  # False when the motion gate reused the previous results
                     
                     frame_height, frame_width = frame.shape[:2]
                     
+                    # Inference may run on a downscaled copy (landmarks are normalized)
+                    quality = self.quality_governor.level if self.quality_governor else None
+                    inference_frame = frame
+                    if quality is not None:
+                        inference_frame = self.preprocessor.scale_for_inference(frame, quality.inference_width)
+                    
                     # Process EVERY frame for maximum responsiveness
                     gesture = None
-                    if True:  # Process every frame
+                    tracked_hand = None  # Drawn only on preview frames that are sent
+                    if self.live_tracker is not None:
+                        # Asynchronous: results arrive via on_live_result; overlay shows the latest
+                        try:
+                            self.live_frame_size = (frame_width, frame_height)
+                            rgb_frame = cv2.cvtColor(inference_frame, cv2.COLOR_BGR2RGB,
+                                                     dst=self.preprocessor.rgb_buffer(inference_frame))
+                            self.live_tracker.submit(rgb_frame)
+                            tracked_hand, gesture = self.live_hand, self.live_gesture
+                        except Exception as mp_error:
+                            if current_time - last_error_time > 5:
+                                log.warning("MediaPipe error (continuing): %s", mp_error)
+                                last_error_time = current_time
+                    else:
                         try:
-                            # Convert to RGB for MediaPipe
-                            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            results = self.hands.process(rgb_frame)
+                            inferred = (self.motion_gate is None
+                                        or self.motion_gate.should_infer(inference_frame)
+                                        or gated_results is None)
+                            if inferred:
+                                if self.watchdog is not None:
+                                    self.watchdog.inference_started()
+                                try:
+                                    results = await self.detect_hands(inference_frame, self.preprocessor.rgb_buffer(inference_frame))
+                                finally:
+                                    if self.watchdog is not None:
+                                        self.watchdog.inference_done()
+                                results = self.preprocessor.fix_results(results)
+                                if self.motion_gate is not None:
+                                    self.motion_gate.inferred()
+                                    gated_results = results
+                            else:
+                                # Static scene: the previous landmarks still hold
+                                results = gated_results
+                            if self.watchdog is not None:
+                                self.watchdog.inference_ok()
                             
-                            # Draw hand landmarks if detected
-                            if results.multi_hand_landmarks and results.multi_handedness:
-                                for hand_landmarks, hand_info in zip(results.multi_hand_landmarks, results.multi_handedness):
-                                    # Filter by handedness
-                                    detected_hand = hand_info.classification[0].label.lower()
-                                    if detected_hand != self.selected_handedness.lower():
-                                        continue
-                                    
-                                    # Draw hand skeleton
-                                    self.draw_hand_landmarks(frame, hand_landmarks, frame_width, frame_height)
-                                    
+                            if self.players:
+                                # Two players from the same inference, filtered independently
+                                assigned = assign_hands(results, self.players, self.player_assign)
+                                for player in self.players:
+                                    player.hand = assigned[player.id]
+                                    player.gesture = None
+                                    if player.hand is not None:
+                                        player.gesture = player.detector.detect_pointing_direction(
+                                            player.hand, frame_width, frame_height)
+                                        if player.gesture:
+                                            await self.dispatch_gesture(player.gesture, capture_time, player)
+                                            last_gesture_broadcast = current_time
+                            else:
+                                tracked_hand = self.select_hand(results, self.selected_handedness)
+                                if tracked_hand is not None:
                                     # Detect gesture
-                                    gesture = self.detect_pointing_direction(hand_landmarks, frame_width, frame_height)
+                                    gesture = self.detect_pointing_direction(tracked_hand, frame_width, frame_height)
                                     
-                                    # Always draw gesture text for visual feedback
                                     if gesture:
-                                        # Draw gesture text with background
-                                        text = f"POINTING: {gesture}"
-                                        font = cv2.FONT_HERSHEY_SIMPLEX
-                                        (text_width, text_height), _ = cv2.getTextSize(text, font, 1.2, 2)
-                                        
-                                        cv2.rectangle(frame, (5, 5), (text_width + 25, text_height + 25), (0, 0, 0), -1)
-                                        cv2.rectangle(frame, (5, 5), (text_width + 25, text_height + 25), (0, 255, 0), 3)
-                                        cv2.putText(frame, text, (15, text_height + 15), font, 1.2, (0, 255, 0), 2)
-                                        
-                                        # Only send to controller and broadcast when game is running
-                                        if self.game_is_running:
-                                            # Send to C controller (non-blocking)
-                                            self.send_to_controller(gesture)
-                                            
-                                            # Broadcast gesture
-                                            try:
-                                                await self.broadcast({
-                                                    "type": "gesture",
-                                                    "direction": gesture,
-                                                    "timestamp": current_time
-                                                })
-                                            except Exception as be:
-                                                print(f"[SERVER] Broadcast error: {be}")
-                                            
-                                            last_gesture_broadcast = current_time
+                                        # Only sent to controller and broadcast when game is running
+                                        await self.dispatch_gesture(gesture, capture_time)
+                                        last_gesture_broadcast = current_time
                         except Exception as mp_error:
                             # MediaPipe errors shouldn't stop the stream
                             if current_time - last_error_time > 5:
-                                print(f"[SERVER] MediaPipe error (continuing): {mp_error}")
+                                log.warning("MediaPipe error (continuing): %s", mp_error)
                                 last_error_time = current_time
                     
                     # Send frames at 15fps
@@ -468,36 +987,68 @@ class HandTrackingServer:
                         try:
                             # Check if websocket is still connected
                             if websocket.client_state.name == "DISCONNECTED":
-                                print("[SERVER] WebSocket disconnected, stopping stream")
+                                log.info("WebSocket disconnected, stopping stream")
                                 break
                             
-                            # Encode with good quality
-                            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                            frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                            # Mirrored preview with hand skeleton and gesture overlay
+                            preview = self.preprocessor.preview(frame)
+                            fast_overlay = quality is not None and quality.overlay == "fast"
+                            if tracked_hand is not None:
+                                self.draw_tracked_hand(preview, tracked_hand, frame_width, frame_height, fast_overlay)
+                            if gesture:
+                                self.draw_gesture_text(preview, gesture)
+                            for player in self.players:
+                                if player.hand is not None:
+                                    self.draw_tracked_hand(preview, player.hand, frame_width, frame_height, fast_overlay)
+                                if player.gesture:
+                                    self.draw_gesture_text(preview, player.gesture, f"P{player.id}",
+                                                           align_right=player.side == "right")
+                            
+                            # Encode with good quality - once, for both preview paths
+                            _, buffer = cv2.imencode('.jpg', preview, [cv2.IMWRITE_JPEG_QUALITY, 80])
+                            self.preview_hub.publish(buffer, current_time)
                             
-                            # Send frame (with timeout to prevent blocking)
-                            await asyncio.wait_for(
-                                websocket.send_json({
+                            if self.ws_preview:
+                                frame_base64 = base64.b64encode(self.preview_hub.jpeg).decode('utf-8')
+                                message = {
                                     "type": "camera_frame",
                                     "frame": f"data:image/jpeg;base64,{frame_base64}",
-                                    "timestamp": current_time
-                                }),
-                                timeout=0.1
-                            )
+                                    "timestamp": current_time,
+                                    "capture_ts": round(capture_time * 1000, 1)
+                                }
+                                # Send frame (with timeout to prevent blocking)
+                                send_start = time.perf_counter()
+                                try:
+                                    await asyncio.wait_for(websocket.send_json(message), timeout=0.1)
+                                finally:
+                                    send_s = time.perf_counter() - send_start
+                                self.preview_hub.count_ws_send(len(message["frame"]))  # Data URL, without the JSON envelope
                             last_frame_time = current_time
                         except asyncio.TimeoutError:
                             # Skip this frame if send is too slow
                             pass
                         except RuntimeError as re:
                             # WebSocket closed mid-send
-                            print(f"[SERVER] WebSocket closed during send: {re}")
+                            log.info(f"WebSocket closed during send: {re}")
                             break
                         except Exception as send_error:
                             error_str = str(send_error).lower()
                             if "closed" in error_str or "send" in error_str:
-                                print(f"[SERVER] WebSocket closed, stopping stream")
+                                log.info("WebSocket closed, stopping stream")
                                 break
-                            print(f"[SERVER] Frame send error: {send_error}")
+                            log.warning("Frame send error: %s", send_error, extra=hot("frame_send_error", per_second=1))
+                    
+                    # Feed the governor this frame's processing time (capture wait and the
+                    # preview send excluded - a slow client link is not inference cost;
+                    # gated frames say nothing about inference cost)
+                    if self.quality_governor is not None and inferred:
+                        new_level = self.quality_governor.record((time.perf_counter() - frame_start - send_s) * 1000)
+                        if new_level is not None:
+                            self.apply_quality_level(new_level)
+                            await self.broadcast({
+                                "type": "quality_level",
+                                **self.quality_governor.stats()
+                            })
                     
                     # Small sleep to yield
                     await asyncio.sleep(0.005)
@@ -505,19 +1056,35 @@ class HandTrackingServer:
                 except Exception as loop_error:
                     # Log but continue
                     if current_time - last_error_time > 5:
-                        print(f"[SERVER] Loop error (continuing): {loop_error}")
+                        log.warning("Loop error (continuing): %s", loop_error)
                         last_error_time = current_time
                     await asyncio.sleep(0.01)
                 
         except Exception as e:
-            print(f"[SERVER] Fatal streaming error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"Fatal streaming error: {e}")
         finally:
             self.streaming_active = False
             if self.active_stream_websocket == websocket:
                 self.active_stream_websocket = None
-            print("[SERVER] Camera stream stopped")
+            log.info("Camera stream stopped")
+    
+    def draw_gesture_text(self, frame, gesture, label="POINTING", align_right=False):
+        """Draw gesture text with background (top left, or top right for player 2)"""
+        text = f"{label}: {gesture}"
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        (text_width, text_height), _ = cv2.getTextSize(text, font, 1.2, 2)
+        x = frame.shape[1] - text_width - 30 if align_right else 5
+        
+        cv2.rectangle(frame, (x, 5), (x + text_width + 20, text_height + 25), (0, 0, 0), -1)
+        cv2.rectangle(frame, (x, 5), (x + text_width + 20, text_height + 25), (0, 255, 0), 3)
+        cv2.putText(frame, text, (x + 10, text_height + 15), font, 1.2, (0, 255, 0), 2)
+    
+    def draw_tracked_hand(self, frame, hand_landmarks, frame_width, frame_height, fast=False):
+        """Hand skeleton in the governor's overlay detail"""
+        if fast:
+            self.draw_hand_landmarks_fast(frame, hand_landmarks, frame_width, frame_height)
+        else:
+            self.draw_hand_landmarks(frame, hand_landmarks, frame_width, frame_height)
     
     def draw_hand_landmarks_fast(self, frame, hand_landmarks, frame_width, frame_height):
         """Draw simplified hand landmarks for speed"""
@@ -612,32 +1179,56 @@ class HandTrackingServer:
     
     def cleanup(self):
         """Cleanup resources"""
-        print("[SERVER] Cleaning up...")
+        log.info("Cleaning up...")
         
         self.streaming_active = False
         self.stop_camera()
         
-        if hasattr(self, 'hands'):
+        if getattr(self, 'hands', None) is not None:
             try:
                 self.hands.close()
             except:
                 pass
         
+        if hasattr(self, 'inference_executor'):
+            self.inference_executor.shutdown(wait=False)
+        if hasattr(self, 'capture_executor'):
+            self.capture_executor.shutdown(wait=False)
+        
+        if getattr(self, 'live_tracker', None) is not None:
+            try:
+                self.live_tracker.close()
+            except:
+                pass
+        
+        if getattr(self, 'inference_pool', None) is not None:
+            try:
+                self.inference_pool.close()
+            except:
+                pass
+        
+        if getattr(self, 'command_ring', None) is not None:
+            for ring in {self.command_ring, *(p.ring for p in self.players if p.ring is not None)}:
+                ring.close()
+                ring.unlink()
+            self.command_ring = None
+        
         if hasattr(self, 'c_controller') and self.c_controller:
             try:
                 self.c_controller.terminate()
                 self.c_controller.wait(timeout=3)
-                print("[SERVER] C controller terminated")
+                log.info("C controller terminated")
             except:
                 try:
                     self.c_controller.kill()
                 except:
                     pass
         
-        print("[SERVER] Cleanup complete")
+        log.info("Cleanup complete")
 
-# Global server instance
-server = HandTrackingServer()
+# Global server instance (skipped when an inference worker re-imports this module under spawn)
+if __name__ != "__mp_main__":
+    server = HandTrackingServer()
 
 @app.get("/")
 async def root():
@@ -651,25 +1242,119 @@ async def root():
 async def health():
     return {
         "status": "healthy",
-        "controller": server.c_controller is not None and server.c_controller.poll() is None
+        "controller": server.c_controller is not None and server.c_controller.poll() is None,
+        "inference_pool": server.inference_pool.stats() if server.inference_pool else None,
+        "live_tracker": server.live_tracker.stats() if server.live_tracker else None,
+        "quality": server.quality_governor.stats() if server.quality_governor else None,
+        "prediction": server.direction_predictor.stats() if server.direction_predictor else None,
+        "snake_engine": server.snake_scheduler.stats() if server.snake_scheduler else None,
+        "lifecycle": server.lifecycle.stats(),
+        "watchdog": server.watchdog.stats() if server.watchdog else None,
+        "preview": server.preview_hub.stats(),
+        "motion_gate": server.motion_gate.stats() if server.motion_gate else None,
+        "command_ring": server.command_ring.stats() if server.command_ring else None,
+        "latency": server.latency.stats(),
+        "players": [
+            {"id": p.id, "side": p.side, "pipe": p.pipe_path, "last_gesture": p.last_gesture}
+            for p in server.players
+        ] or None,
+        "log_records_dropped": dropped_records()
     }
 
 
+@app.get("/preview.mjpg")
+async def preview_mjpeg(request: Request):
+    """Camera preview as MJPEG for an <img> tag (frames come from the active camera stream)"""
+    return StreamingResponse(
+        server.preview_hub.mjpeg(request.is_disconnected),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+        headers={"Cache-Control": "no-cache, no-store"}
+    )
+
+
+@app.get("/debug/profile")
+async def debug_profile(request: Request, seconds: float = 5.0, format: str = "speedscope",
+                        interval_ms: float = 5.0):
+    """Sample every thread and the event-loop lag for `seconds` while the server keeps running"""
+    if server.debug_token is None:
+        raise HTTPException(status_code=404)
+    # Header only: a query-string token would end up in access logs and browser history
+    token = request.headers.get("x-debug-token") or ""
+    if not hmac.compare_digest(token.encode(), server.debug_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be speedscope or collapsed")
+    if server.profiling:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    seconds = min(max(seconds, 0.5), 60.0)
+    interval_ms = min(max(interval_ms, 1.0), 100.0)
+    server.profiling = True
+    try:
+        log.info(f"Profiling for {seconds:.1f}s every {interval_ms:.0f}ms")
+        profiler, lag = await profile_window(seconds, interval_ms / 1000)
+    finally:
+        server.profiling = False
+    
+    summary = {"sampler": profiler.stats(), "loop_lag": lag.stats()}
+    log.info(f"Profile done: {summary}")
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed(), headers={"X-Profile-Summary": json.dumps(summary)})
+    document = profiler.speedscope(name=f"kinsnake {seconds:.0f}s")
+    document.update(summary)  # Extra top-level keys are ignored by speedscope
+    return document
+
+
 @app.get("/test-code-update")
 async def test_code_update():
     """Test if server is using updated code"""
-    print("[CODE UPDATE TEST] This message proves the server is using updated code!")
+    get_logger("CODE UPDATE TEST").info("This message proves the server is using updated code!")
     return {"message": "Code update test - check server logs for confirmation"}
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     server.active_connections.append(websocket)
-    print(f"[SERVER] Client connected. Total connections: {len(server.active_connections)}")
+    log.info(f"Client connected. Total connections: {len(server.active_connections)}")
     
     stream_task = None
     camera_started_by_this_connection = False
     
+    # Latest-wins queue for uploaded frames (created on first "frame" message)
+    frame_admission = None
+    
+    # Clock sync burst in flight ("clock_sync" message)
+    sync_task = None
+    
+    # Browser-tracked landmarks: gesture state per player id on this connection
+    landmark_players = {}
+    
+    async def ingest_landmarks(results, width, height, message_id, player_id=None, mirror=False,
+                               handedness=None, capture_time=None):
+        # player_id: parse_player_id output (1, 2 or None), so this holds at most two players
+        if mirror:
+            mirror_results(results)
+        key = player_id or 1
+        if key not in landmark_players:
+            landmark_players[key] = server.browser_player(key)
+        server.lifecycle.touch()
+        reply = await server.process_landmarks(
+            results, width, height, landmark_players[key], handedness,
+            owner=(websocket, key) if player_id else websocket
+        )
+        if reply.get("gesture"):
+            await websocket.send_json(server.latency.stamp({
+                "type": "gesture",
+                "direction": reply["gesture"],
+                "timestamp": time.time(),
+                "player": key
+            }, capture_time))
+        if message_id is not None:
+            # Acknowledgement only when asked for (the gesture message is the result)
+            reply["type"] = "landmark_result"
+            reply["id"] = message_id
+            await websocket.send_json(reply)
+    
     try:
         await websocket.send_json({
             "type": "connected",
@@ -677,14 +1362,33 @@ async def websocket_endpoint(websocket: WebSocket):
         })
         
         while True:
-            data = await websocket.receive_json()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            if message.get("bytes") is not None:
+                # Binary frames are landmark packets (landmarks.pack_landmark_packet)
+                try:
+                    results, width, height, message_id, player_id, mirror = unpack_landmark_packet(message["bytes"])
+                    player_id = parse_player_id(player_id)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "message": f"Bad landmark packet: {e}"})
+                    continue
+                await ingest_landmarks(results, width, height, message_id or None, player_id, mirror)
+                continue
+            
+            data = json.loads(message["text"])
             
             if data.get("type") == "start_camera":
                 # Start streaming camera feed
                 handedness = data.get("handedness", "right")
                 server.selected_handedness = handedness
+                # "mjpeg": the client shows GET /preview.mjpg, skip camera_frame messages
+                server.ws_preview = data.get("preview", "websocket") != "mjpeg"
                 server.game_is_running = False  # Start with game not running
-                print(f"[SERVER] Starting camera stream with {handedness} hand")
+                server.lifecycle.release("game", websocket)
+                await server.lifecycle.resume()  # Warm resume if idle released the camera
+                log.info(f"Starting camera stream with {handedness} hand")
                 
                 # Cancel existing stream if any
                 if stream_task and not stream_task.done():
@@ -704,40 +1408,140 @@ async def websocket_endpoint(websocket: WebSocket):
                 server.stop_camera()
             
             elif data.get("type") == "frame":
-                # Process frame and detect gestures (legacy support)
-                result = await server.process_frame(
-                    data.get("frame"),
-                    data.get("handedness", "right")
-                )
-                await websocket.send_json({
-                    "type": "frame_result",
-                    **result
-                })
+                # Process frame and detect gestures (legacy support).
+                # Only the newest upload is kept; older ones are dropped undecoded.
+                if frame_admission is None:
+                    frame_admission = FrameAdmission(
+                        lambda frame_data, handedness, capture_time: server.process_frame(
+                            frame_data, handedness, websocket, capture_time),
+                        websocket.send_json
+                    )
+                    frame_admission.start()
+                server.lifecycle.touch()
+                frame_admission.offer(data.get("frame"), data.get("handedness", "right"), data.get("id"),
+                                      server.latency.server_time(websocket, data.get("capture_ts")))
+            
+            elif data.get("type") == "landmarks":
+                # Browser-side tracking: landmarks computed by the client go straight to
+                # the gesture logic (same detector, vote and controller path as frames)
+                try:
+                    results = results_from_json(data.get("hands"))
+                    width, height = check_frame_size(int(data.get("width", 1280)), int(data.get("height", 720)))
+                    player_id = parse_player_id(data.get("player"))
+                    handedness = parse_handedness(data.get("handedness"))
+                except (TypeError, ValueError, AttributeError, OverflowError) as e:
+                    await websocket.send_json({"type": "error", "message": f"Bad landmarks: {e}"})
+                    continue
+                await ingest_landmarks(results, width, height, data.get("id"), player_id,
+                                       bool(data.get("mirror")), handedness,
+                                       server.latency.server_time(websocket, data.get("capture_ts")))
             
             elif data.get("type") == "game_state":
                 # Frontend telling us game state
                 game_running = data.get("running", False)
                 server.game_is_running = game_running
-                print(f"[SERVER] Game state updated: {'RUNNING' if game_running else 'STOPPED'}")
+                if game_running:
+                    server.lifecycle.acquire("game", websocket)
+                else:
+                    server.lifecycle.release("game", websocket)
+                log.info(f"Game state updated: {'RUNNING' if game_running else 'STOPPED'}")
+            
+            elif data.get("type") == "snake_start":
+                # Server-side game for this connection (deltas every tick)
+                if server.snake_scheduler is None:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": "Snake engine disabled (set KINSNAKE_SNAKE_ENGINE=1)"
+                    })
+                else:
+                    # In two-player mode each player can run its own game ("player": 1 or 2)
+                    try:
+                        player_id = parse_player_id(data.get("player"))
+                        owner = (websocket, player_id) if player_id else websocket
+                        snapshot = server.snake_scheduler.start_game(
+                            owner, int(data.get("grid", 20)), data.get("seed")
+                        )
+                    except (TypeError, ValueError, OverflowError) as e:
+                        await websocket.send_json({"type": "error", "message": f"Bad snake_start: {e}"})
+                        continue
+                    server.lifecycle.acquire("snake", websocket)
+                    if owner is not websocket:
+                        snapshot["player"] = owner[1]
+                    await websocket.send_json(snapshot)
+            
+            elif data.get("type") == "snake_stop":
+                try:
+                    player_id = parse_player_id(data.get("player"))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "message": f"Bad snake_stop: {e}"})
+                    continue
+                if server.snake_scheduler is not None:
+                    server.snake_scheduler.stop_game((websocket, player_id) if player_id else websocket)
+                server.lifecycle.release("snake", websocket)
+            
+            elif data.get("type") == "wake":
+                # Client is about to need the camera/graph (e.g. leaving the menu)
+                server.lifecycle.touch()
+                await server.lifecycle.resume()
             
             elif data.get("type") == "command":
                 # Direct command from frontend
                 gesture = data.get("gesture")
+                server.lifecycle.touch()
                 if gesture:
+                    if server.snake_scheduler is not None:
+                        server.snake_scheduler.steer(websocket, gesture)
                     server.send_to_controller(gesture)
-                    await server.broadcast({
+                    message = server.latency.stamp({
                         "type": "gesture",
                         "direction": gesture,
                         "timestamp": time.time()
-                    })
+                    }, server.latency.server_time(websocket, data.get("capture_ts")))
+                    if "id" in data:
+                        message["id"] = data["id"]  # Echoed so clients can match it (load tests)
+                    await server.broadcast(message)
+            
+            elif data.get("type") == "clock_sync":
+                # Estimate this client's clock offset and RTT (see latency_tracker.py)
+                if sync_task is None or sync_task.done():
+                    sync_task = asyncio.create_task(server.clock_sync(websocket))
+            
+            elif data.get("type") == "clock_pong":
+                try:
+                    server.latency.pong(websocket, data)
+                except (KeyError, TypeError, ValueError):
+                    pass  # Malformed pong: no sample
+            
+            elif data.get("type") == "applied":
+                # The client acted on gesture "seq" at "applied_ts" (its own clock)
+                try:
+                    server.latency.applied(websocket, data.get("seq"), float(data["applied_ts"]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            
+            elif data.get("type") == "latency_report":
+                await websocket.send_json({"type": "latency_report", **server.latency.connection_stats(websocket)})
     
     except WebSocketDisconnect:
-        print(f"[SERVER] Client disconnecting (clean)")
+        log.info("Client disconnecting (clean)")
     except Exception as e:
-        print(f"[SERVER] WebSocket error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"WebSocket error: {e}")
     finally:
+        if frame_admission is not None:
+            await frame_admission.close()
+        if sync_task is not None and not sync_task.done():
+            sync_task.cancel()
+        latency = server.latency.connection_stats(websocket)["end_to_end"]
+        if latency["count"]:
+            log.info("Glass-to-gesture latency for this client: p50 %s ms, p95 %s ms (%d events)",
+                     latency["p50_ms"], latency["p95_ms"], latency["count"])
+        server.latency.forget(websocket)
+        if server.snake_scheduler is not None:
+            server.snake_scheduler.stop_game(websocket)
+            for player_id in {p.id for p in server.players} | set(landmark_players):
+                server.snake_scheduler.stop_game((websocket, player_id))
+        server.lifecycle.release_owner(websocket)
+        
         # Clean up only if this connection started the camera
         if camera_started_by_this_connection:
             server.streaming_active = False
@@ -754,14 +1558,25 @@ async def websocket_endpoint(websocket: WebSocket):
         except:
             pass
         
-        print(f"[SERVER] Client fully disconnected. Total connections: {len(server.active_connections)}")
+        log.info(f"Client fully disconnected. Total connections: {len(server.active_connections)}")
+
+@app.on_event("startup")
+async def startup_event():
+    server.lifecycle.start()
+    if server.watchdog is not None:
+        server.watchdog.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await server.lifecycle.close()
+    if server.watchdog is not None:
+        await server.watchdog.close()
+    if server.snake_scheduler is not None:
+        await server.snake_scheduler.close()
     server.cleanup()
 
 if __name__ == "__main__":
-    print("[SERVER] Starting KinSnake Backend Server on http://localhost:8000")
-    print("[SERVER] WebSocket available at ws://localhost:8000/ws")
+    log.info("Starting KinSnake Backend Server on http://localhost:8000")
+    log.info("WebSocket available at ws://localhost:8000/ws")
     uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
 
@@ -0,0 +1,216 @@
+"""
+Server-Authoritative Snake Engine
+Optional server-side copy of the browser game (same rules as
+SnakeGameBoard.tsx: wrapping 20x20 grid, self-collision ends the game, one
+apple at a time). Gestures steer a game directly and take effect on its next
+tick, without the server -> browser -> game loop round trip.
+
+Board: one byte per cell (occupancy bitmap) plus a deque of body cells, so a
+move, a collision check and a tail release are all O(1). Cells are sent as
+flat indices (y * grid + x).
+
+All games advance on one fixed-tick scheduler. Each tick every client gets a
+compact delta for its game:
+    {"type": "snake", "t": tick, "h": new head, "r": freed tail cell or -1,
+     "a": apple (only when it moved), "s": score (only when it changed),
+     "over": "collision" | "won" (only on the last delta)}
+A full snapshot ("snake_state") is sent when a game starts.
+"""
+
+import asyncio
+from collections import deque
+import random
+import time
+
+# (dx, dy) per direction; y grows downwards like the frontend
+MOVES = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+
+# Board sizes a client may ask for (the board is grid * grid bytes per game)
+MIN_GRID = 5
+MAX_GRID = 64
+
+
+class SnakeGame:
+    """One game: occupancy bitmap + body deque (head at the left end)"""
+
+    def __init__(self, grid_size=20, seed=None):
+        if not MIN_GRID <= grid_size <= MAX_GRID:
+            raise ValueError(f"grid must be between {MIN_GRID} and {MAX_GRID}")
+        if seed is not None and not isinstance(seed, (int, str)):
+            raise ValueError("seed must be an integer or a string")
+        self.grid = grid_size
+        self.cells = bytearray(grid_size * grid_size)
+        self.body = deque()
+        self.rng = random.Random(seed)
+
+        # Same start as the frontend: one segment in the middle, moving right
+        start = (grid_size // 2) * grid_size + grid_size // 2
+        self.body.append(start)
+        self.cells[start] = 1
+        self.direction = "RIGHT"
+        self.next_direction = "RIGHT"
+        self.apple = self._place_apple()
+        self.score = 0
+        self.tick = 0
+        self.over = None
+
+    def steer(self, direction):
+        """Queue a direction for the next tick (180 degree reversals are ignored)"""
+        if direction in MOVES and direction != OPPOSITE[self.direction]:
+            self.next_direction = direction
+
+    def _place_apple(self):
+        """Random free cell: rejection sampling, falling back to a scan on a crowded board"""
+        size = len(self.cells)
+        if len(self.body) >= size:
+            return -1
+        for _ in range(16):
+            cell = self.rng.randrange(size)
+            if not self.cells[cell]:
+                return cell
+        cell = self.cells.find(0, self.rng.randrange(size))
+        return cell if cell >= 0 else self.cells.find(0)
+
+    def step(self):
+        """Advance one tick; returns the delta message"""
+        self.tick += 1
+        self.direction = self.next_direction
+        dx, dy = MOVES[self.direction]
+        head = self.body[0]
+        x = (head % self.grid + dx) % self.grid
+        y = (head // self.grid + dy) % self.grid
+        new_head = y * self.grid + x
+
+        delta = {"type": "snake", "t": self.tick, "h": new_head, "r": -1}
+
+        # Checked before the tail moves, as in the frontend
+        if self.cells[new_head]:
+            self.over = "collision"
+            delta["h"] = head
+            delta["over"] = self.over
+            return delta
+
+        self.body.appendleft(new_head)
+        self.cells[new_head] = 1
+
+        if new_head == self.apple:
+            self.score += 1
+            self.apple = self._place_apple()
+            delta["s"] = self.score
+            delta["a"] = self.apple
+            if self.apple < 0:
+                self.over = "won"
+                delta["over"] = self.over
+        else:
+            tail = self.body.pop()
+            self.cells[tail] = 0
+            delta["r"] = tail
+        return delta
+
+    def snapshot(self):
+        """Full state for a client that (re)joins"""
+        return {
+            "type": "snake_state",
+            "grid": self.grid,
+            "t": self.tick,
+            "body": list(self.body),
+            "apple": self.apple,
+            "direction": self.direction,
+            "score": self.score,
+            "over": self.over,
+        }
+
+
+class SnakeScheduler:
+    """Advances every active game on one fixed tick and publishes the deltas
+
+    send(owner, message) is awaited once per game per tick; owners whose
+    send fails are dropped.
+    """
+
+    def __init__(self, send, tick_ms=150.0):
+        self.send = send
+        self.tick_s = tick_ms / 1000.0
+        self.games = {}  # owner -> SnakeGame
+        self._task = None
+
+        # Stats
+        self.ticks = 0
+        self.late_ticks = 0
+        self.last_step_ms = 0.0
+        self.max_step_ms = 0.0
+
+    def start_game(self, owner, grid_size=20, seed=None):
+        """Start (or restart) the owner's game; returns its snapshot"""
+        game = SnakeGame(grid_size, seed)
+        self.games[owner] = game
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return game.snapshot()
+
+    def stop_game(self, owner):
+        self.games.pop(owner, None)
+
+    def steer(self, owner, direction):
+        """Apply a gesture to the owner's game on its next tick"""
+        game = self.games.get(owner)
+        if game is not None and game.over is None:
+            game.steer(direction)
+
+    def step_all(self):
+        """Advance every running game once; returns [(owner, delta)]
+
+        A game that ends is removed after this step; its last delta carries "over".
+        """
+        start = time.perf_counter()
+        deltas = []
+        for owner, game in list(self.games.items()):
+            deltas.append((owner, game.step()))
+            if game.over is not None:
+                del self.games[owner]
+        self.last_step_ms = (time.perf_counter() - start) * 1000
+        self.max_step_ms = max(self.max_step_ms, self.last_step_ms)
+        self.ticks += 1
+        return deltas
+
+    async def _publish(self, owner, delta):
+        try:
+            await self.send(owner, delta)
+        except Exception:
+            self.games.pop(owner, None)
+
+    async def _run(self):
+        next_tick = time.perf_counter()
+        while self.games:
+            next_tick += self.tick_s
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.late_ticks += 1
+                if delay < -self.tick_s:
+                    next_tick = time.perf_counter()  # Too far behind: don't burst to catch up
+
+            deltas = self.step_all()
+            if deltas:
+                await asyncio.gather(*(self._publish(owner, delta) for owner, delta in deltas))
+
+    def stats(self):
+        return {
+            "games": len(self.games),
+            "tick_ms": round(self.tick_s * 1000, 1),
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "last_step_ms": round(self.last_step_ms, 3),
+            "max_step_ms": round(self.max_step_ms, 3),
+        }
+
+    async def close(self):
+        self.games.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
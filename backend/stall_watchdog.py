@@ -0,0 +1,236 @@
+"""
+Capture / Inference Stall Watchdog
+Tracks the age of the last good camera frame and of the last inference
+result while the camera stream runs, and escalates when either passes its
+deadline instead of letting the preview freeze:
+
+    capture stall:   reopen the capture device -> also rebuild the Hands graph
+                     -> tell clients ("pipeline_status": "stalled") and keep
+                     reopening with backoff
+    inference stall: rebuild the Hands graph -> tell clients, keep rebuilding
+
+Each step waits one deadline for the pipeline to come back before the next
+one runs. When frames and results flow again the stall is closed, its
+recovery time (from the last good frame / result, i.e. the outage users
+saw) recorded and clients are told ("recovered").
+
+A stall that comes back within `flap_window_s` of the last recovery picks
+up the ladder where that one left off, so a device that keeps wedging a
+second after every reopen still reaches the client notification.
+
+While an inference call is in flight the stream loop is not reading, so
+frame age says nothing about the camera then; only inference age counts.
+
+Actions are coroutines supplied by the server; the watchdog only decides
+when to run them, so it has no camera or MediaPipe code of its own.
+"""
+
+import asyncio
+import time
+
+CAPTURE_LADDER = ("reopen_camera", "rebuild_graph", "notify")
+INFERENCE_LADDER = ("rebuild_graph", "notify")
+
+
+class StallWatchdog:
+    """Deadline monitor with an escalation ladder per stall kind
+
+    actions: {"reopen_camera": coro fn, "rebuild_graph": coro fn,
+              "notify": coro fn(message dict)}
+    is_active: callable, False while nothing should be flowing (no stream,
+               camera suspended); the deadlines restart when it turns True.
+    """
+
+    def __init__(self, actions, is_active, frame_deadline_s=2.0, inference_deadline_s=3.0,
+                 poll_s=0.25, max_backoff_s=30.0, flap_window_s=20.0):
+        self.actions = actions
+        self.is_active = is_active
+        self.frame_deadline_s = frame_deadline_s
+        self.inference_deadline_s = inference_deadline_s
+        self.poll_s = poll_s
+        self.max_backoff_s = max_backoff_s
+        self.flap_window_s = flap_window_s
+
+        now = time.monotonic()
+        self.last_frame = now
+        self.last_inference = now
+        self.inference_pending = False
+        self._was_active = False
+        self._task = None
+
+        # Current stall episode
+        self.stall_kind = None
+        self.stall_started = None
+        self.level = 0
+        self.last_action_at = None
+        self.retry_s = None
+        self.taken = []  # Actions run in this episode
+        self._recovered_at = None
+        self._recovered_kind = None
+        self._recovered_level = 0
+
+        # Stats
+        self.stalls = {"capture": 0, "inference": 0}
+        self.action_counts = {name: 0 for name in ("reopen_camera", "rebuild_graph", "notify")}
+        self.action_errors = 0
+        self.recovery_ms = []
+        self.last_stall = None
+
+    def start(self):
+        """Start the monitor (call from the event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def frame_ok(self):
+        """A good frame was read"""
+        self.last_frame = time.monotonic()
+
+    def inference_ok(self):
+        """An inference result arrived (or the motion gate validly reused one)"""
+        self.last_inference = time.monotonic()
+
+    def inference_started(self):
+        self.inference_pending = True
+
+    def inference_done(self):
+        """The inference call returned or failed (results are reported by inference_ok)"""
+        self.inference_pending = False
+
+    def reset(self):
+        """Restart both deadlines (stream started, camera resumed)"""
+        now = time.monotonic()
+        self.last_frame = now
+        self.last_inference = now
+
+    def _stalled_kind(self, now):
+        inference_late = now - self.last_inference > self.inference_deadline_s
+        if self.inference_pending:
+            return "inference" if inference_late else None
+        if now - self.last_frame > self.frame_deadline_s:
+            return "capture"
+        return "inference" if inference_late else None
+
+    async def _act(self, name):
+        self.action_counts[name] += 1
+        self.taken.append(name)
+        try:
+            if name == "notify":
+                await self.actions["notify"]({
+                    "type": "pipeline_status",
+                    "state": "stalled",
+                    "stage": self.stall_kind,
+                    "stalled_s": round(time.monotonic() - self.stall_started, 1),
+                    "actions": list(self.taken),
+                })
+            else:
+                await self.actions[name]()
+        except Exception:
+            self.action_errors += 1
+            raise
+
+    async def check(self):
+        """One watchdog pass: open, escalate or close a stall episode"""
+        active = self.is_active()
+        if active and not self._was_active:
+            self.reset()
+        self._was_active = active
+        if not active:
+            return
+
+        now = time.monotonic()
+        kind = self._stalled_kind(now)
+
+        if kind is None:
+            if self.stall_kind is not None:
+                await self._recovered(now)
+            return
+
+        if self.stall_kind is None:
+            # New episode: the first action runs immediately
+            self.stall_kind = kind
+            self.stall_started = self.last_frame if kind == "capture" else self.last_inference
+            self.level = 0
+            if (self._recovered_at is not None and kind == self._recovered_kind
+                    and now - self._recovered_at < self.flap_window_s):
+                self.level = self._recovered_level  # Flapping: continue escalating
+            self.taken = []
+            self.retry_s = None
+            self.stalls[kind] += 1
+        elif kind != self.stall_kind and kind == "capture":
+            # Inference recovery turned into a capture stall: climb the capture ladder instead
+            self.stall_kind = kind
+            self.level = 0
+            self.stalls[kind] += 1
+        else:
+            deadline = self.frame_deadline_s if kind == "capture" else self.inference_deadline_s
+            wait = self.retry_s if self.retry_s is not None else deadline
+            if now - self.last_action_at < wait:
+                return  # Give the last action time to work
+
+        ladder = CAPTURE_LADDER if self.stall_kind == "capture" else INFERENCE_LADDER
+        if self.level < len(ladder):
+            name = ladder[self.level]
+            self.level += 1
+        else:
+            # Clients know; keep retrying the first remedy with backoff
+            name = ladder[0]
+            deadline = self.frame_deadline_s if self.stall_kind == "capture" else self.inference_deadline_s
+            self.retry_s = min(self.max_backoff_s, (self.retry_s or deadline) * 2)
+        self.last_action_at = time.monotonic()
+        await self._act(name)
+        if name == "rebuild_graph" and self.stall_kind == "capture":
+            await self._act("reopen_camera")  # A rebuilt graph needs frames too
+
+    async def _recovered(self, now):
+        recovery_ms = round((now - self.stall_started) * 1000, 1)
+        self.recovery_ms.append(recovery_ms)
+        self.recovery_ms = self.recovery_ms[-100:]
+        self.last_stall = {"stage": self.stall_kind, "recovery_ms": recovery_ms, "actions": list(self.taken)}
+        notified = "notify" in self.taken
+        self._recovered_at = now
+        self._recovered_kind = self.stall_kind
+        self._recovered_level = self.level
+        self.stall_kind = None
+        self.stall_started = None
+        self.level = 0
+        self.retry_s = None
+        self.taken = []
+        try:
+            await self.actions["notify"]({"type": "pipeline_status", "state": "recovered",
+                                          "notified_stall": notified, **self.last_stall})
+        except Exception:
+            self.action_errors += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_s)
+            try:
+                await self.check()
+            except Exception:
+                pass  # Counted in action_errors; keep watching
+
+    def stats(self):
+        now = time.monotonic()
+        ordered = sorted(self.recovery_ms)
+        return {
+            "frame_deadline_s": self.frame_deadline_s,
+            "inference_deadline_s": self.inference_deadline_s,
+            "frame_age_s": round(now - self.last_frame, 2),
+            "inference_age_s": round(now - self.last_inference, 2),
+            "stalled": self.stall_kind,
+            "stalls": dict(self.stalls),
+            "actions": dict(self.action_counts),
+            "action_errors": self.action_errors,
+            "recoveries": len(self.recovery_ms),
+            "recovery_p50_ms": ordered[len(ordered) // 2] if ordered else None,
+            "recovery_max_ms": ordered[-1] if ordered else None,
+            "last_stall": self.last_stall,
+        }
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
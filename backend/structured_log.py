@@ -0,0 +1,200 @@
+"""
+Non-Blocking Structured Logging
+Callers only put a LogRecord on a bounded queue; a background thread does
+all formatting and console/file I/O, so the frame loop never waits on a slow
+(Windows console, piped) stdout. Hot-path events can be rate limited or
+sampled per key, and output can be plain "[SERVER] ..." lines or JSON lines.
+
+Settings (environment or .env):
+    KINSNAKE_LOG_LEVEL   DEBUG / INFO / WARNING / ERROR (default INFO)
+    KINSNAKE_LOG_JSON    1 = JSON lines instead of text
+    KINSNAKE_LOG_FILE    also append to this file
+
+Usage:
+    log = get_logger("SERVER")
+    log.info("Camera started")
+    log.info("-> C Controller: %s", gesture, extra=hot("controller_send", per_second=5))
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+_ROOT = "kinsnake"
+_QUEUE_SIZE = 10000
+
+_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+
+
+def hot(key, per_second=None, sample=None):
+    """extra= for hot-path messages: at most per_second per key and/or 1 in `sample`"""
+    return {"rate_key": key, "rate_per_second": per_second, "rate_sample": sample}
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops hot-path records over their per-key budget (runs in the caller, O(1))
+
+    Callers log from the event loop and several worker threads, so the
+    per-key counters are updated under a lock.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._state = {}  # key -> [window_start, emitted_in_window, seen, suppressed]
+        self._state_lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+
+        now = time.monotonic()
+        sample = getattr(record, "rate_sample", None)
+        per_second = getattr(record, "rate_per_second", None)
+        with self._state_lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [now, 0, 0, 0]
+            state[2] += 1
+
+            if sample and (state[2] - 1) % sample:
+                state[3] += 1
+                return False
+
+            if per_second:
+                if now - state[0] >= 1.0:
+                    state[0] = now
+                    state[1] = 0
+                if state[1] >= per_second:
+                    state[3] += 1
+                    return False
+                state[1] += 1
+
+            # Tell the reader how much was skipped since the last emitted record
+            record.suppressed = state[3]
+            state[3] = 0
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and leaves formatting to the listener thread"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The stock prepare() formats here; only render tracebacks eagerly
+        # (they reference live frames), keep msg % args for the listener
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    """[SOURCE] message, matching the original print() output"""
+
+    def format(self, record):
+        source = record.name.split(".", 1)[-1]
+        message = f"[{source}] {record.getMessage()}"
+        if record.levelno >= logging.WARNING:
+            message = f"[{source}] {record.levelname}: {record.getMessage()}"
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            message += f" (+{suppressed} suppressed)"
+        if record.exc_text:
+            message += "\n" + record.exc_text
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "source": record.name.split(".", 1)[-1],
+            "msg": record.getMessage(),
+        }
+        key = getattr(record, "rate_key", None)
+        if key is not None:
+            entry["event"] = key
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level=None, json_lines=None, log_file=None):
+    """Start the background log writer (idempotent)"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+
+        level = level or os.getenv("KINSNAKE_LOG_LEVEL", "INFO")
+        if json_lines is None:
+            json_lines = os.getenv("KINSNAKE_LOG_JSON", "0") == "1"
+        log_file = log_file or os.getenv("KINSNAKE_LOG_FILE")
+
+        formatter = JsonFormatter() if json_lines else TextFormatter()
+        handlers = []
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(formatter)
+        handlers.append(console)
+        if log_file:
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        log_queue = queue.Queue(maxsize=_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger(_ROOT)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        root.addHandler(_queue_handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def get_logger(source):
+    """Logger whose records print as [source] ..."""
+    configure_logging()
+    return logging.getLogger(f"{_ROOT}.{source}")
+
+
+def dropped_records():
+    """Records discarded because the queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def shutdown_logging():
+    """Flush everything queued so far and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,107 @@
+"""
+MediaPipe Tasks Live-Stream Inference Backend
+Alternative to the synchronous mp.solutions.hands.Hands.process() call.
+HandLandmarker in LIVE_STREAM mode takes timestamped frames, drops frames
+internally when it falls behind, and delivers results on its own thread.
+
+Needs the hand_landmarker.task model bundle:
+https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task
+"""
+
+import threading
+import time
+
+import mediapipe as mp
+from mediapipe.tasks.python import BaseOptions
+from mediapipe.tasks.python import vision
+
+from landmarks import HandLandmarks, Handedness, HandResults
+from structured_log import get_logger
+
+log = get_logger("SERVER")
+
+DEFAULT_MODEL_PATH = "hand_landmarker.task"
+
+
+def to_hand_results(result):
+    """Convert a HandLandmarkerResult into the MediaPipe-solutions result layout"""
+    hands = []
+    for points, categories in zip(result.hand_landmarks, result.handedness):
+        category = categories[0]
+        hands.append((
+            HandLandmarks((lm.x, lm.y, lm.z) for lm in points),
+            Handedness(category.category_name, category.score)
+        ))
+    return HandResults(hands)
+
+
+class LiveStreamHandTracker:
+    """Asynchronous HandLandmarker; on_result(results, timestamp_ms) runs on MediaPipe's thread"""
+
+    def __init__(self, on_result, model_path=DEFAULT_MODEL_PATH, num_hands=1,
+                 min_detection_confidence=0.6, min_presence_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        self.on_result = on_result
+        self._lock = threading.Lock()
+        self._last_timestamp_ms = -1
+        self._submit_times = {}  # timestamp_ms -> perf_counter at submit, for latency
+
+        # Stats
+        self.submitted = 0
+        self.completed = 0
+        self.last_latency_ms = 0.0
+
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=str(model_path)),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._handle_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def next_timestamp_ms(self):
+        """Monotonic millisecond timestamp, strictly increasing as LIVE_STREAM requires"""
+        with self._lock:
+            timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+            self._last_timestamp_ms = timestamp_ms
+            return timestamp_ms
+
+    def submit(self, rgb_frame, timestamp_ms=None):
+        """Queue an RGB frame; returns its timestamp (the Image copies the pixels)"""
+        if timestamp_ms is None:
+            timestamp_ms = self.next_timestamp_ms()
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        with self._lock:
+            self._submit_times[timestamp_ms] = time.perf_counter()
+            # Frames MediaPipe dropped never call back; don't let them pile up
+            if len(self._submit_times) > 64:
+                for stale in sorted(self._submit_times)[:-32]:
+                    del self._submit_times[stale]
+        self.landmarker.detect_async(image, timestamp_ms)
+        self.submitted += 1
+        return timestamp_ms
+
+    def _handle_result(self, result, output_image, timestamp_ms):
+        with self._lock:
+            submitted_at = self._submit_times.pop(timestamp_ms, None)
+        if submitted_at is not None:
+            self.last_latency_ms = (time.perf_counter() - submitted_at) * 1000
+        self.completed += 1
+        try:
+            self.on_result(to_hand_results(result), timestamp_ms)
+        except Exception as e:
+            log.error(f"Live-stream result handler error: {e}")
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "not_returned": max(0, self.submitted - self.completed),
+            "last_latency_ms": round(self.last_latency_ms, 1),
+        }
+
+    def close(self):
+        self.landmarker.close()